@@ -1,9 +1,32 @@
 # app.py
 # Programa principal del sistema de inventario
 
-# Importar las funciones de los otros módulos
-from servicios import *
-from archivos import *
+# Importar las funciones de los otros módulos (solo las que se usan)
+from servicios import (actualizar_producto, agregar_producto, buscar_por_prefijo, buscar_producto,
+                       buscar_similares, calcular_estadisticas, eliminar_producto,
+                       mostrar_inventario, reporte_stock_bajo)
+from archivos import (SUFIJO_DELTA, cargar_csv, cargar_csv_por_lotes, compresion_por_nombre,
+                      detectar_compresion, fusionar_lote, guardar_csv, importar_archivos,
+                      listar_archivos_csv)
+from diferido import InventarioDiferido, recordar_ultimo, ultimo_inventario
+from inventario import CRITERIOS_ORDEN, Inventario
+from incremental import GuardadoIncremental
+from instrumentacion import (captura_activa, desde_entorno, detener_captura, guardar_metricas,
+                             iniciar_captura, metricas_activas, resumen_metricas)
+from transacciones import Transaccion
+
+import os
+import sys
+
+# Los archivos de más de 50 MB se cargan por lotes (ver cargar_csv_por_lotes)
+TAMANO_ARCHIVO_GRANDE = 50 * 1024 * 1024
+
+# Un CSV comprimido ocupa unas 4 veces menos que sin comprimir (se usa
+# para estimar su tamaño real al decidir si es grande)
+PROPORCION_COMPRESION = 4
+
+# Productos por página al mostrar el inventario
+PRODUCTOS_POR_PAGINA = 50
 
 
 def mostrar_menu():
@@ -20,6 +43,8 @@ def mostrar_menu():
     print("7. Guardar inventario en CSV")
     print("8. Cargar inventario desde CSV")
     print("9. Salir")
+    print("10. Medir rendimiento")
+    print("11. Importar varios archivos CSV")
     print("="*50)
 
 
@@ -51,6 +76,38 @@ def opcion_agregar(inventario):
         print(" Error: Debes ingresar números válidos para precio y cantidad")
 
 
+def opcion_mostrar(inventario):
+    """Opción 2: Mostrar el inventario (por páginas si es grande)"""
+    if len(inventario) <= PRODUCTOS_POR_PAGINA:
+        mostrar_inventario(inventario)
+        return
+    
+    criterio = input("Ordenar por nombre/precio/cantidad/subtotal "
+                     "(-precio = de mayor a menor, Enter = sin ordenar): ").strip().lower()
+    descendente = criterio.startswith("-")
+    criterio = criterio.lstrip("-") or None
+    
+    if criterio is not None and criterio not in CRITERIOS_ORDEN:
+        print(f" No se puede ordenar por '{criterio}'")
+        return
+    
+    pagina = 1
+    while True:
+        paginas = mostrar_inventario(inventario, pagina, PRODUCTOS_POR_PAGINA,
+                                     criterio, descendente)
+        
+        respuesta = input("[S]iguiente, [A]nterior, número de página o Enter para salir: ").strip().upper()
+        
+        if respuesta == "S":
+            pagina = min(pagina + 1, paginas)
+        elif respuesta == "A":
+            pagina = max(pagina - 1, 1)
+        elif respuesta.isdigit():
+            pagina = min(max(int(respuesta), 1), paginas)
+        else:
+            break
+
+
 def opcion_buscar(inventario):
     """Opción 3: Buscar un producto por nombre"""
     print("\n--- BUSCAR PRODUCTO ---")
@@ -65,6 +122,23 @@ def opcion_buscar(inventario):
         print(f"   Cantidad: {producto['cantidad']}")
     else:
         print(f" No se encontró el producto '{nombre}'")
+        mostrar_sugerencias(inventario, nombre)
+
+
+def mostrar_sugerencias(inventario, nombre):
+    """Muestra productos que empiezan igual o tienen un nombre parecido"""
+    if nombre == "":
+        return
+
+    sugerencias = buscar_por_prefijo(inventario, nombre, limite=5)
+
+    if not sugerencias:
+        sugerencias = [producto for producto, _ in buscar_similares(inventario, nombre)]
+
+    if sugerencias:
+        print(" ¿Quisiste decir?")
+        for producto in sugerencias:
+            print(f"   - {producto['nombre']} (${producto['precio']:.2f}, {producto['cantidad']} u.)")
 
 
 def opcion_actualizar(inventario):
@@ -135,22 +209,65 @@ def opcion_estadisticas(inventario):
     print(f" Valor total del inventario: ${stats['valor_total']:.2f}")
     print(f" Producto más caro: {stats['producto_mas_caro'][0]} (${stats['producto_mas_caro'][1]:.2f})")
     print(f" Producto con mayor stock: {stats['producto_mayor_stock'][0]} ({stats['producto_mayor_stock'][1]} unidades)")
+    
+    # Productos con poco stock, de menor a mayor cantidad (ver indices.py)
+    reporte = reporte_stock_bajo(inventario, limite=10)
+    print(f"\n Productos con stock bajo (menos de {reporte['umbral']} unidades): {reporte['total']}")
+    for producto in reporte["productos"]:
+        print(f"   - {producto['nombre']}: {producto['cantidad']} unidades")
+    if reporte["total"] > len(reporte["productos"]):
+        print(f"   ... y {reporte['total'] - len(reporte['productos'])} más")
 
 
-def opcion_guardar(inventario):
-    """Opción 7: Guardar inventario en CSV"""
+def opcion_guardar(inventario, guardados):
+    """
+    Opción 7: Guardar inventario en CSV
+    
+    La primera vez que se guarda en un archivo se escribe completo; las
+    siguientes veces solo se guardan los productos que cambiaron (ver
+    incremental.py). 'guardados' relaciona cada ruta con su GuardadoIncremental.
+    """
     print("\n--- GUARDAR INVENTARIO ---")
     
-    ruta = input("Nombre del archivo (ejemplo: inventario.csv): ").strip()
+    ruta = input("Nombre del archivo (ejemplo: inventario.csv o inventario.csv.gz): ").strip()
     
     if ruta == "":
         ruta = "inventario.csv"
     
-    # Asegurar que termine en .csv
-    if not ruta.endswith('.csv'):
+    # Asegurar que termine en .csv (con .gz, .bz2, .xz o .zst se guarda comprimido)
+    if not ruta.endswith('.csv') and compresion_por_nombre(ruta) is None:
         ruta += '.csv'
     
-    guardar_csv(inventario, ruta)
+    guardado = guardados.get(ruta)
+    
+    if guardado is None:
+        # Primera vez en este archivo: se escribe completo
+        if guardar_csv(inventario, ruta):
+            recordar_ultimo(ruta)
+            if hasattr(inventario, "agregar_observador"):
+                guardados[ruta] = GuardadoIncremental(ruta).conectar(inventario, base_al_dia=True)
+        return
+    
+    try:
+        resultado = guardado.guardar()
+    
+    except PermissionError:
+        print(f"\n Error: No tienes permisos para escribir en '{ruta}'")
+        return
+    
+    except Exception as error:
+        print(f"\n Error al guardar el archivo: {error}")
+        return
+    
+    # Al volver a abrir el programa se empieza con este inventario
+    recordar_ultimo(ruta)
+    
+    if resultado["modo"] == "cambios":
+        print(f"\n Cambios guardados en: {ruta}{SUFIJO_DELTA} ({resultado['productos']} productos)")
+    elif resultado["modo"] == "completo":
+        print(f"\n Inventario guardado en: {ruta}")
+    else:
+        print(f"\n No hubo cambios desde el último guardado en: {ruta}")
 
 
 def opcion_cargar(inventario):
@@ -159,6 +276,11 @@ def opcion_cargar(inventario):
     
     ruta = input("Nombre del archivo a cargar: ").strip()
     
+    # Los archivos grandes se cargan por lotes para no llenar la memoria
+    if es_archivo_grande(ruta):
+        cargar_por_lotes(inventario, ruta)
+        return
+    
     # Cargar productos
     productos_nuevos = cargar_csv(ruta)
     
@@ -184,19 +306,212 @@ def opcion_cargar(inventario):
         print("\n Fusionando inventarios...")
         print("   Política: Si el producto existe, se suma la cantidad y se actualiza el precio")
         
-        fusionados = fusionar_inventarios(inventario, productos_nuevos)
-        nuevos = len(productos_nuevos) - fusionados
+        # En una transacción: si algo falla, el inventario queda como estaba
+        with Transaccion(inventario) as transaccion:
+            resultado = fusionar_lote(transaccion, productos_nuevos)
+        mostrar_resultado_fusion(resultado, inventario)
+
+
+def opcion_importar(inventario):
+    """
+    Opción 11: Fusionar todos los CSV de una carpeta (o de un patrón como
+    proveedores/*.csv) de una sola vez, leyéndolos a la vez (ver
+    importar_archivos)
+    """
+    print("\n--- IMPORTAR VARIOS ARCHIVOS ---")
+    
+    origen = input("Carpeta o patrón de los archivos (ejemplo: proveedores o proveedores/*.csv): ").strip()
+    
+    if origen == "":
+        print(" Debes indicar una carpeta o un patrón")
+        return
+    
+    rutas = listar_archivos_csv(origen)
+    
+    if not rutas or not os.path.exists(rutas[0]):
+        print(f" No se encontraron archivos CSV en '{origen}'")
+        return
+    
+    print(f"\n Importando {len(rutas)} archivos (se fusionan en orden alfabético)...")
+    print("   Política: Si el producto existe, se suma la cantidad y se actualiza el precio")
+    
+    # En una transacción: si algo falla, el inventario queda como estaba
+    with Transaccion(inventario) as transaccion:
+        resultado = importar_archivos(transaccion, origen)
+    
+    for datos in resultado["archivos"]:
+        nombre = os.path.basename(datos["ruta"])
+        if datos["valido"]:
+            print(f"   {nombre}: {datos['productos']} filas válidas, "
+                  f"{datos['filas_invalidas']} inválidas ({datos['segundos']:.2f} s)")
+        else:
+            print(f"   {nombre}: no se importó ({datos['error']})")
+    
+    print()
+    mostrar_resultado_fusion(resultado["fusion"], inventario)
+    print(f"   Tiempo total: {resultado['segundos']:.2f} s")
+
+
+def mostrar_resultado_fusion(resultado, inventario):
+    """Muestra los conteos que devuelve fusionar_lote"""
+    print(f"   Inventario fusionado:")
+    print(f"   Productos actualizados: {resultado['fusionados']}")
+    print(f"   Productos nuevos: {resultado['nuevos']}")
+    if resultado["duplicados_en_lote"] > 0:
+        print(f"   Filas repetidas en el archivo: {resultado['duplicados_en_lote']}")
+    print(f"   Total en inventario: {len(inventario)}")
+
+
+def es_archivo_grande(ruta):
+    """Indica si el archivo supera el tamaño a partir del cual se carga por lotes"""
+    try:
+        tamano = os.path.getsize(ruta)
+    except OSError:
+        # Si no se puede consultar, que cargar_csv muestre el error
+        return False
+    
+    if detectar_compresion(ruta) is not None:
+        tamano *= PROPORCION_COMPRESION
+    
+    return tamano > TAMANO_ARCHIVO_GRANDE
+
+
+def cargar_por_lotes(inventario, ruta):
+    """
+    Carga un archivo grande lote por lote (ver cargar_csv_por_lotes).
+    Como no se sabe cuántos productos hay hasta terminar, primero se
+    pregunta si sobrescribir o fusionar y luego se procesa cada lote.
+    """
+    resumen = {}
+    lotes = cargar_csv_por_lotes(ruta, resumen=resumen)
+    
+    # Leer el primer lote: así se valida el encabezado antes de tocar nada
+    primer_lote = next(lotes, None)
+    
+    if primer_lote is None:
+        if resumen["valido"]:
+            print("  No se cargó ningún producto válido")
+        return
+    
+    print("\nArchivo grande: se cargará por lotes")
+    opcion = input("¿Sobrescribir inventario actual? (S/N): ").strip().upper()
+    
+    # Los lotes se preparan en una transacción y se aplican al final,
+    # así un error a mitad del archivo no deja el inventario a medias
+    transaccion = Transaccion(inventario)
+    
+    if opcion == "S":
+        # Sobrescribir: vaciar inventario y agregar cada lote
+        transaccion.clear()
+        transaccion.extend(primer_lote)
+        for lote in lotes:
+            transaccion.extend(lote)
+    
+    else:
+        # Fusionar: cada lote se combina con el inventario actual
+        print("\n Fusionando inventarios...")
+        print("   Política: Si el producto existe, se suma la cantidad y se actualiza el precio")
+        
+        # Sumar los conteos de cada lote
+        resultado = fusionar_lote(transaccion, primer_lote)
+        for lote in lotes:
+            parcial = fusionar_lote(transaccion, lote)
+            for clave in resultado:
+                resultado[clave] += parcial[clave]
+    
+    if not resumen["valido"]:
+        transaccion.descartar()
+        print(" No se aplicó ningún cambio: el inventario quedó como estaba")
+        return
+    
+    transaccion.confirmar()
+    
+    if opcion == "S":
+        print(f" Inventario reemplazado con {len(inventario)} productos")
+    else:
+        mostrar_resultado_fusion(resultado, inventario)
+
+
+def opcion_rendimiento():
+    """
+    Opción 10: Ver las métricas de las funciones y tomar perfiles
+    (cProfile o tracemalloc) de lo que se haga en el menú
+    """
+    print("\n--- MEDIR RENDIMIENTO ---")
+    
+    if metricas_activas():
+        metricas = resumen_metricas()
+        
+        if not metricas:
+            print(" Todavía no se llamó a ninguna función")
         
-        print(f"   Inventario fusionado:")
-        print(f"   Productos actualizados: {fusionados}")
-        print(f"   Productos nuevos: {nuevos}")
-        print(f"   Total en inventario: {len(inventario)}")
+        # Las que más tiempo llevan primero
+        for nombre, datos in sorted(metricas.items(), key=lambda item: -item[1]["segundos"])[:15]:
+            texto = f" {nombre}: {datos['llamadas']} llamadas, {datos['segundos']:.3f} s"
+            texto += f" (p50 {datos['latencia_us']['p50']:.0f} µs, p99 {datos['latencia_us']['p99']:.0f} µs)"
+            if "elementos" in datos:
+                texto += f", {datos['elementos']} elementos"
+            print(texto)
+    else:
+        print(" Métricas desactivadas (se activan iniciando con INVENTARIO_METRICAS=1)")
+    
+    modo = captura_activa()
+    print()
+    
+    if modo is not None:
+        print(f"1. Terminar la captura con {modo} y ver el resultado")
+    else:
+        print("1. Empezar una captura con cProfile (tiempo por función)")
+        print("2. Empezar una captura con tracemalloc (memoria por línea)")
+    if metricas_activas():
+        print("3. Guardar métricas (.json o .prom para Prometheus)")
+    
+    opcion = input("Elige una opción (Enter para volver): ").strip()
+    
+    if opcion == "1" and modo is not None:
+        ruta = input("Archivo para guardar el resultado completo (Enter para no guardarlo): ").strip()
+        print()
+        print(detener_captura(ruta or None))
+    
+    elif opcion in ("1", "2") and modo is None:
+        iniciar_captura("cprofile" if opcion == "1" else "tracemalloc")
+        print(" Captura iniciada: usa el menú y vuelve a la opción 10 para ver el resultado")
+    
+    elif opcion == "3" and metricas_activas():
+        ruta = input("Nombre del archivo (ejemplo: metricas.json): ").strip() or "metricas.json"
+        try:
+            guardar_metricas(ruta)
+            print(f"\n Métricas guardadas en: {ruta}")
+        except OSError as error:
+            print(f"\n Error al guardar el archivo: {error}")
 
 
 def main():
     """Función principal que ejecuta el programa"""
-    # Crear el inventario vacío
-    inventario = []
+    # Modo registro: si INVENTARIO_JOURNAL indica un archivo base, se
+    # recupera el inventario y cada cambio queda guardado al instante
+    ruta_journal = os.environ.get("INVENTARIO_JOURNAL", "").strip()
+    journal = None
+    
+    if ruta_journal != "":
+        # Import local: sin registro de cambios no hace falta (así el menú aparece antes)
+        from journal import recuperar
+        
+        inventario, journal = recuperar(ruta_journal)
+        print(f" Registro de cambios activo en: {journal.ruta_log}")
+    else:
+        ruta_ultimo = ultimo_inventario()
+        
+        if ruta_ultimo is not None:
+            # Último inventario guardado: se abre recién al usarlo (ver diferido.py)
+            inventario = InventarioDiferido(ruta_ultimo)
+            print(f" Inventario: {ruta_ultimo} (se abre al usarlo)")
+        else:
+            # Crear el inventario vacío (con índice por nombre)
+            inventario = Inventario()
+    
+    # Archivos donde ya se guardó: los siguientes guardados solo escriben los cambios
+    guardados = {}
     
     print("¡Bienvenido al Sistema de Inventario! 🏪")
     
@@ -206,13 +521,13 @@ def main():
         
         try:
             # Leer opción del usuario
-            opcion = input("\nSelecciona una opción (1-9): ").strip()
+            opcion = input("\nSelecciona una opción (1-11): ").strip()
             
             if opcion == "1":
                 opcion_agregar(inventario)
             
             elif opcion == "2":
-                mostrar_inventario(inventario)
+                opcion_mostrar(inventario)
             
             elif opcion == "3":
                 opcion_buscar(inventario)
@@ -227,17 +542,23 @@ def main():
                 opcion_estadisticas(inventario)
             
             elif opcion == "7":
-                opcion_guardar(inventario)
+                opcion_guardar(inventario, guardados)
             
             elif opcion == "8":
                 opcion_cargar(inventario)
             
+            elif opcion == "10":
+                opcion_rendimiento()
+            
+            elif opcion == "11":
+                opcion_importar(inventario)
+            
             elif opcion == "9":
                 print("\n ¡Hasta pronto! Gracias por usar el sistema.")
                 break
             
             else:
-                print(" Opción inválida. Por favor elige un número del 1 al 9")
+                print(" Opción inválida. Por favor elige un número del 1 al 11")
         
         except KeyboardInterrupt:
             print("\n\n Programa interrumpido. ¡Hasta pronto!")
@@ -246,7 +567,19 @@ def main():
         except Exception as error:
             print(f"\n Error inesperado: {error}")
             print("El programa continuará funcionando...")
+    
+    # Terminar de escribir el registro de cambios
+    if journal is not None:
+        journal.cerrar()
 
 
-# Iniciar el programa
-main()
\ No newline at end of file
+# Iniciar el programa (solo al ejecutarlo, no al importarlo)
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Modo por lotes, sin menú: python3 app.py --batch comandos.txt
+        import comandos
+        sys.exit(comandos.main(sys.argv[1:]))
+    
+    # Perfil y métricas según las variables de entorno (ver instrumentacion.py)
+    with desde_entorno():
+        main()
@@ -1,9 +1,58 @@
 # archivos.py
 # Funciones para guardar y cargar inventario en formato CSV
 
+import bz2
+import contextlib
+import csv
+import glob
+import gzip
+import importlib
+import io
+import json
+import lzma
+import math
+import os
+import shutil
+import threading
+import time
+from itertools import compress, islice, repeat
+
+from instrumentacion import instrumentar_modulo, por_largo, por_largo_del_argumento, por_resultado
+from inventario import clave_nombre
+
+
+# Encabezado que deben tener los archivos CSV del inventario
+ENCABEZADO = "nombre,precio,cantidad"
+
+# Tamaño de cada bloque que se lee del archivo (1 MB)
+TAMANO_BLOQUE = 1024 * 1024
+
+# Cuántos productos se procesan en cada lote al cargar o guardar
+TAMANO_LOTE = 10000
+
+# Buffer para escribir el CSV (1 MB): menos llamadas al sistema
+TAMANO_BUFFER_ESCRITURA = 1024 * 1024
+
+# Terminación del archivo de cambios que acompaña a un CSV
+# ("inventario.csv" -> "inventario.csv.delta", ver escribir_delta)
+SUFIJO_DELTA = ".delta"
+
+# Compresiones que se reconocen: nombre -> (terminaciones, primeros bytes del archivo)
+COMPRESIONES = {
+    "gzip": ((".gz", ".gzip"), b"\x1f\x8b"),
+    "bz2": ((".bz2",), b"BZh"),
+    "xz": ((".xz",), b"\xfd7zXZ\x00"),
+    "zstd": ((".zst", ".zstd"), b"\x28\xb5\x2f\xfd"),
+}
+
+# Nivel de compresión al guardar. gzip 6 es el de la herramienta gzip:
+# comprime casi lo mismo que 9 y es más rápido
+NIVELES_COMPRESION = {"gzip": 6, "bz2": 9, "xz": 6, "zstd": 3}
+
+
 def guardar_csv(inventario, ruta, incluir_header=True):
     """
-    Guarda el inventario en un archivo CSV.
+    Guarda el inventario en un archivo CSV (ver escribir_csv).
     
     Parámetros:
     - inventario: lista de productos
@@ -18,23 +67,7 @@ def guardar_csv(inventario, ruta, incluir_header=True):
         return False
     
     try:
-        # Abrir el archivo en modo escritura
-        with open(ruta, 'w', encoding='utf-8') as archivo:
-            
-            # Escribir encabezado si se solicita
-            if incluir_header:
-                archivo.write("nombre,precio,cantidad\n")
-            
-            # Escribir cada producto en una línea
-            for producto in inventario:
-                nombre = producto["nombre"]
-                precio = producto["precio"]
-                cantidad = producto["cantidad"]
-                
-                # Crear la línea CSV
-                linea = f"{nombre},{precio},{cantidad}\n"
-                archivo.write(linea)
-        
+        escribir_csv(inventario, ruta, incluir_header)
         print(f"\n Inventario guardado en: {ruta}")
         return True
     
@@ -47,76 +80,1022 @@ def guardar_csv(inventario, ruta, incluir_header=True):
         return False
 
 
-def cargar_csv(ruta):
+def escribir_csv(inventario, ruta, incluir_header=True):
     """
-    Carga productos desde un archivo CSV.
+    Escribe el inventario en un archivo CSV sin mostrar mensajes.
+    
+    Las filas se escriben por lotes a un archivo temporal con un buffer
+    grande. Al terminar se fuerza la escritura a disco (fsync) y el
+    temporal se renombra al nombre final, así nunca queda un archivo a
+    medio escribir aunque el programa se cierre de golpe.
+    Los nombres con comas o comillas se escriben entre comillas, como
+    en el formato CSV estándar; los saltos de línea dentro de un nombre
+    se cambian por espacios (el CSV se lee línea por línea). Si el
+    nombre termina en .gz, .bz2, .xz o .zst el archivo se guarda
+    comprimido (ver COMPRESIONES).
     
     Parámetros:
+    - inventario: lista de productos (o cualquier iterable de productos)
     - ruta: nombre/ruta del archivo CSV (str)
+    - incluir_header: si se incluye encabezado (bool)
     
-    Retorna: lista de productos cargados (puede estar vacía si hubo muchos errores)
+    Retorna: cuántos productos se escribieron.
+    Si algo falla lanza la excepción (y no deja archivos temporales).
     """
-    productos = []
+    # Archivo temporal en la misma carpeta (el renombrado debe ser en el mismo disco)
+    ruta_temporal = nombre_temporal(ruta)
+    escritos = 0
+    
+    # La compresión se elige por el nombre final ("inventario.csv.gz")
+    compresion = compresion_por_nombre(ruta)
+    _comprobar_compresion(compresion)
+    
+    try:
+        # Abrir el archivo temporal en modo escritura (al salir del with
+        # los datos ya están en el disco, ver _abrir_para_escribir)
+        with _abrir_para_escribir(ruta_temporal, compresion, ruta) as archivo:
+            
+            # Escribir encabezado si se solicita
+            if incluir_header:
+                archivo.write(ENCABEZADO + "\n")
+            
+            # Escribir los productos por lotes: cada lote es un solo texto
+            productos = iter(inventario)
+            while True:
+                lote = list(islice(productos, TAMANO_LOTE))
+                if not lote:
+                    break
+                archivo.write(_formatear_lote(lote))
+                escritos += len(lote)
+        
+        # Mantener los permisos del archivo anterior, si existía
+        if os.path.exists(ruta):
+            shutil.copymode(ruta, ruta_temporal)
+        
+        # Reemplazar el archivo final de una sola vez
+        os.replace(ruta_temporal, ruta)
+    
+    except BaseException:
+        _borrar_temporal(ruta_temporal)
+        raise
+    
+    _sincronizar_carpeta(ruta)
+    
+    # El archivo completo ya tiene todo: los cambios guardados aparte
+    # para la versión anterior no deben aplicarse sobre este
+    try:
+        os.remove(ruta + SUFIJO_DELTA)
+    except FileNotFoundError:
+        pass
+    
+    return escritos
+
+
+def _formatear_lote(productos):
+    """
+    Convierte un lote de productos en las líneas CSV correspondientes.
+    
+    Retorna: un solo texto con todas las líneas del lote
+    """
+    texto = "".join([
+        f"{p['nombre']},{p['precio']},{p['cantidad']}\n" for p in productos
+    ])
+    
+    # Caso normal: ningún nombre tiene comas, comillas ni saltos de línea
+    # (hay exactamente 2 comas y 1 salto por producto)
+    if texto.count(",") == 2 * len(productos) and \
+       texto.count("\n") == len(productos) and \
+       '"' not in texto and "\r" not in texto:
+        return texto
+    
+    # Algún nombre necesita comillas: se formatea fila por fila
+    lineas = []
+    for producto in productos:
+        nombre = producto["nombre"]
+        
+        # Un salto de línea partiría la fila en dos al volver a leerla
+        if '\n' in nombre or '\r' in nombre:
+            nombre = nombre.replace("\r\n", " ").replace("\r", " ").replace("\n", " ")
+        
+        if ',' in nombre or '"' in nombre:
+            nombre = '"' + nombre.replace('"', '""') + '"'
+        
+        lineas.append(f"{nombre},{producto['precio']},{producto['cantidad']}\n")
+    
+    return "".join(lineas)
+
+
+def nombre_temporal(ruta):
+    """
+    Nombre para el archivo temporal de un guardado, en la misma carpeta
+    que 'ruta'. Lleva el número de proceso y de hilo: la compactación
+    del journal guarda en otro hilo y no debe pisar el temporal de un
+    guardado que se hace al mismo tiempo.
+    """
+    return f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _borrar_temporal(ruta_temporal):
+    """Borra el archivo temporal de un guardado que falló"""
+    try:
+        os.remove(ruta_temporal)
+    except OSError:
+        pass
+
+
+def _sincronizar_carpeta(ruta):
+    """
+    Fuerza a disco la carpeta del archivo, para que el renombrado
+    también sobreviva a un corte de luz. En Windows no se puede y se omite.
+    """
+    try:
+        descriptor = os.open(os.path.dirname(os.path.abspath(ruta)), os.O_RDONLY)
+    except OSError:
+        return
+    
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+# ------------------------------------------------------------
+# Archivos comprimidos
+# ------------------------------------------------------------
+#
+# Al guardar, la compresión se elige por la terminación del nombre
+# ("inventario.csv.gz"); al cargar, por los primeros bytes del archivo
+# (aunque el nombre no lo diga). El texto pasa por el compresor de a
+# bloques grandes: nunca se descomprime el archivo entero a disco.
+
+def compresion_por_nombre(ruta):
+    """Compresión que indica la terminación del nombre ("gzip", "bz2", "xz", "zstd"), o None"""
+    nombre = ruta.lower()
+    
+    for compresion, (terminaciones, _) in COMPRESIONES.items():
+        if nombre.endswith(terminaciones):
+            return compresion
+    
+    return None
+
+
+def detectar_compresion(ruta):
+    """
+    Compresión de un archivo según sus primeros bytes (si no se puede
+    leer, según el nombre).
+    
+    Retorna: "gzip", "bz2", "xz", "zstd" o None (texto sin comprimir)
+    """
+    try:
+        with open(ruta, 'rb') as archivo:
+            inicio = archivo.read(8)
+    except OSError:
+        return compresion_por_nombre(ruta)
+    
+    for compresion, (_, firma) in COMPRESIONES.items():
+        if inicio.startswith(firma):
+            return compresion
+    
+    return None
+
+
+def _modulo_opcional(nombre, aviso):
+    """
+    Importa un paquete opcional (NumPy, zstandard) recién cuando se
+    necesita, así importar este módulo no los carga.
+    Lanza ValueError con 'aviso' si no está instalado.
+    """
+    try:
+        return importlib.import_module(nombre)
+    except ImportError:
+        raise ValueError(aviso) from None
+
+
+def _comprobar_compresion(compresion):
+    """Lanza ValueError si la compresión no se puede usar en esta instalación"""
+    if compresion == "zstd":
+        _modulo_opcional("zstandard",
+                         "Los archivos .zst necesitan el paquete zstandard (pip install zstandard)")
+
+
+def _abrir_para_leer(ruta):
+    """Abre un CSV como texto, descomprimiéndolo si hace falta"""
+    compresion = detectar_compresion(ruta)
+    _comprobar_compresion(compresion)
+    
+    if compresion is None:
+        return open(ruta, 'r', encoding='utf-8')
+    
+    if compresion == "gzip":
+        binario = gzip.open(ruta, 'rb')
+    elif compresion == "bz2":
+        binario = bz2.open(ruta, 'rb')
+    elif compresion == "xz":
+        binario = lzma.open(ruta, 'rb')
+    else:
+        import zstandard
+        binario = zstandard.open(ruta, 'rb')
+    
+    return io.TextIOWrapper(binario, encoding='utf-8')
+
+
+@contextlib.contextmanager
+def _abrir_para_escribir(ruta, compresion, nombre_final):
+    """
+    Abre 'ruta' para escribir texto (comprimido si compresion no es None).
+    Al salir del with sin errores, el compresor ya escribió su final y
+    los datos están en el disco (fsync).
+    """
+    with open(ruta, 'wb', buffering=TAMANO_BUFFER_ESCRITURA) as crudo:
+        if compresion is None:
+            archivo = io.TextIOWrapper(crudo, encoding='utf-8')
+        else:
+            archivo = io.TextIOWrapper(_compresor(crudo, compresion, nombre_final),
+                                       encoding='utf-8')
+        
+        yield archivo
+        
+        if compresion is None:
+            archivo.detach()   # Escribe lo pendiente sin cerrar 'crudo'
+        else:
+            archivo.close()    # El compresor escribe su final ('crudo' sigue abierto)
+        
+        # Asegurar que los datos lleguen al disco antes de renombrar
+        crudo.flush()
+        os.fsync(crudo.fileno())
+
+
+def _compresor(crudo, compresion, nombre_final):
+    """Flujo que comprime lo que recibe y lo escribe en 'crudo' (sin cerrarlo al terminar)"""
+    nivel = NIVELES_COMPRESION[compresion]
+    
+    if compresion == "gzip":
+        # El nombre que se anota dentro del .gz es el final, no el del temporal
+        return gzip.GzipFile(filename=os.path.basename(nombre_final), mode='wb',
+                             compresslevel=nivel, fileobj=crudo)
+    if compresion == "bz2":
+        return bz2.BZ2File(crudo, 'wb', compresslevel=nivel)
+    if compresion == "xz":
+        return lzma.LZMAFile(crudo, 'wb', preset=nivel)
+    
+    import zstandard
+    return zstandard.ZstdCompressor(level=nivel).stream_writer(crudo, closefd=False)
+
+
+def _convertir_partes(partes):
+    """
+    Valida las columnas de una fila del CSV ya separadas.
+    
+    Retorna: la tupla (nombre, precio, cantidad), o None si la fila es inválida
+    """
+    # Validar que tenga exactamente 3 columnas
+    if len(partes) != 3:
+        return None
+    
+    try:
+        precio = float(partes[1])
+        cantidad = int(partes[2])
+    except ValueError:
+        # Error al convertir precio o cantidad
+        return None
+    
+    # Validar que precio y cantidad no sean negativos, y que el precio
+    # sea un número de verdad ("nan" o "inf" también los acepta float)
+    if precio < 0 or cantidad < 0 or not math.isfinite(precio):
+        return None
+    
+    return (partes[0], precio, cantidad)
+
+
+def _separar_linea(linea):
+    """Separa una línea por comas (si hay comillas, el nombre puede tener comas)"""
+    if '"' in linea:
+        return next(csv.reader([linea]))
+    return linea.split(',')
+
+
+def _convertir_fila(linea):
+    """
+    Convierte una línea del CSV (ya sin espacios al inicio/final)
+    en un producto.
+    
+    Retorna: el diccionario del producto, o None si la fila es inválida
+    """
+    fila = _convertir_partes(_separar_linea(linea))
+    
+    if fila is None:
+        return None
+    
+    return {
+        "nombre": fila[0],
+        "precio": fila[1],
+        "cantidad": fila[2]
+    }
+
+
+# ------------------------------------------------------------
+# Parsers: convierten un bloque de líneas en columnas
+# ------------------------------------------------------------
+#
+# Todos reciben las líneas tal como salen del archivo (pueden tener
+# espacios o estar vacías) y devuelven
+#   (nombres, precios, cantidades, filas_invalidas)
+# con las columnas de las filas válidas. Los tres aceptan y rechazan
+# exactamente las mismas filas; solo cambia la velocidad.
+
+def _parsear_lineas(lineas):
+    """Parser "filas": valida línea por línea (el más simple, sirve de referencia)"""
+    nombres = []
+    precios = []
+    cantidades = []
     filas_invalidas = 0
     
+    for linea in lineas:
+        linea = linea.strip()
+        
+        # Saltar líneas vacías
+        if linea == "":
+            continue
+        
+        fila = _convertir_partes(_separar_linea(linea))
+        
+        if fila is None:
+            filas_invalidas += 1
+        else:
+            nombres.append(fila[0])
+            precios.append(fila[1])
+            cantidades.append(fila[2])
+    
+    return nombres, precios, cantidades, filas_invalidas
+
+
+def _separar_columnas(lineas):
+    """
+    Separa todas las líneas del bloque de una vez, sin ir línea por línea.
+    
+    - Sin comillas: las líneas con exactamente 2 comas se unen y se
+      cortan con un solo split(","); cada fila ocupa 3 campos seguidos.
+    - Con comillas: se usa csv.reader (hecho en C) con todo el bloque.
+    
+    Retorna: (nombres, precios, cantidades, filas con otra cantidad de
+    columnas), con precios y cantidades todavía como texto, o None si el
+    bloque hay que procesarlo línea por línea
+    """
+    texto = ",".join(lineas)
+    
+    if '"' not in texto:
+        comas = list(map(str.count, lineas, repeat(",")))
+        filas_invalidas = len(lineas) - comas.count(2)
+        
+        if filas_invalidas:
+            texto = ",".join(compress(lineas, map((2).__eq__, comas)))
+        
+        if texto == "":
+            return [], [], [], filas_invalidas
+        
+        campos = texto.split(",")
+        return campos[0::3], campos[1::3], campos[2::3], filas_invalidas
+    
+    try:
+        filas = list(csv.reader(lineas))
+    except csv.Error:
+        return None
+    
+    # Unas comillas sin cerrar hacen que csv.reader junte esa línea con
+    # las siguientes: entonces hay menos filas que líneas
+    if len(filas) != len(lineas):
+        return None
+    
+    completas = [fila for fila in filas if len(fila) == 3]
+    filas_invalidas = len(filas) - len(completas)
+    
+    if not completas:
+        return [], [], [], filas_invalidas
+    
+    nombres, precios, cantidades = zip(*completas)
+    return nombres, precios, cantidades, filas_invalidas
+
+
+def _parsear_lineas_csv(lineas):
+    """
+    Parser "csv": separa el bloque entero de una vez (ver
+    _separar_columnas) y convierte cada columna con map(float, ...) y
+    map(int, ...).
+    
+    Si alguna fila del bloque no se puede convertir o tiene valores no
+    válidos, solo ese bloque se vuelve a validar fila por fila.
+    """
+    lineas = list(filter(None, map(str.strip, lineas)))
+    separado = _separar_columnas(lineas)
+    
+    if separado is None:
+        return _parsear_lineas(lineas)
+    
+    nombres, textos_precio, textos_cantidad, filas_invalidas = separado
+    
+    if not nombres:
+        return [], [], [], filas_invalidas
+    
     try:
-        # Abrir el archivo en modo lectura
-        with open(ruta, 'r', encoding='utf-8') as archivo:
-            lineas = archivo.readlines()
+        precios = list(map(float, textos_precio))
+        cantidades = list(map(int, textos_cantidad))
+    except ValueError:
+        validas = False
+    else:
+        # min() con un NaN en la lista no es confiable: por eso también isfinite
+        validas = (min(precios) >= 0 and min(cantidades) >= 0
+                   and all(map(math.isfinite, precios)))
+    
+    if validas:
+        return list(nombres), precios, cantidades, filas_invalidas
+    
+    return _columnas_de_filas(zip(nombres, textos_precio, textos_cantidad), filas_invalidas)
+
+
+def _parsear_lineas_numpy(lineas):
+    """
+    Parser "numpy": como el parser "csv", pero las filas con precio o
+    cantidad negativos, o precio NaN/infinito, se descartan con máscaras
+    de NumPy sobre la columna entera en vez de revisar fila por fila.
+    """
+    import numpy as np
+    
+    lineas = list(filter(None, map(str.strip, lineas)))
+    separado = _separar_columnas(lineas)
+    
+    if separado is None:
+        return _parsear_lineas(lineas)
+    
+    nombres, textos_precio, textos_cantidad, filas_invalidas = separado
+    
+    if not nombres:
+        return [], [], [], filas_invalidas
+    
+    try:
+        # La conversión de texto la sigue haciendo Python (float/int), así
+        # se aceptan exactamente los mismos números que en los otros parsers
+        precios = np.fromiter(map(float, textos_precio), dtype=np.float64, count=len(nombres))
+        cantidades = np.fromiter(map(int, textos_cantidad), dtype=np.int64, count=len(nombres))
+    except (ValueError, OverflowError):
+        # Texto que no es un número, o una cantidad que no entra en 64 bits
+        return _columnas_de_filas(zip(nombres, textos_precio, textos_cantidad), filas_invalidas)
+    
+    validas = np.isfinite(precios) & (precios >= 0) & (cantidades >= 0)
+    cuantas = int(np.count_nonzero(validas))
+    filas_invalidas += len(nombres) - cuantas
+    
+    if cuantas < len(nombres):
+        nombres = list(compress(nombres, validas.tolist()))
+        precios = precios[validas]
+        cantidades = cantidades[validas]
+    
+    # tolist() devuelve float e int de Python, igual que los otros parsers
+    return list(nombres), precios.tolist(), cantidades.tolist(), filas_invalidas
+
+
+def _columnas_de_filas(filas, filas_invalidas):
+    """Valida fila por fila unas filas de 3 columnas (texto) y las devuelve en columnas"""
+    nombres = []
+    precios = []
+    cantidades = []
+    
+    for partes in filas:
+        fila = _convertir_partes(partes)
+        
+        if fila is None:
+            filas_invalidas += 1
+        else:
+            nombres.append(fila[0])
+            precios.append(fila[1])
+            cantidades.append(fila[2])
+    
+    return nombres, precios, cantidades, filas_invalidas
+
+
+# Parsers disponibles para leer_csv_por_lotes (por nombre)
+PARSERS = {
+    "filas": _parsear_lineas,
+    "csv": _parsear_lineas_csv,
+    "numpy": _parsear_lineas_numpy,
+}
+
+# Parser que se usa si no se indica otro
+PARSER_POR_DEFECTO = "csv"
+
+
+def _elegir_parser(parser):
+    """Devuelve la función del parser con ese nombre. Lanza ValueError si no se puede usar"""
+    if parser not in PARSERS:
+        raise ValueError(f"Parser desconocido: '{parser}' (opciones: {', '.join(PARSERS)})")
+    
+    if parser == "numpy":
+        _modulo_opcional("numpy", "El parser 'numpy' necesita NumPy instalado")
+    
+    return PARSERS[parser]
+
+
+def _leer_bloques_de_lineas(archivo, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Lee un archivo de texto en bloques de tamaño fijo y entrega, por
+    cada bloque, la lista de sus líneas completas, sin cargar el
+    archivo entero en memoria.
+    """
+    resto = ""
+    
+    while True:
+        bloque = archivo.read(tamano_bloque)
+        
+        if bloque == "":
+            break
+        
+        lineas = (resto + bloque).split("\n")
+        
+        # La última parte puede ser una línea incompleta: se guarda
+        # para unirla con el siguiente bloque
+        resto = lineas.pop()
+        
+        if lineas:
+            yield lineas
+    
+    if resto != "":
+        yield [resto]
+
+
+# ------------------------------------------------------------
+# Archivo de cambios (delta)
+# ------------------------------------------------------------
+#
+# Guardar solo lo que cambió: en vez de reescribir todo el CSV, los
+# productos modificados se agregan al final de "<ruta>.delta", una
+# línea JSON por producto, con el mismo formato que journal.py:
+#   ["S", nombre, precio, cantidad]   el producto queda con esos valores
+#   ["D", nombre]                     el producto se eliminó
+#   ["C"]                             el inventario se vació
+# Al leer el CSV (leer_csv_por_lotes) los cambios se aplican solos.
+# escribir_csv escribe el archivo completo y borra el de cambios.
+
+def escribir_delta(registros, ruta):
+    """
+    Agrega registros al final del archivo de cambios de un CSV.
+    
+    Parámetros:
+    - registros: lista de registros (ver formato arriba)
+    - ruta: nombre/ruta del archivo CSV (no el del delta)
+    
+    Retorna: el tamaño del archivo de cambios en bytes
+    """
+    texto = "".join([
+        json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for registro in registros
+    ])
+    
+    with open(ruta + SUFIJO_DELTA, 'ab+') as archivo:
+        # Si una escritura anterior quedó cortada, se empieza en una línea nueva
+        if archivo.seek(0, os.SEEK_END) > 0:
+            archivo.seek(-1, os.SEEK_END)
+            if archivo.read(1) != b"\n":
+                texto = "\n" + texto
+        
+        # Todo en una sola escritura, y a disco antes de seguir
+        archivo.write(texto.encode('utf-8'))
+        archivo.flush()
+        os.fsync(archivo.fileno())
+        return archivo.tell()
+
+
+class _CambiosDelta:
+    """
+    Cambios de un archivo delta, resumidos por producto: solo importa
+    cómo quedó cada uno al final.
+    
+    Se aplican a los productos del CSV mientras se leen: los cambiados
+    se reemplazan en su lugar, los eliminados se saltan y los nuevos se
+    agregan al final (pendientes()). Da lo mismo que aplicar los
+    registros uno por uno en orden.
+    """
+    
+    def __init__(self, ruta_delta):
+        self.vaciar = False     # Hubo un ["C"]: no queda nada del CSV
+        self.finales = {}       # clave -> (nombre, precio, cantidad) o None si se eliminó
+        self.quitados = set()   # claves que se eliminaron en algún momento
+        self.registros = 0
+        
+        with open(ruta_delta, 'r', encoding='utf-8') as archivo:
+            for linea in archivo:
+                try:
+                    registro = json.loads(linea)
+                except ValueError:
+                    # Línea vacía o cortada (el programa se cerró escribiendo)
+                    continue
+                
+                self.registros += 1
+                tipo = registro[0]
+                
+                if tipo == "C":
+                    self.vaciar = True
+                    self.finales.clear()
+                    self.quitados.clear()
+                    continue
+                
+                clave = clave_nombre(registro[1])
+                
+                if tipo == "D":
+                    self.finales[clave] = None
+                    self.quitados.add(clave)
+                elif tipo == "S":
+                    if clave in self.finales and self.finales[clave] is None:
+                        # Vuelve a aparecer después de eliminarse: va al
+                        # final, como un producto nuevo
+                        del self.finales[clave]
+                    self.finales[clave] = tuple(registro[1:4])
+        
+        self._aplicados = set()
+    
+    def aplicar(self, productos):
+        """Aplica los cambios a productos leídos del CSV. Retorna la lista que queda"""
+        if self.vaciar:
+            return []
+        
+        if not self.finales:
+            return productos
+        
+        resultado = []
+        
+        for producto in productos:
+            clave = clave_nombre(producto["nombre"])
+            
+            if clave not in self.finales or clave in self._aplicados:
+                resultado.append(producto)
+            elif clave not in self.quitados:
+                # Cambió: queda en su lugar con los valores nuevos
+                nombre, precio, cantidad = self.finales[clave]
+                resultado.append({"nombre": nombre, "precio": precio, "cantidad": cantidad})
+                self._aplicados.add(clave)
+            else:
+                # Se eliminó (si se volvió a agregar, aparece en pendientes())
+                self._aplicados.add(clave)
+        
+        return resultado
+    
+    def pendientes(self):
+        """Productos que se agregan al final (nuevos, o eliminados y vueltos a agregar)"""
+        return [
+            {"nombre": valores[0], "precio": valores[1], "cantidad": valores[2]}
+            for clave, valores in self.finales.items()
+            if valores is not None and (clave in self.quitados or clave not in self._aplicados)
+        ]
+
+
+class ErrorFormatoCSV(ValueError):
+    """El archivo no es un CSV de inventario válido (vacío o encabezado incorrecto)"""
+
+
+def leer_csv_por_lotes(ruta, tamano_lote=TAMANO_LOTE, resumen=None, parser=PARSER_POR_DEFECTO):
+    """
+    Lee productos desde un archivo CSV poco a poco (generador), sin
+    mostrar mensajes.
+    
+    Lee el archivo en bloques y entrega listas de hasta 'tamano_lote'
+    productos válidos, así la memoria usada no depende del tamaño
+    del archivo. Si junto al CSV hay un archivo de cambios
+    ("<ruta>.delta", ver escribir_delta), los productos se entregan con
+    esos cambios ya aplicados. El archivo puede estar comprimido (gzip,
+    bz2, xz o zstd): se reconoce por sus primeros bytes.
+    
+    Parámetros:
+    - ruta: nombre/ruta del archivo CSV (str)
+    - tamano_lote: máximo de productos por lote (int)
+    - resumen: diccionario opcional donde se anotan "productos",
+      "filas_invalidas", "cambios" (registros del archivo delta) y
+      "encabezado" (el encabezado encontrado)
+    - parser: cómo se convierte cada bloque (ver PARSERS): "csv" (por
+      defecto), "numpy" (si está instalado) o "filas" (línea por línea).
+      Todos dan el mismo resultado.
+    
+    Retorna (en cada paso): una lista de productos.
+    Lanza ErrorFormatoCSV si el archivo está vacío o el encabezado no
+    es el esperado, ValueError si el parser o la compresión no se pueden
+    usar, y las excepciones normales de archivo (no existe, etc.).
+    """
+    parsear = _elegir_parser(parser)
+    
+    if resumen is None:
+        resumen = {}
+    
+    resumen["productos"] = 0
+    resumen["filas_invalidas"] = 0
+    resumen["cambios"] = 0
+    
+    # Abrir el archivo en modo lectura (si está comprimido se descomprime al leer)
+    with _abrir_para_leer(ruta) as archivo:
+        bloques = _leer_bloques_de_lineas(archivo)
+        
+        # La primera línea del primer bloque es el encabezado
+        lineas = next(bloques, None)
         
         # Verificar que el archivo no esté vacío
-        if len(lineas) == 0:
-            print("\n Error: El archivo está vacío")
-            return None
+        if lineas is None:
+            raise ErrorFormatoCSV("El archivo está vacío")
         
-        # Leer la primera línea como encabezado
-        encabezado = lineas[0].strip()
+        resumen["encabezado"] = lineas[0].strip()
         
         # Validar que el encabezado sea correcto
-        if encabezado != "nombre,precio,cantidad":
-            print("\n Error: El archivo no tiene el formato correcto")
-            print(f"   Se esperaba: nombre,precio,cantidad")
-            print(f"   Se encontró: {encabezado}")
-            return None
-        
-        # Procesar cada línea después del encabezado
-        for i in range(1, len(lineas)):
-            linea = lineas[i].strip()
+        if resumen["encabezado"] != ENCABEZADO:
+            raise ErrorFormatoCSV("El archivo no tiene el formato correcto")
+        
+        # Cambios guardados aparte desde la última vez que se escribió el CSV
+        cambios = None
+        if os.path.exists(ruta + SUFIJO_DELTA):
+            cambios = _CambiosDelta(ruta + SUFIJO_DELTA)
+            resumen["cambios"] = cambios.registros
+        
+        lineas = lineas[1:]
+        lote = []
+        
+        while lineas is not None:
+            nombres, precios, cantidades, filas_invalidas = parsear(lineas)
+            resumen["filas_invalidas"] += filas_invalidas
             
-            # Saltar líneas vacías
-            if linea == "":
-                continue
+            productos = [
+                {"nombre": nombre, "precio": precio, "cantidad": cantidad}
+                for nombre, precio, cantidad in zip(nombres, precios, cantidades)
+            ]
+            if cambios is not None:
+                productos = cambios.aplicar(productos)
+            lote.extend(productos)
             
-            # Separar la línea por comas
-            partes = linea.split(',')
+            # Entregar los lotes que ya se llenaron
+            inicio = 0
+            while len(lote) - inicio >= tamano_lote:
+                resumen["productos"] += tamano_lote
+                yield lote[inicio:inicio + tamano_lote]
+                inicio += tamano_lote
             
-            # Validar que tenga exactamente 3 columnas
-            if len(partes) != 3:
-                filas_invalidas += 1
-                continue
+            if inicio > 0:
+                lote = lote[inicio:]
             
-            try:
-                nombre = partes[0]
-                precio = float(partes[1])
-                cantidad = int(partes[2])
-                
-                # Validar que precio y cantidad no sean negativos
-                if precio < 0 or cantidad < 0:
-                    filas_invalidas += 1
-                    continue
-                
-                # Crear el producto y agregarlo a la lista
-                producto = {
-                    "nombre": nombre,
-                    "precio": precio,
-                    "cantidad": cantidad
-                }
-                productos.append(producto)
+            lineas = next(bloques, None)
+        
+        # Productos agregados después de escribir el CSV
+        if cambios is not None:
+            lote.extend(cambios.pendientes())
+        
+        for inicio in range(0, len(lote), tamano_lote):
+            parte = lote[inicio:inicio + tamano_lote]
+            resumen["productos"] += len(parte)
+            yield parte
+
+
+def cargar_csv_por_lotes(ruta, tamano_lote=TAMANO_LOTE, resumen=None):
+    """
+    Carga productos desde un archivo CSV poco a poco (generador).
+    
+    Igual que leer_csv_por_lotes, pero muestra los mensajes de error y
+    el resumen final como cargar_csv.
+    
+    Parámetros:
+    - ruta: nombre/ruta del archivo CSV (str)
+    - tamano_lote: máximo de productos por lote (int)
+    - resumen: diccionario opcional donde se anotan los resultados:
+      "valido" (False si no se pudo leer el archivo), "productos"
+      y "filas_invalidas"
+    
+    Retorna (en cada paso): una lista de productos
+    """
+    if resumen is None:
+        resumen = {}
+    
+    resumen["valido"] = False
+    
+    try:
+        for lote in leer_csv_por_lotes(ruta, tamano_lote, resumen):
+            resumen["valido"] = True
+            yield lote
+        
+        resumen["valido"] = True
+        
+        # Mostrar resumen
+        print(f"\n Archivo leído correctamente")
+        print(f"   Productos cargados: {resumen['productos']}")
+        if resumen["cambios"] > 0:
+            print(f"   Cambios aplicados desde {ruta}{SUFIJO_DELTA}: {resumen['cambios']}")
+        if resumen["filas_invalidas"] > 0:
+            print(f"     Filas inválidas omitidas: {resumen['filas_invalidas']}")
+    
+    except ErrorFormatoCSV as error:
+        print(f"\n Error: {error}")
+        if "encabezado" in resumen and resumen["encabezado"] != ENCABEZADO:
+            print(f"   Se esperaba: {ENCABEZADO}")
+            print(f"   Se encontró: {resumen['encabezado']}")
+        resumen["valido"] = False
+    
+    except FileNotFoundError:
+        print(f"\n Error: El archivo '{ruta}' no existe")
+        resumen["valido"] = False
+    
+    except UnicodeDecodeError:
+        print(f"\n Error: El archivo no tiene el formato de texto correcto")
+        resumen["valido"] = False
+    
+    except Exception as error:
+        print(f"\n Error al leer el archivo: {error}")
+        resumen["valido"] = False
+
+
+def cargar_csv(ruta):
+    """
+    Carga productos desde un archivo CSV.
+    
+    Parámetros:
+    - ruta: nombre/ruta del archivo CSV (str)
+    
+    Retorna: lista de productos cargados (puede estar vacía si hubo muchos errores)
+    o None si no se pudo leer el archivo
+    """
+    productos = []
+    resumen = {}
+    
+    # Reunir todos los lotes en una sola lista
+    for lote in cargar_csv_por_lotes(ruta, resumen=resumen):
+        productos.extend(lote)
+    
+    if not resumen["valido"]:
+        return None
+    
+    return productos
+
+
+# Por debajo de este tamaño no compensa repartir el archivo entre procesos
+TAMANO_MINIMO_PARALELO = 8 * 1024 * 1024
+
+
+def _dividir_en_rangos(archivo, inicio, fin, partes):
+    """
+    Divide los bytes [inicio, fin) de un archivo binario en 'partes' rangos
+    que empiezan y terminan al inicio de una línea.
+    
+    Retorna: lista de tuplas (inicio, fin)
+    """
+    cortes = [inicio]
+    
+    for i in range(1, partes):
+        # Ir a la posición aproximada y avanzar hasta el final de esa línea
+        archivo.seek(inicio + (fin - inicio) * i // partes)
+        archivo.readline()
+        corte = min(archivo.tell(), fin)
+        
+        if corte > cortes[-1]:
+            cortes.append(corte)
+    
+    cortes.append(fin)
+    
+    rangos = []
+    for i in range(len(cortes) - 1):
+        if cortes[i] < cortes[i + 1]:
+            rangos.append((cortes[i], cortes[i + 1]))
+    return rangos
+
+
+def dividir_csv(ruta, partes):
+    """
+    Valida el encabezado de un CSV sin comprimir y divide el resto del
+    archivo en rangos de bytes que empiezan al inicio de una línea, para
+    leerlos por separado (por ejemplo, en varios procesos) con leer_rango_csv.
+    
+    Parámetros:
+    - ruta: nombre/ruta del archivo CSV (str)
+    - partes: en cuántos rangos dividirlo como máximo (int)
+    
+    Retorna: lista de tuplas (inicio, fin), en el orden del archivo
+    Lanza ErrorFormatoCSV si el archivo está vacío o el encabezado no es
+    el esperado, y las excepciones normales de archivo (no existe, etc.).
+    """
+    with open(ruta, 'rb') as archivo:
+        primera = archivo.readline()
+        
+        if primera == b"":
+            raise ErrorFormatoCSV("El archivo está vacío")
+        
+        if primera.decode('utf-8').strip() != ENCABEZADO:
+            raise ErrorFormatoCSV("El archivo no tiene el formato correcto")
+        
+        tamano = os.fstat(archivo.fileno()).st_size
+        return _dividir_en_rangos(archivo, archivo.tell(), tamano, partes)
+
+
+def leer_rango_csv(ruta, inicio, fin, parser=PARSER_POR_DEFECTO):
+    """
+    Lee y valida las filas de un CSV sin comprimir que hay entre los
+    bytes 'inicio' y 'fin' (un rango de dividir_csv).
+    
+    Parámetros:
+    - ruta: nombre/ruta del archivo CSV (str)
+    - inicio, fin: rango de bytes (int)
+    - parser: ver leer_csv_por_lotes
+    
+    Retorna: (nombres, precios, cantidades, filas inválidas)
+    """
+    parsear = _elegir_parser(parser)
+    
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        texto = archivo.read(max(fin - inicio, 0)).decode('utf-8')
+    
+    # Mismos saltos de línea que al leer en modo texto
+    texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+    
+    return parsear(texto.split("\n"))
+
+
+def _parsear_rango(ruta, inicio, fin):
+    """
+    Lee y valida las filas que hay entre los bytes 'inicio' y 'fin'.
+    Se ejecuta en otro proceso, por eso devuelve tuplas (ocupan menos
+    al enviarlas de vuelta) en vez de diccionarios.
+    
+    Retorna: (lista de tuplas (nombre, precio, cantidad), filas inválidas)
+    """
+    nombres, precios, cantidades, filas_invalidas = leer_rango_csv(ruta, inicio, fin)
+    return list(zip(nombres, precios, cantidades)), filas_invalidas
+
+
+def cargar_csv_paralelo(ruta, procesos=None):
+    """
+    Carga productos desde un archivo CSV repartiendo el trabajo entre
+    varios procesos.
+    
+    El archivo se divide en rangos de bytes que empiezan al inicio de
+    una línea y cada proceso valida su rango. Los resultados se unen en
+    el orden del archivo, así que la lista es idéntica a la de cargar_csv.
+    Los archivos pequeños (o comprimidos, o con archivo de cambios) se
+    cargan con cargar_csv directamente.
+    
+    Parámetros:
+    - ruta: nombre/ruta del archivo CSV (str)
+    - procesos: cuántos procesos usar (int); por defecto, uno por núcleo
+    
+    Retorna: lista de productos cargados, o None si no se pudo leer el archivo
+    """
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    
+    try:
+        tamano = os.path.getsize(ruta)
+    except OSError:
+        tamano = 0
+    
+    # Con un archivo de cambios se carga normal (los cambios se aplican en
+    # orden). Un archivo comprimido no se puede partir por bytes
+    if procesos <= 1 or tamano < TAMANO_MINIMO_PARALELO or os.path.exists(ruta + SUFIJO_DELTA) \
+       or detectar_compresion(ruta) is not None:
+        return cargar_csv(ruta)
+    
+    try:
+        with open(ruta, 'rb') as archivo:
+            primera = archivo.readline()
+            
+            # Verificar que el archivo no esté vacío
+            if primera == b"":
+                print("\n Error: El archivo está vacío")
+                return None
             
-            except ValueError:
-                # Error al convertir precio o cantidad
-                filas_invalidas += 1
-                continue
+            encabezado = primera.decode('utf-8').strip()
+            
+            # Validar que el encabezado sea correcto
+            if encabezado != ENCABEZADO:
+                print("\n Error: El archivo no tiene el formato correcto")
+                print(f"   Se esperaba: {ENCABEZADO}")
+                print(f"   Se encontró: {encabezado}")
+                return None
+            
+            rangos = _dividir_en_rangos(archivo, archivo.tell(), tamano, procesos)
+        
+        # Import local: solo se usa aquí y tarda en importarse (así el
+        # programa arranca más rápido)
+        from concurrent.futures import ProcessPoolExecutor
+        
+        productos = []
+        filas_invalidas = 0
+        
+        # map() devuelve los resultados en el mismo orden que los rangos
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            resultados = ejecutor.map(
+                _parsear_rango,
+                [ruta] * len(rangos),
+                [inicio for inicio, fin in rangos],
+                [fin for inicio, fin in rangos]
+            )
+            
+            for filas, invalidas in resultados:
+                filas_invalidas += invalidas
+                for nombre, precio, cantidad in filas:
+                    productos.append({
+                        "nombre": nombre,
+                        "precio": precio,
+                        "cantidad": cantidad
+                    })
         
         # Mostrar resumen
         print(f"\n Archivo leído correctamente")
@@ -145,28 +1124,268 @@ def fusionar_inventarios(inventario_actual, productos_nuevos):
     Política: Si el nombre existe, suma la cantidad y actualiza el precio.
     
     Parámetros:
-    - inventario_actual: lista de productos existentes
+    - inventario_actual: lista de productos existentes o Inventario
     - productos_nuevos: lista de productos a fusionar
     
-    Retorna: número de productos fusionados
+    Retorna: número de productos fusionados (filas cuyo nombre ya existía)
+    """
+    return fusionar_lote(inventario_actual, productos_nuevos)["fusionados"]
+
+
+def fusionar_lote(inventario_actual, productos_nuevos):
     """
-    from servicios import buscar_producto
+    Fusiona un lote completo de productos de una sola pasada.
+    Política: Si el nombre existe, suma la cantidad y actualiza el precio
+    (si se repite dentro del lote, gana el último precio).
     
-    productos_fusionados = 0
+    1. Se agrupan las filas del lote por nombre (sin distinguir mayúsculas),
+       sumando cantidades.
+    2. Cada nombre del lote se cruza con el índice del inventario
+       (o con un índice temporal si el inventario es una lista simple).
     
-    for producto_nuevo in productos_nuevos:
-        nombre = producto_nuevo["nombre"]
-        
-        # Buscar si ya existe
-        producto_existente = buscar_producto(inventario_actual, nombre)
+    Parámetros:
+    - inventario_actual: lista de productos, Inventario o InventarioColumnar
+    - productos_nuevos: lista o generador de productos (diccionarios), o
+      una tupla de columnas (nombres, precios, cantidades)
+    
+    Retorna: diccionario con los conteos:
+    - filas: filas recibidas
+    - duplicados_en_lote: filas cuyo nombre ya había aparecido en el lote
+    - actualizados: productos que ya existían en el inventario
+    - nuevos: productos agregados
+    - fusionados: filas cuyo nombre ya existía (mismo valor que devuelve
+      fusionar_inventarios)
+    """
+    # Paso 1: agrupar el lote por nombre
+    lote = {}   # clave -> [nombre, precio, cantidad]
+    filas = 0
+    
+    for nombre, precio, cantidad in _filas_del_lote(productos_nuevos):
+        filas += 1
+        clave = clave_nombre(nombre)
+        grupo = lote.get(clave)
         
-        if producto_existente:
-            # Ya existe: sumar cantidad y actualizar precio
-            producto_existente["cantidad"] += producto_nuevo["cantidad"]
-            producto_existente["precio"] = producto_nuevo["precio"]
-            productos_fusionados += 1
+        if grupo is None:
+            lote[clave] = [nombre, precio, cantidad]
         else:
-            # No existe: agregar como nuevo
-            inventario_actual.append(producto_nuevo)
+            grupo[1] = precio
+            grupo[2] += cantidad
+    
+    # Paso 2: cruzar con el inventario
+    actualizados = 0
+    nuevos = 0
     
-    return productos_fusionados
\ No newline at end of file
+    if isinstance(inventario_actual, list):
+        # Lista simple: un índice temporal con el primer producto de cada nombre
+        indice = {}
+        for producto in inventario_actual:
+            indice.setdefault(clave_nombre(producto["nombre"]), producto)
+        
+        for clave, (nombre, precio, cantidad) in lote.items():
+            producto_existente = indice.get(clave)
+            
+            if producto_existente is not None:
+                producto_existente["cantidad"] += cantidad
+                producto_existente["precio"] = precio
+                actualizados += 1
+            else:
+                inventario_actual.append({
+                    "nombre": nombre,
+                    "precio": precio,
+                    "cantidad": cantidad
+                })
+                nuevos += 1
+    
+    else:
+        # Inventario con índice propio: una sola búsqueda por producto
+        fusionar_valores = inventario_actual.fusionar_valores
+        
+        for nombre, precio, cantidad in lote.values():
+            if fusionar_valores(nombre, precio, cantidad):
+                actualizados += 1
+            else:
+                nuevos += 1
+    
+    return {
+        "filas": filas,
+        "duplicados_en_lote": filas - len(lote),
+        "actualizados": actualizados,
+        "nuevos": nuevos,
+        "fusionados": filas - nuevos
+    }
+
+
+def _filas_del_lote(productos_nuevos):
+    """Recorre el lote como tuplas (nombre, precio, cantidad), venga como venga"""
+    # Tupla de columnas: (nombres, precios, cantidades)
+    if isinstance(productos_nuevos, tuple) and len(productos_nuevos) == 3 and \
+       not isinstance(productos_nuevos[0], dict):
+        return zip(*productos_nuevos)
+    
+    return ((p["nombre"], p["precio"], p["cantidad"]) for p in productos_nuevos)
+
+
+def _es_nombre_csv(ruta):
+    """Indica si el nombre termina en .csv (también .csv.gz, .csv.bz2, etc.)"""
+    nombre = ruta.lower()
+    compresion = compresion_por_nombre(nombre)
+    
+    if compresion is not None:
+        for terminacion in COMPRESIONES[compresion][0]:
+            if nombre.endswith(terminacion):
+                nombre = nombre[:-len(terminacion)]
+                break
+    
+    return nombre.endswith(".csv")
+
+
+def listar_archivos_csv(origen):
+    """
+    Archivos CSV que hay que importar, en el orden en que se fusionan.
+    
+    Parámetros:
+    - origen: una carpeta (se toman sus archivos .csv, comprimidos o no),
+      un patrón como "proveedores/*.csv" o un solo archivo
+    
+    Retorna: lista de rutas ordenada por nombre (siempre el mismo orden,
+    así el resultado de la fusión no depende de quién termina primero).
+    Los archivos de cambios (.delta) y temporales nunca se incluyen.
+    """
+    if os.path.isdir(origen):
+        rutas = [os.path.join(origen, nombre) for nombre in os.listdir(origen)]
+    elif glob.has_magic(origen):
+        rutas = glob.glob(origen)
+    else:
+        return [origen]
+    
+    return sorted(ruta for ruta in rutas if os.path.isfile(ruta) and _es_nombre_csv(ruta))
+
+
+def _leer_archivo_importado(ruta):
+    """
+    Lee y valida un archivo completo con las reglas de leer_csv_por_lotes
+    (se ejecuta en otro proceso).
+    
+    Retorna: (columnas (nombres, precios, cantidades) o None, datos del archivo)
+    """
+    datos = {"ruta": ruta, "valido": False, "productos": 0, "filas_invalidas": 0,
+             "cambios": 0, "error": None}
+    resumen = {}
+    nombres, precios, cantidades = [], [], []
+    inicio = time.perf_counter()
+    
+    try:
+        for lote in leer_csv_por_lotes(ruta, resumen=resumen):
+            for producto in lote:
+                nombres.append(producto["nombre"])
+                precios.append(producto["precio"])
+                cantidades.append(producto["cantidad"])
+        
+        datos["valido"] = True
+    
+    except FileNotFoundError:
+        datos["error"] = f"El archivo '{ruta}' no existe"
+    
+    except UnicodeDecodeError:
+        datos["error"] = "El archivo no tiene el formato de texto correcto"
+    
+    except Exception as error:
+        datos["error"] = str(error)
+    
+    for clave in ("productos", "filas_invalidas", "cambios"):
+        datos[clave] = resumen.get(clave, 0)
+    datos["segundos"] = time.perf_counter() - inicio
+    
+    if not datos["valido"]:
+        datos["productos"] = 0
+        return None, datos
+    
+    return (nombres, precios, cantidades), datos
+
+
+def importar_archivos(inventario_actual, origen, procesos=None):
+    """
+    Fusiona varios archivos CSV con el inventario, leyéndolos a la vez.
+    
+    Cada archivo se lee y valida en un proceso aparte (mismas reglas que
+    cargar_csv). Los resultados se fusionan con fusionar_lote de a un
+    archivo, siempre en el orden de listar_archivos_csv: si un producto
+    aparece en varios archivos se suman las cantidades y queda el precio
+    del último archivo, termine de leerse primero el que termine. Mientras
+    se fusiona un archivo, los procesos ya están leyendo los siguientes.
+    
+    Un archivo que no se puede leer (no existe, encabezado incorrecto...)
+    se salta y queda anotado; los demás se fusionan igual. No muestra
+    mensajes.
+    
+    Parámetros:
+    - inventario_actual: lista de productos, Inventario, Transaccion, etc.
+    - origen: carpeta, patrón o archivo (ver listar_archivos_csv)
+    - procesos: cuántos archivos leer a la vez (int); por defecto, uno
+      por núcleo. Con 1 se leen uno tras otro sin crear procesos.
+    
+    Retorna: diccionario con:
+    - archivos: una entrada por archivo, en orden, con "ruta", "valido",
+      "productos" (filas válidas), "filas_invalidas", "cambios" (del
+      .delta), "error" (None si se leyó bien) y "segundos" (lectura)
+    - fusion: la suma de los conteos de fusionar_lote de cada archivo
+    - productos, filas_invalidas: totales de todos los archivos
+    - segundos: tiempo total, de la primera lectura a la última fusión
+    """
+    inicio = time.perf_counter()
+    rutas = listar_archivos_csv(origen)
+    
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    procesos = max(1, min(procesos, len(rutas)))
+    
+    resultado = {
+        "archivos": [],
+        "fusion": {"filas": 0, "duplicados_en_lote": 0, "actualizados": 0,
+                   "nuevos": 0, "fusionados": 0},
+        "productos": 0,
+        "filas_invalidas": 0,
+    }
+    
+    def fusionar(columnas, datos):
+        resultado["archivos"].append(datos)
+        resultado["productos"] += datos["productos"]
+        resultado["filas_invalidas"] += datos["filas_invalidas"]
+        
+        if columnas is not None:
+            conteos = fusionar_lote(inventario_actual, columnas)
+            for clave in resultado["fusion"]:
+                resultado["fusion"][clave] += conteos[clave]
+    
+    if procesos == 1:
+        for ruta in rutas:
+            fusionar(*_leer_archivo_importado(ruta))
+    
+    else:
+        # Import local: solo se usa aquí y tarda en importarse
+        from concurrent.futures import ProcessPoolExecutor
+        
+        # map() entrega los resultados en el orden de las rutas, cada uno
+        # apenas está listo: se fusiona mientras se leen los siguientes
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            for columnas, datos in ejecutor.map(_leer_archivo_importado, rutas):
+                fusionar(columnas, datos)
+    
+    resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+# Medición opcional de todas las funciones públicas (ver instrumentacion.py);
+# si no está activada no cambia nada. Los elementos son filas leídas,
+# productos fusionados o filas escritas.
+instrumentar_modulo(globals(), elementos={
+    "escribir_csv": por_resultado,
+    "escribir_delta": por_largo_del_argumento(0, "registros"),
+    "leer_csv_por_lotes": por_largo,
+    "cargar_csv_por_lotes": por_largo,
+    "cargar_csv": por_largo,
+    "cargar_csv_paralelo": por_largo,
+    "fusionar_inventarios": por_largo_del_argumento(1, "productos_nuevos"),
+    "fusionar_lote": lambda resultado, *args, **kwargs: resultado["filas"],
+    "importar_archivos": lambda resultado, *args, **kwargs: resultado["productos"],
+})
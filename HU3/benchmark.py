@@ -0,0 +1,696 @@
+# benchmark.py
+# Mide el rendimiento de las operaciones del inventario
+#
+# Uso:
+#   python3 benchmark.py                          # 1.000 y 100.000 productos
+#   python3 benchmark.py --tamanos 1000,1000000 --salida resultado.json
+#   python3 benchmark.py --comparar anterior.json # avisa si algo empeoró
+#   python3 benchmark.py --estres --hilos 1,2,4,8  # varios hilos descontando stock
+#   python3 benchmark.py --fragmentos 1,2,4        # inventario repartido en procesos
+#   python3 benchmark.py --arranque                # tiempo hasta el menú y la primera consulta
+#
+# El resultado es un JSON con, para cada tamaño y operación:
+# operaciones por segundo, latencias (p50, p90, p99, máximo) y memoria pico.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from servicios import (agregar_producto, buscar_producto, actualizar_producto,
+                       eliminar_producto, calcular_estadisticas)
+from archivos import (guardar_csv, cargar_csv, escribir_csv, fusionar_inventarios,
+                      leer_csv_por_lotes, COMPRESIONES, PARSERS, np)
+from inventario import Inventario
+from columnar import InventarioColumnar
+from concurrente import InventarioConcurrente
+from diferido import InventarioDiferido, SUFIJO_CACHE, SUFIJO_HUELLA
+from fragmentos import InventarioFragmentado
+from instrumentacion import percentil, resumir_latencias
+
+# Tipos de inventario que se pueden medir
+BACKENDS = {
+    "lista": list,
+    "inventario": Inventario,
+    "columnar": InventarioColumnar,
+}
+
+
+# ============================================================
+# Generadores de datos sintéticos
+# ============================================================
+
+def generar_nombres(tamano, distribucion="secuencial", semilla=0):
+    """
+    Genera 'tamano' nombres de producto distintos.
+
+    Distribuciones:
+    - secuencial: producto-0000001, producto-0000002, ...
+    - aleatoria: letras al azar de 4 a 20 caracteres (largos variados)
+    - prefijos: pocas familias con muchos productos cada una
+      ("tornillo-00017"), como un catálogo real
+    """
+    generador = random.Random(semilla)
+
+    if distribucion == "secuencial":
+        return [f"producto-{i:07d}" for i in range(tamano)]
+
+    if distribucion == "prefijos":
+        familias = ["tornillo", "tuerca", "arandela", "clavo", "perno",
+                    "cable", "tubo", "codo", "llave", "broca"]
+        return [f"{familias[i % len(familias)]}-{i // len(familias):06d}" for i in range(tamano)]
+
+    if distribucion == "aleatoria":
+        nombres = set()
+        while len(nombres) < tamano:
+            largo = generador.randint(4, 20)
+            nombres.add("".join(generador.choices(string.ascii_lowercase, k=largo)))
+        return list(nombres)
+
+    raise ValueError(f"Distribución desconocida: {distribucion}")
+
+
+def generar_productos(nombres, semilla=0):
+    """Crea un producto (diccionario) con precio y cantidad al azar por cada nombre"""
+    generador = random.Random(semilla)
+    return [
+        {
+            "nombre": nombre,
+            "precio": round(generador.uniform(0.5, 5000.0), 2),
+            "cantidad": generador.randint(0, 1000)
+        }
+        for nombre in nombres
+    ]
+
+
+def generar_lote_fusion(nombres_existentes, tamano, proporcion_repetidos, semilla=0):
+    """
+    Crea un lote para fusionar: 'proporcion_repetidos' de las filas usan
+    nombres que ya están en el inventario y el resto son nombres nuevos.
+    """
+    generador = random.Random(semilla)
+    repetidos = int(tamano * proporcion_repetidos)
+
+    nombres = generador.sample(nombres_existentes, min(repetidos, len(nombres_existentes)))
+    nombres += [f"nuevo-{i:07d}" for i in range(tamano - len(nombres))]
+    generador.shuffle(nombres)
+
+    return generar_productos(nombres, semilla + 1)
+
+
+# ============================================================
+# Medición
+# ============================================================
+
+def medir_llamadas(funcion, argumentos):
+    """Llama a funcion(*args) por cada tupla de argumentos y mide cada llamada"""
+    reloj = time.perf_counter_ns
+    latencias = []
+
+    inicio = reloj()
+    for args in argumentos:
+        antes = reloj()
+        funcion(*args)
+        latencias.append(reloj() - antes)
+    total_s = (reloj() - inicio) / 1e9
+
+    return resumir_latencias(latencias, total_s)
+
+
+def medir_memoria_pico(funcion):
+    """Ejecuta funcion() con tracemalloc y devuelve (resultado, bytes pico)"""
+    tracemalloc.start()
+    try:
+        resultado = funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, pico
+
+
+@contextlib.contextmanager
+def en_silencio():
+    """Oculta los mensajes que imprimen las funciones de archivos.py"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# ============================================================
+# Casos de prueba
+# ============================================================
+
+def medir_tamano(tamano, opciones, carpeta):
+    """Mide todas las operaciones para un inventario de 'tamano' productos"""
+    crear = BACKENDS[opciones.backend]
+    generador = random.Random(opciones.semilla)
+    nombres = generar_nombres(tamano, opciones.nombres, opciones.semilla)
+    productos = generar_productos(nombres, opciones.semilla)
+    operaciones = min(opciones.operaciones, tamano)
+    resultados = {}
+
+    # --- agregar_producto: se construye el inventario completo ---
+    inventario = crear()
+    resultados["agregar_producto"] = medir_llamadas(
+        agregar_producto,
+        [(inventario, p["nombre"], p["precio"], p["cantidad"]) for p in productos]
+    )
+    if opciones.memoria:
+        _, pico = medir_memoria_pico(lambda: _construir(crear, productos))
+        resultados["agregar_producto"]["memoria_pico_bytes"] = pico
+
+    # --- buscar_producto: nombres al azar (10% no existen) ---
+    muestra = generador.sample(nombres, operaciones)
+    consultas = [n.upper() if i % 2 else n for i, n in enumerate(muestra)]
+    consultas += [f"no-existe-{i}" for i in range(operaciones // 10)]
+    generador.shuffle(consultas)
+    resultados["buscar_producto"] = medir_llamadas(
+        buscar_producto, [(inventario, n) for n in consultas]
+    )
+
+    # --- actualizar_producto ---
+    resultados["actualizar_producto"] = medir_llamadas(
+        actualizar_producto,
+        [(inventario, n, float(i % 100), i % 50) for i, n in enumerate(muestra)]
+    )
+
+    # --- calcular_estadisticas ---
+    resultados["calcular_estadisticas"] = medir_llamadas(
+        calcular_estadisticas, [(inventario,)] * opciones.repeticiones_estadisticas
+    )
+
+    # --- guardar_csv ---
+    ruta_csv = os.path.join(carpeta, f"inventario_{tamano}.csv")
+    resultados["guardar_csv"] = _medir_bloque(
+        lambda: guardar_csv(inventario, ruta_csv), opciones, tamano
+    )
+
+    # --- cargar_csv ---
+    resultados["cargar_csv"] = _medir_bloque(
+        lambda: cargar_csv(ruta_csv), opciones, tamano
+    )
+
+    # --- guardar y cargar comprimido (y cuánto más chico queda el archivo) ---
+    for compresion in [c.strip() for c in opciones.compresiones.split(",") if c.strip()]:
+        ruta_comprimida = ruta_csv + COMPRESIONES[compresion][0][0]
+        resultados[f"guardar_csv_{compresion}"] = _medir_bloque(
+            lambda: guardar_csv(inventario, ruta_comprimida), opciones, tamano
+        )
+        resultados[f"guardar_csv_{compresion}"]["proporcion_tamano"] = (
+            os.path.getsize(ruta_csv) / os.path.getsize(ruta_comprimida)
+        )
+        resultados[f"cargar_csv_{compresion}"] = _medir_bloque(
+            lambda: cargar_csv(ruta_comprimida), opciones, tamano
+        )
+
+    # --- leer_csv_por_lotes con cada parser (el de NumPy solo si está instalado) ---
+    for parser in PARSERS:
+        if parser == "numpy" and np is None:
+            continue
+        resultados[f"leer_csv_{parser}"] = _medir_bloque(
+            lambda: list(leer_csv_por_lotes(ruta_csv, parser=parser)), opciones, tamano
+        )
+
+    # --- fusionar_inventarios: cada repetición sobre un inventario nuevo ---
+    lote = generar_lote_fusion(nombres, tamano, opciones.repetidos, opciones.semilla)
+    latencias = []
+    for _ in range(opciones.repeticiones):
+        destino = _construir(crear, productos)
+        copia = [dict(p) for p in lote]
+        antes = time.perf_counter_ns()
+        fusionar_inventarios(destino, copia)
+        latencias.append(time.perf_counter_ns() - antes)
+    resultados["fusionar_inventarios"] = resumir_latencias(
+        latencias, sum(latencias) / 1e9, len(lote) * len(latencias)
+    )
+    resultados["fusionar_inventarios"]["proporcion_repetidos"] = opciones.repetidos
+    if opciones.memoria:
+        destino = _construir(crear, productos)
+        _, pico = medir_memoria_pico(lambda: fusionar_inventarios(destino, [dict(p) for p in lote]))
+        resultados["fusionar_inventarios"]["memoria_pico_bytes"] = pico
+
+    # --- eliminar_producto (al final porque vacía parte del inventario) ---
+    resultados["eliminar_producto"] = medir_llamadas(
+        eliminar_producto, [(inventario, n) for n in muestra]
+    )
+
+    return resultados
+
+
+def _construir(crear, productos):
+    """Crea un inventario del tipo pedido con copias de los productos"""
+    inventario = crear()
+    inventario.extend(dict(p) for p in productos)
+    return inventario
+
+
+def _medir_bloque(funcion, opciones, elementos):
+    """Mide una operación que procesa todo el inventario de una vez"""
+    latencias = []
+    with en_silencio():
+        for _ in range(opciones.repeticiones):
+            antes = time.perf_counter_ns()
+            funcion()
+            latencias.append(time.perf_counter_ns() - antes)
+
+        resultado = resumir_latencias(latencias, sum(latencias) / 1e9, elementos * len(latencias))
+
+        if opciones.memoria:
+            _, resultado["memoria_pico_bytes"] = medir_memoria_pico(funcion)
+
+    return resultado
+
+
+# ============================================================
+# Prueba de estrés con varios hilos
+# ============================================================
+
+def medir_concurrencia(hilos, productos, operaciones, semilla=0):
+    """
+    Varios hilos descuentan stock a la vez de un InventarioConcurrente:
+    la mitad con ajustar_cantidad() y la otra mitad leyendo y
+    confirmando con comparar_y_cambiar() (reintentando si otro hilo
+    se adelantó).
+
+    Al final se comprueba que no se perdió ninguna venta: el stock
+    total tiene que haber bajado exactamente lo que se vendió.
+
+    Retorna: resumen de la medición (operaciones por segundo, latencias,
+             ventas, reintentos y ventas perdidas)
+    """
+    nombres = generar_nombres(productos, semilla=semilla)
+    stock_inicial = operaciones  # alcanza aunque todas las ventas caigan en un producto
+    inventario = InventarioConcurrente(
+        {"nombre": nombre, "precio": 1.0, "cantidad": stock_inicial} for nombre in nombres
+    )
+
+    por_hilo = operaciones // hilos
+    latencias = []
+    ventas = [0] * hilos
+    reintentos = [0] * hilos
+    largada = threading.Barrier(hilos + 1)
+
+    def trabajar(numero):
+        azar = random.Random(semilla + numero)
+        elegidos = [azar.choice(nombres) for _ in range(por_hilo)]
+        mias = []
+        reloj = time.perf_counter_ns
+        largada.wait()
+
+        for nombre in elegidos:
+            antes = reloj()
+            if numero % 2 == 0:
+                if inventario.ajustar_cantidad(nombre, -1) is not None:
+                    ventas[numero] += 1
+            else:
+                while True:
+                    actual = inventario.buscar(nombre)["cantidad"]
+                    if actual == 0:
+                        break
+                    if inventario.comparar_y_cambiar(nombre, actual, actual - 1):
+                        ventas[numero] += 1
+                        break
+                    reintentos[numero] += 1
+            mias.append(reloj() - antes)
+
+        latencias.extend(mias)
+
+    trabajadores = [threading.Thread(target=trabajar, args=(numero,)) for numero in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+
+    largada.wait()
+    inicio = time.perf_counter()
+    for trabajador in trabajadores:
+        trabajador.join()
+    segundos = time.perf_counter() - inicio
+
+    vendidas = sum(ventas)
+    stock_final = sum(producto["cantidad"] for producto in inventario)
+
+    resultado = resumir_latencias(latencias, segundos)
+    resultado.update({
+        "hilos": hilos,
+        "ventas": vendidas,
+        "reintentos": sum(reintentos),
+        "ventas_perdidas": stock_inicial * productos - vendidas - stock_final,
+    })
+    return resultado
+
+
+def ejecutar_estres(opciones):
+    """Corre la prueba de estrés para cada cantidad de hilos"""
+    resultados = {}
+
+    for hilos in [int(h) for h in opciones.hilos.split(",") if h.strip()]:
+        print(f"Prueba de estrés con {hilos} hilos...", file=sys.stderr)
+        resultados[f"{hilos} hilos"] = {
+            "ajustar_cantidad": medir_concurrencia(hilos, opciones.productos_estres,
+                                                   opciones.operaciones, opciones.semilla)
+        }
+
+    return resultados
+
+
+# ============================================================
+# Inventario repartido en varios procesos
+# ============================================================
+
+def medir_fragmentos(fragmentos, productos, lote, ruta_csv, opciones):
+    """
+    Mide las operaciones de InventarioFragmentado con 'fragmentos'
+    procesos: cargas y fusiones grandes, estadísticas y búsquedas sueltas.
+    Comparando los resultados de 1, 2, 4... fragmentos se ve cuánto
+    escala con los núcleos.
+    """
+    generador = random.Random(opciones.semilla)
+    resultados = {}
+
+    with InventarioFragmentado(fragmentos) as inventario:
+        # --- extend: el coordinador reparte, los fragmentos agregan ---
+        resultados["extend"] = _medir_repetido(
+            lambda: inventario.extend(productos), inventario.clear, opciones, len(productos)
+        )
+
+        # --- cargar_csv: cada fragmento lee un tramo del archivo y reparte las filas ---
+        resultados["cargar_csv"] = _medir_repetido(
+            lambda: inventario.cargar_csv(ruta_csv), None, opciones, len(productos)
+        )
+
+        # --- fusionar_lote: cada repetición sobre el inventario recién cargado ---
+        resultados["fusionar_lote"] = _medir_repetido(
+            lambda: inventario.fusionar_lote(lote), lambda: inventario.cargar_csv(ruta_csv),
+            opciones, len(lote)
+        )
+
+        # --- calcular_estadisticas: se combinan las de cada fragmento ---
+        resultados["calcular_estadisticas"] = medir_llamadas(
+            calcular_estadisticas, [(inventario,)] * opciones.repeticiones_estadisticas
+        )
+
+        # --- buscar_producto: un viaje de ida y vuelta a un fragmento ---
+        muestra = generador.sample(productos, min(opciones.operaciones, len(productos)))
+        resultados["buscar_producto"] = medir_llamadas(
+            buscar_producto, [(inventario, p["nombre"]) for p in muestra]
+        )
+
+    for resultado in resultados.values():
+        resultado["fragmentos"] = fragmentos
+    return resultados
+
+
+def _medir_repetido(funcion, preparar, opciones, elementos):
+    """Mide funcion() varias veces; preparar() (si no es None) se corre antes de cada una sin medirla"""
+    latencias = []
+    for _ in range(opciones.repeticiones):
+        if preparar is not None:
+            preparar()
+        antes = time.perf_counter_ns()
+        funcion()
+        latencias.append(time.perf_counter_ns() - antes)
+
+    return resumir_latencias(latencias, sum(latencias) / 1e9, elementos * len(latencias))
+
+
+def ejecutar_fragmentos(opciones):
+    """Mide InventarioFragmentado con cada cantidad de fragmentos"""
+    nombres = generar_nombres(opciones.productos_fragmentos, opciones.nombres, opciones.semilla)
+    productos = generar_productos(nombres, opciones.semilla)
+    lote = generar_lote_fusion(nombres, len(nombres), opciones.repetidos, opciones.semilla)
+    carpeta = tempfile.mkdtemp(prefix="benchmark_inventario_")
+    resultados = {}
+
+    try:
+        ruta_csv = os.path.join(carpeta, "inventario.csv")
+        escribir_csv(productos, ruta_csv)
+
+        for fragmentos in [int(f) for f in opciones.fragmentos.split(",") if f.strip()]:
+            print(f"Midiendo {fragmentos} fragmentos...", file=sys.stderr)
+            resultados[f"{fragmentos} fragmentos"] = medir_fragmentos(
+                fragmentos, productos, lote, ruta_csv, opciones
+            )
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+    # Aceleración de cada operación respecto de la primera cantidad medida
+    base = next(iter(resultados.values()), {})
+    for operaciones in resultados.values():
+        for operacion, datos in operaciones.items():
+            referencia = base[operacion]["elementos_por_segundo"]
+            if referencia and datos["elementos_por_segundo"]:
+                datos["aceleracion"] = datos["elementos_por_segundo"] / referencia
+
+    return resultados
+
+
+# ============================================================
+# Arranque del programa
+# ============================================================
+
+def medir_primer_menu(ruta_ultimo):
+    """
+    Ejecuta app.py en otro proceso, con 'ruta_ultimo' como archivo del
+    último inventario, y mide cuánto tarda en pedir la primera opción.
+    Retorna: nanosegundos hasta que aparece el menú
+    """
+    entorno = dict(os.environ, INVENTARIO_ULTIMO=ruta_ultimo)
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+
+    antes = time.perf_counter_ns()
+    proceso = subprocess.Popen([sys.executable, os.path.join(carpeta, "app.py")], cwd=carpeta,
+                               env=entorno, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    # input() escribe el texto pendiente antes de esperar la respuesta
+    leido = b""
+    while b"Selecciona una opci" not in leido:
+        parte = os.read(proceso.stdout.fileno(), 65536)
+        if not parte:
+            break
+        leido += parte
+    duracion = time.perf_counter_ns() - antes
+
+    proceso.communicate(b"9\n")
+    return duracion
+
+
+def medir_arranque(productos, ruta_csv, ruta_ultimo, opciones):
+    """
+    Mide lo que tarda el programa en estar listo con un inventario grande
+    guardado: importar app.py, mostrar el menú y responder la primera
+    consulta (con la copia binaria al día y sin ella) y el primer cambio.
+    """
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    nombre = random.Random(opciones.semilla).choice(productos)["nombre"]
+    resultados = {}
+
+    def correr(codigo):
+        subprocess.run([sys.executable, "-c", codigo], cwd=carpeta, check=True)
+
+    # --- importar: Python solo, y Python importando app.py ---
+    resultados["python_vacio"] = _medir_repetido(lambda: correr("pass"), None, opciones, 1)
+    resultados["importar_app"] = _medir_repetido(lambda: correr("import app"), None, opciones, 1)
+
+    # --- primer menú: hasta que app.py pide la opción (no lee el CSV) ---
+    latencias = [medir_primer_menu(ruta_ultimo) for _ in range(opciones.repeticiones)]
+    resultados["primer_menu"] = resumir_latencias(latencias, sum(latencias) / 1e9)
+
+    def primera_consulta():
+        inventario = InventarioDiferido(ruta_csv)
+        buscar_producto(inventario, nombre)
+        calcular_estadisticas(inventario)
+        inventario.cerrar()
+
+    def borrar_cache():
+        for ruta in (ruta_csv + SUFIJO_CACHE, ruta_csv + SUFIJO_CACHE + SUFIJO_HUELLA):
+            if os.path.exists(ruta):
+                os.remove(ruta)
+
+    with en_silencio():
+        # --- primera consulta sin copia binaria: lee el CSV y la arma ---
+        resultados["primera_consulta_sin_cache"] = _medir_repetido(
+            primera_consulta, borrar_cache, opciones, len(productos)
+        )
+
+        # --- primera consulta con la copia al día: solo abre el archivo binario ---
+        resultados["primera_consulta_con_cache"] = _medir_repetido(
+            primera_consulta, None, opciones, 1
+        )
+
+        # --- primer cambio: pasa la copia a un Inventario normal ---
+        inventarios = []
+
+        def abrir():
+            inventarios.append(InventarioDiferido(ruta_csv))
+            buscar_producto(inventarios[-1], nombre)
+
+        resultados["primer_cambio"] = _medir_repetido(
+            lambda: actualizar_producto(inventarios.pop(), nombre, nueva_cantidad=1),
+            abrir, opciones, len(productos)
+        )
+
+    return resultados
+
+
+def ejecutar_arranque(opciones):
+    """Guarda un inventario de --productos-arranque productos como el último y mide el arranque"""
+    nombres = generar_nombres(opciones.productos_arranque, opciones.nombres, opciones.semilla)
+    productos = generar_productos(nombres, opciones.semilla)
+    carpeta = tempfile.mkdtemp(prefix="benchmark_inventario_")
+
+    try:
+        ruta_csv = os.path.join(carpeta, "inventario.csv")
+        ruta_ultimo = os.path.join(carpeta, "ultimo")
+        escribir_csv(productos, ruta_csv)
+        with open(ruta_ultimo, 'w', encoding='utf-8') as archivo:
+            archivo.write(ruta_csv + "\n")
+
+        print(f"Midiendo el arranque con {len(productos)} productos...", file=sys.stderr)
+        return {str(len(productos)): medir_arranque(productos, ruta_csv, ruta_ultimo, opciones)}
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+# ============================================================
+# Comparación entre ejecuciones
+# ============================================================
+
+def comparar(anterior, actual, tolerancia):
+    """
+    Compara dos resultados y devuelve la lista de operaciones que
+    empeoraron más que 'tolerancia' (0.10 = 10% menos elementos/segundo).
+    """
+    regresiones = []
+
+    for tamano, operaciones in actual["resultados"].items():
+        for operacion, datos in operaciones.items():
+            previo = anterior.get("resultados", {}).get(tamano, {}).get(operacion)
+            if previo is None or not previo.get("elementos_por_segundo"):
+                continue
+
+            cambio = datos["elementos_por_segundo"] / previo["elementos_por_segundo"] - 1
+            if cambio < -tolerancia:
+                regresiones.append({
+                    "tamano": tamano,
+                    "operacion": operacion,
+                    "antes": previo["elementos_por_segundo"],
+                    "ahora": datos["elementos_por_segundo"],
+                    "cambio": cambio,
+                })
+
+    return regresiones
+
+
+# ============================================================
+# Programa principal
+# ============================================================
+
+def leer_opciones(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark del sistema de inventario")
+    parser.add_argument("--tamanos", default="1000,100000",
+                        help="tamaños de inventario separados por comas (ej. 1000,100000,1000000)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="inventario")
+    parser.add_argument("--nombres", choices=["secuencial", "aleatoria", "prefijos"],
+                        default="secuencial", help="distribución de los nombres")
+    parser.add_argument("--repetidos", type=float, default=0.5,
+                        help="proporción de filas del lote de fusión que ya existen (0 a 1)")
+    parser.add_argument("--operaciones", type=int, default=10000,
+                        help="búsquedas/actualizaciones/eliminaciones por tamaño")
+    parser.add_argument("--repeticiones", type=int, default=3,
+                        help="repeticiones de las operaciones de archivo y de fusión")
+    parser.add_argument("--repeticiones-estadisticas", type=int, default=100)
+    parser.add_argument("--compresiones", default="gzip",
+                        help="compresiones a medir al guardar y cargar, separadas por comas "
+                             f"({', '.join(COMPRESIONES)}; vacío = ninguna)")
+    parser.add_argument("--sin-memoria", dest="memoria", action="store_false",
+                        help="no medir la memoria pico (tracemalloc)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="archivo JSON donde guardar el resultado")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.10)
+    parser.add_argument("--estres", action="store_true",
+                        help="en vez de las mediciones por tamaño, prueba varios hilos a la vez")
+    parser.add_argument("--hilos", default="1,2,4,8",
+                        help="cantidades de hilos para --estres, separadas por comas")
+    parser.add_argument("--productos-estres", type=int, default=1000,
+                        help="productos sobre los que se reparten las ventas en --estres")
+    parser.add_argument("--fragmentos",
+                        help="en vez de las mediciones por tamaño, mide el inventario "
+                             "repartido en procesos con estas cantidades (ej. 1,2,4)")
+    parser.add_argument("--productos-fragmentos", type=int, default=200000,
+                        help="productos para --fragmentos")
+    parser.add_argument("--arranque", action="store_true",
+                        help="en vez de las mediciones por tamaño, mide el arranque del programa "
+                             "con un inventario grande guardado")
+    parser.add_argument("--productos-arranque", type=int, default=1000000,
+                        help="productos para --arranque")
+    return parser.parse_args(argumentos)
+
+
+def ejecutar(opciones):
+    """Corre el benchmark completo y devuelve el resultado como diccionario"""
+    if opciones.estres:
+        resultados = ejecutar_estres(opciones)
+    elif opciones.fragmentos:
+        resultados = ejecutar_fragmentos(opciones)
+    elif opciones.arranque:
+        resultados = ejecutar_arranque(opciones)
+    else:
+        resultados = {}
+        tamanos = [int(t) for t in opciones.tamanos.split(",") if t.strip()]
+        carpeta = tempfile.mkdtemp(prefix="benchmark_inventario_")
+
+        try:
+            for tamano in tamanos:
+                print(f"Midiendo {tamano} productos ({opciones.backend})...", file=sys.stderr)
+                resultados[str(tamano)] = medir_tamano(tamano, opciones, carpeta)
+        finally:
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+    return {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "procesador": platform.processor(),
+        "parametros": vars(opciones),
+        "resultados": resultados,
+    }
+
+
+def main(argumentos=None):
+    opciones = leer_opciones(argumentos)
+    resultado = ejecutar(opciones)
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+
+    if opciones.salida:
+        with open(opciones.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto)
+    else:
+        print(texto)
+
+    if opciones.comparar:
+        with open(opciones.comparar, 'r', encoding='utf-8') as archivo:
+            anterior = json.load(archivo)
+
+        regresiones = comparar(anterior, resultado, opciones.tolerancia)
+        for r in regresiones:
+            print(f"REGRESIÓN {r['tamano']} {r['operacion']}: "
+                  f"{r['antes']:.0f} -> {r['ahora']:.0f} elementos/s ({r['cambio']:+.0%})",
+                  file=sys.stderr)
+        if regresiones:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+# busqueda.py
+# Índices para buscar productos por el inicio del nombre o con errores de tipeo
+
+import heapq
+import math
+from itertools import islice
+
+from indices import ListaOrdenada
+from inventario import clave_nombre
+
+
+def trigramas(texto):
+    """
+    Devuelve el conjunto de trigramas (grupos de 3 letras seguidas) del
+    texto. Se agregan espacios al inicio y al final para que las letras
+    de los extremos también cuenten: "pan" -> {"  p", " pa", "pan", "an "}
+    """
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceBusqueda:
+    """
+    Índice de nombres para búsquedas aproximadas. Se conecta al
+    Inventario como observador, así se actualiza solo cuando se agregan
+    o eliminan productos.
+
+    - Búsqueda por prefijo: los nombres en una ListaOrdenada (por
+      bloques, ver indices.py) y bisección: O(log n + k) para k
+      resultados, y agregar o quitar un nombre no mueve toda la lista.
+    - Búsqueda aproximada: un índice trigrama -> nombres. Se cuentan los
+      trigramas compartidos con la consulta y se ordena por similitud
+      (coeficiente de Jaccard).
+
+    Todo trabaja con la clave del nombre (en minúsculas).
+    """
+
+    def __init__(self, productos=()):
+        self._productos = {}       # clave -> lista de productos con ese nombre
+        self._ordenadas = ListaOrdenada()   # claves ordenadas alfabéticamente
+        self._por_trigrama = {}    # trigrama -> conjunto de claves
+
+        # Carga inicial de una sola vez (ordenar al final es más rápido
+        # que insertar en orden uno por uno)
+        for producto in productos:
+            clave = clave_nombre(producto["nombre"])
+            if clave in self._productos:
+                self._productos[clave].append(producto)
+            else:
+                self._productos[clave] = [producto]
+                self._agregar_trigramas(clave)
+
+        self._ordenadas = ListaOrdenada(self._productos)
+
+    # ------------------------------------------------------------
+    # Avisos del inventario
+    # ------------------------------------------------------------
+
+    def al_agregar(self, producto):
+        clave = clave_nombre(producto["nombre"])
+
+        if clave in self._productos:
+            self._productos[clave].append(producto)
+            return
+
+        self._productos[clave] = [producto]
+        self._ordenadas.agregar(clave)
+        self._agregar_trigramas(clave)
+
+    def al_actualizar(self, producto, precio_anterior, cantidad_anterior):
+        # El nombre no cambia, así que el índice tampoco
+        pass
+
+    def al_eliminar(self, producto):
+        clave = clave_nombre(producto["nombre"])
+        lista = self._productos[clave]
+
+        for posicion, otro in enumerate(lista):
+            if otro is producto:
+                del lista[posicion]
+                break
+
+        if lista:
+            return
+
+        # Era el último producto con ese nombre: sale de los índices
+        del self._productos[clave]
+        self._ordenadas.quitar(clave)
+
+        for trigrama in trigramas(clave):
+            claves = self._por_trigrama[trigrama]
+            claves.discard(clave)
+            if not claves:
+                del self._por_trigrama[trigrama]
+
+    def al_vaciar(self):
+        self.__init__()
+
+    # ------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------
+
+    def por_prefijo(self, prefijo, limite=10):
+        """
+        Productos cuyo nombre empieza con 'prefijo' (sin distinguir
+        mayúsculas), en orden alfabético.
+
+        Retorna: lista de hasta 'limite' productos
+        """
+        prefijo = clave_nombre(prefijo)
+        resultados = []
+
+        for clave in islice(self._ordenadas.entre(prefijo), limite):
+            if not clave.startswith(prefijo):
+                break
+            resultados.append(self._productos[clave][0])
+
+        return resultados
+
+    def similares(self, texto, limite=10, similitud_minima=0.3):
+        """
+        Productos con nombre parecido a 'texto', aunque tenga errores
+        de tipeo.
+
+        Retorna: lista de hasta 'limite' tuplas (producto, similitud),
+        de la más parecida a la menos (similitud entre 0 y 1)
+        """
+        consulta = trigramas(clave_nombre(texto))
+
+        # Para llegar a la similitud mínima un nombre tiene que compartir
+        # al menos 'necesarios' trigramas con la consulta. Entonces está
+        # sí o sí en alguna de las (total - necesarios + 1) listas más
+        # cortas: solo esas se recorren enteras para juntar candidatos,
+        # en las demás solo se pregunta por los candidatos ya juntados.
+        necesarios = max(1, math.ceil(similitud_minima * len(consulta)))
+        listas = sorted(
+            (self._por_trigrama.get(trigrama, ()) for trigrama in consulta),
+            key=len
+        )
+        cortas = listas[:len(listas) - necesarios + 1]
+        largas = listas[len(listas) - necesarios + 1:]
+
+        # Contar cuántos trigramas comparte cada nombre con la consulta
+        compartidos = {}
+        for claves in cortas:
+            for clave in claves:
+                compartidos[clave] = compartidos.get(clave, 0) + 1
+
+        for claves in largas:
+            for clave in compartidos:
+                if clave in claves:
+                    compartidos[clave] += 1
+
+        # Similitud de Jaccard: compartidos / (total de trigramas distintos)
+        candidatos = []
+        for clave, en_comun in compartidos.items():
+            if en_comun < necesarios:
+                continue
+            similitud = en_comun / (len(consulta) + len(trigramas(clave)) - en_comun)
+            if similitud >= similitud_minima:
+                candidatos.append((similitud, clave))
+
+        mejores = heapq.nlargest(limite, candidatos)
+        return [(self._productos[clave][0], similitud) for similitud, clave in mejores]
+
+    def __len__(self):
+        return len(self._ordenadas)
+
+    # ------------------------------------------------------------
+    # Funciones internas
+    # ------------------------------------------------------------
+
+    def _agregar_trigramas(self, clave):
+        for trigrama in trigramas(clave):
+            claves = self._por_trigrama.get(trigrama)
+            if claves is None:
+                self._por_trigrama[trigrama] = {clave}
+            else:
+                claves.add(clave)
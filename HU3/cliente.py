@@ -0,0 +1,210 @@
+# cliente.py
+# Cliente del servicio de inventario (servidor.py) y generador de carga
+#
+# Uso como generador de carga (el resultado se imprime en JSON):
+#   python3 cliente.py --puerto 8765 --clientes 8 --operaciones 20000
+#   python3 cliente.py --servidor-local        (levanta el servicio en este mismo proceso)
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmark import generar_nombres
+from instrumentacion import resumir_latencias
+from servidor import PUERTO, ServidorInventario
+
+
+# Largo máximo de una respuesta (un lote grande puede ocupar varios MB)
+LIMITE_RESPUESTA = 64 * 1024 * 1024
+
+
+class ErrorServidor(RuntimeError):
+    """El servicio respondió con un error"""
+
+
+class ClienteInventario:
+    """
+    Conexión a un ServidorInventario.
+
+    pedir() manda un pedido y espera su respuesta; pedir_varios() manda
+    muchos seguidos y después lee todas las respuestas (mucho más rápido
+    que uno por uno, porque no se espera al servidor entre pedido y pedido).
+    """
+
+    def __init__(self, lector, escritor):
+        self._lector = lector
+        self._escritor = escritor
+        self._siguiente_id = 0
+
+    @classmethod
+    async def conectar(cls, host="127.0.0.1", puerto=PUERTO):
+        lector, escritor = await asyncio.open_connection(host, puerto, limit=LIMITE_RESPUESTA)
+        return cls(lector, escritor)
+
+    async def pedir(self, op, **datos):
+        """
+        Manda un pedido y devuelve su resultado.
+        Lanza ErrorServidor si el servicio respondió con un error.
+        """
+        respuesta, = await self.pedir_varios([dict(datos, op=op)])
+
+        if not respuesta["ok"]:
+            raise ErrorServidor(respuesta["error"])
+
+        return respuesta["resultado"]
+
+    async def pedir_varios(self, pedidos):
+        """
+        Manda varios pedidos seguidos y devuelve la lista de respuestas
+        (diccionarios con "ok" y "resultado" o "error"), en el mismo orden.
+        """
+        lineas = []
+        for pedido in pedidos:
+            self._siguiente_id += 1
+            pedido = dict(pedido, id=self._siguiente_id)
+            lineas.append(json.dumps(pedido, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+        self._escritor.write("".join(lineas).encode("utf-8"))
+        await self._escritor.drain()
+
+        respuestas = []
+        for _ in pedidos:
+            linea = await self._lector.readline()
+            if not linea:
+                raise ConnectionError("El servicio cerró la conexión")
+            respuestas.append(json.loads(linea))
+
+        return respuestas
+
+    async def cerrar(self):
+        self._escritor.close()
+        await self._escritor.wait_closed()
+
+
+def generar_pedidos(nombres, cantidad, proporcion_escrituras, semilla):
+    """
+    Mezcla de pedidos al azar: búsquedas, estadísticas y (según la
+    proporción indicada) actualizaciones y altas de productos.
+    """
+    azar = random.Random(semilla)
+    pedidos = []
+
+    for _ in range(cantidad):
+        nombre = azar.choice(nombres)
+
+        if azar.random() < proporcion_escrituras:
+            if azar.random() < 0.8:
+                pedidos.append({"op": "update", "nombre": nombre, "cantidad": azar.randint(0, 1000)})
+            else:
+                pedidos.append({"op": "add", "nombre": nombre + "-nuevo",
+                                "precio": round(azar.uniform(1, 500), 2),
+                                "cantidad": azar.randint(0, 1000)})
+        elif azar.random() < 0.95:
+            pedidos.append({"op": "search", "nombre": nombre})
+        else:
+            pedidos.append({"op": "stats"})
+
+    return pedidos
+
+
+async def generar_carga(host, puerto, clientes=8, operaciones=20000, por_envio=50,
+                        proporcion_escrituras=0.2, productos=10000):
+    """
+    Conecta varios clientes a la vez y mide cuántas operaciones por
+    segundo atiende el servicio.
+
+    Parámetros:
+    - clientes: conexiones simultáneas
+    - operaciones: total de pedidos (se reparten entre los clientes)
+    - por_envio: pedidos que cada cliente manda juntos antes de leer las respuestas
+    - proporcion_escrituras: fracción de pedidos que modifican el inventario
+    - productos: productos que se cargan antes de medir
+
+    Retorna: diccionario con el resultado (se puede pasar a JSON)
+    """
+    nombres = generar_nombres(productos, "aleatoria")
+
+    # Cargar los productos iniciales
+    cliente = await ClienteInventario.conectar(host, puerto)
+    for inicio in range(0, len(nombres), 1000):
+        await cliente.pedir("batch", ops=[
+            {"op": "add", "nombre": nombre, "precio": 10.0, "cantidad": 100}
+            for nombre in nombres[inicio:inicio + 1000]
+        ])
+    await cliente.cerrar()
+
+    conexiones = [await ClienteInventario.conectar(host, puerto) for _ in range(clientes)]
+    por_cliente = operaciones // clientes
+    latencias = []
+    errores = 0
+
+    async def trabajar(numero, conexion):
+        nonlocal errores
+        pedidos = generar_pedidos(nombres, por_cliente, proporcion_escrituras, semilla=numero)
+
+        for inicio in range(0, len(pedidos), por_envio):
+            antes = time.perf_counter_ns()
+            respuestas = await conexion.pedir_varios(pedidos[inicio:inicio + por_envio])
+            latencias.append(time.perf_counter_ns() - antes)
+            errores += sum(1 for respuesta in respuestas if not respuesta["ok"])
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajar(numero, conexion) for numero, conexion in enumerate(conexiones)))
+    segundos = time.perf_counter() - inicio
+
+    for conexion in conexiones:
+        await conexion.cerrar()
+
+    resultado = resumir_latencias(latencias, segundos, elementos=por_cliente * clientes)
+    resultado["operaciones_por_segundo"] = resultado.pop("elementos_por_segundo")
+    resultado["latencia_por_envio_us"] = resultado.pop("latencia_us")
+    resultado.update({
+        "clientes": clientes,
+        "pedidos_por_envio": por_envio,
+        "proporcion_escrituras": proporcion_escrituras,
+        "errores": errores,
+    })
+    return resultado
+
+
+async def _ejecutar(opciones):
+    servidor = None
+
+    if opciones.servidor_local:
+        # Servicio en este mismo proceso, en un puerto libre
+        servidor = await ServidorInventario().iniciar(opciones.host, 0)
+        opciones.puerto = servidor.sockets[0].getsockname()[1]
+
+    try:
+        return await generar_carga(opciones.host, opciones.puerto, opciones.clientes,
+                                   opciones.operaciones, opciones.por_envio,
+                                   opciones.escrituras, opciones.productos)
+    finally:
+        if servidor is not None:
+            servidor.close()
+            await servidor.wait_closed()
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Generador de carga para el servicio de inventario")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--servidor-local", action="store_true",
+                        help="levanta el servicio en este proceso (para probar sin otra terminal)")
+    parser.add_argument("--clientes", type=int, default=8)
+    parser.add_argument("--operaciones", type=int, default=20000)
+    parser.add_argument("--por-envio", type=int, default=50,
+                        help="pedidos que se mandan juntos antes de esperar respuestas")
+    parser.add_argument("--escrituras", type=float, default=0.2,
+                        help="fracción de pedidos que modifican el inventario")
+    parser.add_argument("--productos", type=int, default=10000)
+    opciones = parser.parse_args(argumentos)
+
+    resultado = asyncio.run(_ejecutar(opciones))
+    print(json.dumps(resultado, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
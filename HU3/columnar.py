@@ -0,0 +1,422 @@
+# columnar.py
+# Inventario compacto guardado por columnas (para millones de productos)
+
+import functools
+import operator
+import sys
+from array import array
+
+from inventario import clave_nombre, CRITERIOS_ORDEN, MINIMO_COMPACTAR, PROPORCION_COMPACTAR
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """
+    NumPy es opcional: si está instalado se usa para las sumas. Se
+    importa recién al calcular estadísticas, no al importar el módulo
+    (y se busca una sola vez).
+    Retorna: el módulo, o None si no está instalado
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class InventarioColumnar:
+    """
+    Inventario que guarda los datos en columnas en vez de un diccionario
+    por producto:
+    - nombres: lista de textos internados (sys.intern)
+    - precios: array('d') de números decimales
+    - cantidades: array('q') de enteros
+
+    Ocupa mucha menos memoria que la lista de diccionarios y las
+    estadísticas se calculan con sumas sobre los arrays (con NumPy si
+    está disponible).
+
+    Tiene las mismas operaciones que Inventario (agregar, buscar,
+    actualizar, eliminar, fusionar, estadisticas) y se usa igual con las
+    funciones de servicios.py. La diferencia es que buscar() y recorrer
+    el inventario devuelven diccionarios nuevos: modificarlos no cambia
+    el inventario (hay que usar actualizar()). Tampoco admite observadores.
+    """
+
+    def __init__(self, productos=None):
+        self._nombres = []             # None = producto eliminado
+        self._precios = array('d')
+        self._cantidades = array('q')
+        self._indice = {}              # clave -> posición
+        self._repetidos = {}           # clave -> cuántos productos extra con ese nombre
+        self._huecos = 0
+        self._version = 0              # Aumenta con cada cambio
+        self._ordenes = {}             # (criterio, descendente) -> posiciones ordenadas
+        self._version_ordenes = 0
+
+        if productos is not None:
+            self.extend(productos)
+
+    @classmethod
+    def desde_columnas(cls, nombres, precios, cantidades):
+        """
+        Crea el inventario directamente a partir de tres columnas
+        (listas o arrays del mismo largo), sin pasar por diccionarios.
+        """
+        inventario = cls()
+        inventario._precios = array('d', precios)
+        inventario._cantidades = array('q', cantidades)
+
+        for nombre in nombres:
+            inventario._agregar_nombre(nombre)
+
+        return inventario
+
+    # ------------------------------------------------------------
+    # Operaciones (mismas que Inventario)
+    # ------------------------------------------------------------
+
+    def agregar(self, nombre, precio, cantidad):
+        """Agrega un producto nuevo y lo devuelve como diccionario"""
+        self._precios.append(precio)
+        self._cantidades.append(cantidad)
+        self._agregar_nombre(nombre)
+        return self._producto(len(self._nombres) - 1)
+
+    def buscar(self, nombre, ocurrencia=0):
+        """
+        Devuelve una copia del producto con ese nombre, o None.
+        Con nombres repetidos, 'ocurrencia' elige cuál (0 = el primero)
+        """
+        posicion = self._posicion(nombre, ocurrencia)
+
+        if posicion is None:
+            return None
+
+        return self._producto(posicion)
+
+    def actualizar(self, nombre, nuevo_precio=None, nueva_cantidad=None, ocurrencia=0):
+        """
+        Actualiza precio y/o cantidad. Retorna False si no existe.
+        Con nombres repetidos, 'ocurrencia' elige cuál (0 = el primero)
+        """
+        posicion = self._posicion(nombre, ocurrencia)
+
+        if posicion is None:
+            return False
+
+        if nuevo_precio is not None:
+            self._precios[posicion] = nuevo_precio
+
+        if nueva_cantidad is not None:
+            self._cantidades[posicion] = nueva_cantidad
+
+        self._version += 1
+        return True
+
+    def eliminar(self, nombre, ocurrencia=0):
+        """
+        Elimina el producto con ese nombre. Retorna False si no existe.
+        Con nombres repetidos, 'ocurrencia' elige cuál (0 = el primero)
+        """
+        posicion = self._posicion(nombre, ocurrencia)
+
+        if posicion is None:
+            return False
+
+        self._quitar_posicion(posicion)
+        self._compactar_si_hace_falta()
+        return True
+
+    def eliminar_varios(self, nombres):
+        """Elimina varios productos por nombre. Retorna cuántos se eliminaron"""
+        eliminados = 0
+
+        for nombre in nombres:
+            posicion = self._indice.get(clave_nombre(nombre))
+
+            if posicion is not None:
+                self._quitar_posicion(posicion)
+                eliminados += 1
+
+        self._compactar_si_hace_falta()
+        return eliminados
+
+    def fusionar(self, producto_nuevo):
+        """
+        Si el producto ya existe suma la cantidad y actualiza el precio;
+        si no existe lo agrega.
+
+        Retorna: True si el producto ya existía, False si se agregó
+        """
+        return self.fusionar_valores(producto_nuevo["nombre"], producto_nuevo["precio"],
+                                     producto_nuevo["cantidad"])
+
+    def fusionar_valores(self, nombre, precio, cantidad):
+        """Igual que fusionar(), pero recibe los valores sueltos"""
+        posicion = self._indice.get(clave_nombre(nombre))
+
+        if posicion is None:
+            self._precios.append(precio)
+            self._cantidades.append(cantidad)
+            self._agregar_nombre(nombre)
+            return False
+
+        self._cantidades[posicion] += cantidad
+        self._precios[posicion] = precio
+        self._version += 1
+        return True
+
+    def repeticiones(self, nombre):
+        """Cuántos productos tienen ese nombre (sin distinguir mayúsculas)"""
+        clave = clave_nombre(nombre)
+
+        if clave not in self._indice:
+            return 0
+
+        return 1 + self._repetidos.get(clave, 0)
+
+    def estadisticas(self):
+        """
+        Calcula las estadísticas con sumas sobre las columnas.
+        Mismo formato que servicios.calcular_estadisticas.
+        """
+        if len(self) == 0:
+            return None
+
+        # Los huecos tienen precio 0 y cantidad 0, así que no alteran las sumas
+        np = _numpy()
+        if np is not None:
+            precios = np.frombuffer(self._precios, dtype=np.float64)
+            cantidades = np.frombuffer(self._cantidades, dtype=np.int64)
+            unidades_totales = int(cantidades.sum())
+            valor_total = float(np.dot(precios, cantidades))
+        else:
+            unidades_totales = sum(self._cantidades)
+            valor_total = sum(map(operator.mul, self._precios, self._cantidades))
+
+        mas_caro = self._posicion_maxima(self._precios)
+        mayor_stock = self._posicion_maxima(self._cantidades)
+
+        return {
+            "unidades_totales": unidades_totales,
+            "valor_total": valor_total,
+            "producto_mas_caro": (self._nombres[mas_caro], self._precios[mas_caro]),
+            "producto_mayor_stock": (self._nombres[mayor_stock], self._cantidades[mayor_stock])
+        }
+
+    def productos_ordenados(self, criterio, inicio=0, fin=None, descendente=False):
+        """
+        Devuelve los productos ordenados por 'criterio' (ver
+        inventario.CRITERIOS_ORDEN), solo los que van de 'inicio' a 'fin'.
+
+        Se guarda un array con las posiciones ordenadas y se reutiliza
+        mientras el inventario no cambie; solo se arman los diccionarios
+        de los productos pedidos.
+        """
+        if criterio not in CRITERIOS_ORDEN:
+            raise KeyError(criterio)
+
+        if self._version_ordenes != self._version:
+            self._ordenes.clear()
+            self._version_ordenes = self._version
+
+        posiciones = self._ordenes.get((criterio, descendente))
+
+        if posiciones is None:
+            nombres, precios, cantidades = self._nombres, self._precios, self._cantidades
+            valores = {
+                "nombre": lambda i: clave_nombre(nombres[i]),
+                "precio": precios.__getitem__,
+                "cantidad": cantidades.__getitem__,
+                "subtotal": lambda i: precios[i] * cantidades[i],
+            }
+            vivos = [i for i, nombre in enumerate(nombres) if nombre is not None]
+            posiciones = array('q', sorted(vivos, key=valores[criterio], reverse=descendente))
+            self._ordenes[(criterio, descendente)] = posiciones
+
+        return [self._producto(i) for i in posiciones[inicio:fin]]
+
+    # ------------------------------------------------------------
+    # Métodos de lista, para que el código existente siga funcionando
+    # ------------------------------------------------------------
+
+    def append(self, producto):
+        """Agrega un producto (diccionario) al final"""
+        self.agregar(producto["nombre"], producto["precio"], producto["cantidad"])
+
+    def extend(self, productos):
+        """Agrega varios productos (diccionarios) al final"""
+        for producto in productos:
+            self.append(producto)
+
+    def remove(self, producto):
+        """Elimina el primer producto igual al indicado (como list.remove)"""
+        for posicion in range(len(self._nombres)):
+            if self._nombres[posicion] is not None and self._producto(posicion) == producto:
+                self._quitar_posicion(posicion)
+                self._compactar_si_hace_falta()
+                return
+
+        raise ValueError("El producto no está en el inventario")
+
+    def clear(self):
+        """Vacía el inventario"""
+        self.__init__()
+
+    def compactar(self):
+        """Quita los huecos de las columnas y recalcula el índice"""
+        if self._huecos == 0:
+            return
+
+        vivos = [i for i, nombre in enumerate(self._nombres) if nombre is not None]
+
+        self._precios = array('d', [self._precios[i] for i in vivos])
+        self._cantidades = array('q', [self._cantidades[i] for i in vivos])
+        nombres = [self._nombres[i] for i in vivos]
+
+        self._nombres = []
+        self._indice.clear()
+        self._repetidos.clear()
+        self._huecos = 0
+        self._version += 1
+
+        for nombre in nombres:
+            self._agregar_nombre(nombre)
+
+    def memoria_aproximada(self):
+        """Bytes que ocupan las columnas y los nombres (aproximado)"""
+        total = sys.getsizeof(self._nombres) + sys.getsizeof(self._indice)
+        total += self._precios.itemsize * len(self._precios)
+        total += self._cantidades.itemsize * len(self._cantidades)
+
+        for nombre in self._nombres:
+            if nombre is not None:
+                total += sys.getsizeof(nombre)
+
+        return total
+
+    def __len__(self):
+        return len(self._nombres) - self._huecos
+
+    def __iter__(self):
+        for posicion, nombre in enumerate(self._nombres):
+            if nombre is not None:
+                yield self._producto(posicion)
+
+    def __getitem__(self, posicion):
+        # Las posiciones solo tienen sentido sin huecos
+        self.compactar()
+
+        if isinstance(posicion, slice):
+            return [self._producto(i) for i in range(len(self._nombres))[posicion]]
+
+        if posicion < 0:
+            posicion += len(self._nombres)
+        if not 0 <= posicion < len(self._nombres):
+            raise IndexError("Posición fuera del inventario")
+
+        return self._producto(posicion)
+
+    def __repr__(self):
+        return f"InventarioColumnar({len(self)} productos)"
+
+    # ------------------------------------------------------------
+    # Funciones internas
+    # ------------------------------------------------------------
+
+    def _producto(self, posicion):
+        """Arma el diccionario del producto que está en esa posición"""
+        return {
+            "nombre": self._nombres[posicion],
+            "precio": self._precios[posicion],
+            "cantidad": self._cantidades[posicion]
+        }
+
+    def _posicion(self, nombre, ocurrencia=0):
+        """Posición del producto número 'ocurrencia' con ese nombre, o None"""
+        clave = clave_nombre(nombre)
+        posicion = self._indice.get(clave)
+
+        if posicion is None or ocurrencia == 0:
+            return posicion
+
+        # Los repetidos siempre están después del primero
+        for siguiente in range(posicion + 1, len(self._nombres)):
+            otro = self._nombres[siguiente]
+            if otro is not None and clave_nombre(otro) == clave:
+                ocurrencia -= 1
+                if ocurrencia == 0:
+                    return siguiente
+
+        return None
+
+    def _agregar_nombre(self, nombre):
+        """Agrega el nombre al final y lo registra en el índice"""
+        nombre = sys.intern(nombre)
+        clave = clave_nombre(nombre)
+
+        if clave in self._indice:
+            self._repetidos[clave] = self._repetidos.get(clave, 0) + 1
+        else:
+            self._indice[clave] = len(self._nombres)
+
+        self._nombres.append(nombre)
+        self._version += 1
+
+    def _quitar_posicion(self, posicion):
+        """Deja un hueco (nombre None, precio y cantidad 0) en esa posición"""
+        nombre = self._nombres[posicion]
+        self._nombres[posicion] = None
+        self._precios[posicion] = 0.0
+        self._cantidades[posicion] = 0
+        self._huecos += 1
+        self._version += 1
+
+        clave = clave_nombre(nombre)
+
+        if self._indice.get(clave) != posicion:
+            # Era uno de los repetidos, el índice no cambia
+            self._descontar_repetido(clave)
+            return
+
+        if clave not in self._repetidos:
+            del self._indice[clave]
+            return
+
+        # Había repetidos: el siguiente con ese nombre pasa al índice
+        for siguiente in range(posicion + 1, len(self._nombres)):
+            otro = self._nombres[siguiente]
+            if otro is not None and clave_nombre(otro) == clave:
+                self._indice[clave] = siguiente
+                break
+        self._descontar_repetido(clave)
+
+    def _descontar_repetido(self, clave):
+        """Resta uno al contador de nombres repetidos"""
+        if self._repetidos[clave] == 1:
+            del self._repetidos[clave]
+        else:
+            self._repetidos[clave] -= 1
+
+    def _compactar_si_hace_falta(self):
+        """Compacta cuando hay demasiados huecos"""
+        if self._huecos >= MINIMO_COMPACTAR and \
+           self._huecos > len(self._nombres) * PROPORCION_COMPACTAR:
+            self.compactar()
+
+    def _posicion_maxima(self, columna):
+        """
+        Posición del primer producto con el mayor valor de la columna.
+        max() e index() recorren el array en C, sin bucles de Python.
+        """
+        mayor = max(columna)
+        posicion = columna.index(mayor)
+
+        # Un hueco vale 0: si ganó un hueco, buscar el primer producto real
+        if self._nombres[posicion] is None:
+            for posicion in range(posicion + 1, len(self._nombres)):
+                if self._nombres[posicion] is not None and columna[posicion] == mayor:
+                    break
+
+        return posicion
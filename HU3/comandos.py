@@ -0,0 +1,252 @@
+# comandos.py
+# Modo por lotes: ejecuta una lista de comandos sin menú ni preguntas
+#
+# Cada línea es un comando con sus datos separados por comas (formato CSV,
+# así que un nombre con comas va entre comillas):
+#
+#   add,nombre,precio,cantidad        (o agregar)
+#   update,nombre,precio,cantidad     (o actualizar; vacío = no cambiar)
+#   delete,nombre                     (o eliminar)
+#   load,archivo.csv                  (o cargar; reemplaza el inventario)
+#   merge,archivo.csv                 (o fusionar; suma al inventario)
+#   import,carpeta[,procesos]         (o importar; fusiona todos los CSV de
+#                                      una carpeta o de un patrón como
+#                                      proveedores/*.csv, ver importar_archivos)
+#   save,archivo.csv                  (o guardar)
+#   stats                             (o estadisticas)
+#
+# Las líneas vacías y las que empiezan con # se ignoran.
+# Al final se obtiene un resumen en JSON.
+#
+# Uso:
+#   python3 app.py --batch comandos.txt
+#   python3 app.py --batch - < comandos.txt
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+from servicios import (agregar_producto, actualizar_producto, eliminar_producto,
+                       calcular_estadisticas)
+from archivos import leer_csv_por_lotes, escribir_csv, fusionar_lote, importar_archivos
+from instrumentacion import desde_entorno, metricas_activas, resumen_metricas
+from inventario import Inventario
+from transacciones import Transaccion
+
+# Cuántos errores se guardan con detalle en el resumen
+MAXIMO_ERRORES_DETALLADOS = 20
+
+
+def _numero_o_nada(texto, convertir):
+    """Convierte el texto con 'convertir', o devuelve None si está vacío"""
+    texto = texto.strip()
+    return convertir(texto) if texto != "" else None
+
+
+def _validar_no_negativo(*valores):
+    """Lanza ValueError si algún valor (que no sea None) es negativo"""
+    for valor in valores:
+        if valor is not None and valor < 0:
+            raise ValueError("El precio y la cantidad deben ser positivos")
+
+
+def _comando_agregar(inventario, datos, resumen):
+    nombre, precio, cantidad = datos
+    nombre = nombre.strip()
+    if nombre == "":
+        raise ValueError("El nombre no puede estar vacío")
+    precio = float(precio)
+    cantidad = int(cantidad)
+    _validar_no_negativo(precio, cantidad)
+    agregar_producto(inventario, nombre, precio, cantidad)
+
+
+def _comando_actualizar(inventario, datos, resumen):
+    nombre, precio, cantidad = datos
+    nuevo_precio = _numero_o_nada(precio, float)
+    nueva_cantidad = _numero_o_nada(cantidad, int)
+    _validar_no_negativo(nuevo_precio, nueva_cantidad)
+    if not actualizar_producto(inventario, nombre.strip(), nuevo_precio, nueva_cantidad):
+        raise LookupError(f"No se encontró el producto '{nombre.strip()}'")
+
+
+def _comando_eliminar(inventario, datos, resumen):
+    nombre, = datos
+    if not eliminar_producto(inventario, nombre.strip()):
+        raise LookupError(f"No se encontró el producto '{nombre.strip()}'")
+
+
+def _comando_cargar(inventario, datos, resumen):
+    ruta, = datos
+    resumen["ultima_carga"] = {}
+
+    # Si el archivo tiene un error, el inventario queda como estaba
+    with Transaccion(inventario) as transaccion:
+        transaccion.clear()
+        for lote in leer_csv_por_lotes(ruta.strip(), resumen=resumen["ultima_carga"]):
+            transaccion.extend(lote)
+
+
+def _comando_fusionar(inventario, datos, resumen):
+    ruta, = datos
+    resumen["ultima_carga"] = {}
+    conteos = {"actualizados": 0, "nuevos": 0, "duplicados_en_lote": 0}
+
+    with Transaccion(inventario) as transaccion:
+        for lote in leer_csv_por_lotes(ruta.strip(), resumen=resumen["ultima_carga"]):
+            resultado = fusionar_lote(transaccion, lote)
+            for clave in conteos:
+                conteos[clave] += resultado[clave]
+
+    for clave in conteos:
+        resumen["fusion"][clave] += conteos[clave]
+
+
+def _comando_importar(inventario, datos, resumen):
+    origen = datos[0].strip()
+    procesos = _numero_o_nada(datos[1], int) if len(datos) > 1 else None
+
+    # Si algo falla a mitad de la fusión, el inventario queda como estaba
+    with Transaccion(inventario) as transaccion:
+        resultado = importar_archivos(transaccion, origen, procesos)
+
+    resumen["importacion"] = resultado
+    for clave in resumen["fusion"]:
+        resumen["fusion"][clave] += resultado["fusion"][clave]
+
+    if not resultado["archivos"]:
+        raise ValueError(f"No hay archivos CSV en '{origen}'")
+
+    # Los archivos que sí se leyeron ya quedaron fusionados
+    fallidos = [datos["ruta"] for datos in resultado["archivos"] if not datos["valido"]]
+    if fallidos:
+        raise ValueError(f"No se pudieron leer {len(fallidos)} archivos: {', '.join(fallidos)}")
+
+
+def _comando_guardar(inventario, datos, resumen):
+    ruta, = datos
+    escribir_csv(inventario, ruta.strip())
+
+
+def _comando_estadisticas(inventario, datos, resumen):
+    resumen["estadisticas"] = calcular_estadisticas(inventario)
+
+
+# Nombre del comando -> función que lo ejecuta
+COMANDOS = {
+    "add": _comando_agregar,
+    "update": _comando_actualizar,
+    "delete": _comando_eliminar,
+    "load": _comando_cargar,
+    "merge": _comando_fusionar,
+    "import": _comando_importar,
+    "save": _comando_guardar,
+    "stats": _comando_estadisticas,
+}
+
+# Los mismos comandos en español
+COMANDOS.update({
+    "agregar": _comando_agregar,
+    "actualizar": _comando_actualizar,
+    "eliminar": _comando_eliminar,
+    "cargar": _comando_cargar,
+    "fusionar": _comando_fusionar,
+    "importar": _comando_importar,
+    "guardar": _comando_guardar,
+    "estadisticas": _comando_estadisticas,
+})
+
+
+def ejecutar_comandos(lineas, inventario=None):
+    """
+    Ejecuta comandos sobre un inventario en memoria, sin imprimir nada.
+
+    Un comando que falla (datos inválidos, producto que no existe,
+    archivo que no se puede leer) se cuenta como error y se sigue con
+    el siguiente.
+
+    Parámetros:
+    - lineas: cualquier iterable de líneas de texto (archivo, lista, sys.stdin)
+    - inventario: inventario a usar; si no se indica se crea uno vacío
+
+    Retorna: diccionario con el resumen de la ejecución
+    """
+    if inventario is None:
+        inventario = Inventario()
+
+    resumen = {
+        "comandos": 0,
+        "por_tipo": {},
+        "errores": 0,
+        "detalle_errores": [],
+        "fusion": {"actualizados": 0, "nuevos": 0, "duplicados_en_lote": 0},
+        "ultima_carga": {},
+        "estadisticas": None,
+    }
+    por_tipo = resumen["por_tipo"]
+
+    inicio = time.perf_counter()
+
+    for numero, fila in enumerate(csv.reader(lineas), start=1):
+        # Saltar líneas vacías y comentarios
+        if not fila or fila[0].strip() == "" or fila[0].lstrip().startswith("#"):
+            continue
+
+        tipo = fila[0].strip().lower()
+        resumen["comandos"] += 1
+
+        try:
+            funcion = COMANDOS.get(tipo)
+            if funcion is None:
+                raise ValueError(f"Comando desconocido: {tipo}")
+
+            funcion(inventario, fila[1:], resumen)
+            por_tipo[tipo] = por_tipo.get(tipo, 0) + 1
+
+        except (ValueError, LookupError, OSError) as error:
+            resumen["errores"] += 1
+            if len(resumen["detalle_errores"]) < MAXIMO_ERRORES_DETALLADOS:
+                resumen["detalle_errores"].append({"linea": numero, "error": str(error)})
+
+    segundos = time.perf_counter() - inicio
+    resumen["segundos"] = segundos
+    resumen["comandos_por_segundo"] = resumen["comandos"] / segundos if segundos > 0 else None
+    resumen["productos"] = len(inventario)
+
+    return resumen
+
+
+def main(argumentos=None):
+    """Punto de entrada del modo por lotes (ver app.py --batch)"""
+    parser = argparse.ArgumentParser(description="Ejecuta comandos de inventario sin menú")
+    parser.add_argument("--batch", required=True, metavar="ARCHIVO",
+                        help="archivo de comandos, o - para leer de la entrada estándar")
+    parser.add_argument("--salida", help="archivo donde guardar el resumen JSON")
+    opciones = parser.parse_args(argumentos)
+
+    # Perfil y métricas según las variables de entorno (ver instrumentacion.py)
+    with desde_entorno():
+        if opciones.batch == "-":
+            resumen = ejecutar_comandos(sys.stdin)
+        else:
+            with open(opciones.batch, 'r', encoding='utf-8', newline='') as archivo:
+                resumen = ejecutar_comandos(archivo)
+
+    if metricas_activas():
+        resumen["metricas"] = resumen_metricas()
+
+    texto = json.dumps(resumen, ensure_ascii=False, indent=2)
+
+    if opciones.salida:
+        with open(opciones.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto)
+    else:
+        print(texto)
+
+    return 1 if resumen["errores"] > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+# concurrente.py
+# Inventario que se puede usar desde varios hilos a la vez
+
+import contextlib
+import itertools
+import threading
+
+from inventario import clave_nombre
+
+# Cantidad de candados entre los que se reparten los productos
+FRANJAS = 64
+
+
+class InventarioConcurrente:
+    """
+    Inventario seguro para usar desde varios hilos (por ejemplo, varios
+    trabajadores procesando pedidos al mismo tiempo).
+
+    En vez de un solo candado para todo, los productos se reparten entre
+    FRANJAS candados según su nombre: dos hilos que tocan productos
+    distintos casi nunca se esperan entre sí. Leer y cambiar un mismo
+    producto siempre se hace con su candado tomado, así que ningún
+    cambio se pierde (por ejemplo, dos ventas del mismo producto).
+
+    Agregar o eliminar productos cambia el diccionario, y eso usa además
+    un candado general de corta duración.
+
+    Se usa con las mismas funciones de servicios.py. Como en Inventario,
+    puede haber nombres repetidos: buscar, actualizar, eliminar y fusionar
+    usan el primero (o el que indique 'ocurrencia'). Diferencias:
+    - buscar() y recorrerlo devuelven copias: para cambiar un producto
+      hay que usar actualizar(), ajustar_cantidad() o comparar_y_cambiar()
+    - no admite observadores
+    """
+
+    def __init__(self, productos=None, franjas=FRANJAS):
+        self._productos = {}    # número de llegada -> producto (en orden de llegada)
+        self._por_nombre = {}   # clave -> números de llegada con ese nombre
+        self._llegadas = itertools.count()
+        self._candados = [threading.Lock() for _ in range(franjas)]
+        self._estructura = threading.Lock()
+
+        if productos is not None:
+            self.extend(productos)
+
+    # ------------------------------------------------------------
+    # Operaciones (mismas que Inventario)
+    # ------------------------------------------------------------
+
+    def agregar(self, nombre, precio, cantidad):
+        """Agrega un producto (aunque el nombre ya exista) y devuelve una copia"""
+        clave = clave_nombre(nombre)
+        producto = {"nombre": nombre, "precio": precio, "cantidad": cantidad}
+
+        with self._candado(clave), self._estructura:
+            self._guardar(clave, producto)
+
+        return dict(producto)
+
+    def buscar(self, nombre, ocurrencia=0):
+        """
+        Devuelve una copia del producto con ese nombre, o None.
+        Con nombres repetidos, 'ocurrencia' elige cuál (0 = el primero)
+        """
+        clave = clave_nombre(nombre)
+
+        with self._candado(clave):
+            producto = self._producto(clave, ocurrencia)
+            return dict(producto) if producto is not None else None
+
+    def actualizar(self, nombre, nuevo_precio=None, nueva_cantidad=None, ocurrencia=0):
+        """
+        Actualiza precio y/o cantidad. Retorna False si no existe.
+        Con nombres repetidos, 'ocurrencia' elige cuál (0 = el primero)
+        """
+        clave = clave_nombre(nombre)
+
+        with self._candado(clave):
+            producto = self._producto(clave, ocurrencia)
+            if producto is None:
+                return False
+
+            if nuevo_precio is not None:
+                producto["precio"] = nuevo_precio
+            if nueva_cantidad is not None:
+                producto["cantidad"] = nueva_cantidad
+
+        return True
+
+    def eliminar(self, nombre, ocurrencia=0):
+        """
+        Elimina el producto con ese nombre. Retorna False si no existe.
+        Con nombres repetidos, 'ocurrencia' elige cuál (0 = el primero)
+        """
+        clave = clave_nombre(nombre)
+
+        with self._candado(clave), self._estructura:
+            numeros = self._por_nombre.get(clave)
+            if numeros is None or not 0 <= ocurrencia < len(numeros):
+                return False
+
+            del self._productos[numeros.pop(ocurrencia)]
+            if not numeros:
+                del self._por_nombre[clave]
+            return True
+
+    def eliminar_varios(self, nombres):
+        """Elimina varios productos por nombre. Retorna cuántos se eliminaron"""
+        return sum(1 for nombre in nombres if self.eliminar(nombre))
+
+    def fusionar(self, producto_nuevo):
+        """
+        Si el producto ya existe suma la cantidad y actualiza el precio;
+        si no existe lo agrega.
+
+        Retorna: True si el producto ya existía, False si se agregó
+        """
+        return self.fusionar_valores(producto_nuevo["nombre"], producto_nuevo["precio"],
+                                     producto_nuevo["cantidad"])
+
+    def fusionar_valores(self, nombre, precio, cantidad):
+        """Igual que fusionar(), pero recibe los valores sueltos"""
+        clave = clave_nombre(nombre)
+
+        with self._candado(clave):
+            producto = self._producto(clave)
+
+            if producto is not None:
+                producto["cantidad"] += cantidad
+                producto["precio"] = precio
+                return True
+
+            with self._estructura:
+                self._guardar(clave, {"nombre": nombre, "precio": precio, "cantidad": cantidad})
+            return False
+
+    def repeticiones(self, nombre):
+        """Cuántos productos tienen ese nombre (sin distinguir mayúsculas)"""
+        clave = clave_nombre(nombre)
+
+        with self._candado(clave):
+            return len(self._por_nombre.get(clave, ()))
+
+    def estadisticas(self):
+        """
+        Calcula las estadísticas sobre una foto del inventario tomada con
+        todos los candados (nadie cambia nada mientras se copia).
+        Mismo formato que servicios.calcular_estadisticas.
+        """
+        productos = self._foto()
+
+        if not productos:
+            return None
+
+        mas_caro = productos[0]
+        mayor_stock = productos[0]
+        unidades_totales = 0
+        valor_total = 0
+
+        for producto in productos:
+            unidades_totales += producto["cantidad"]
+            valor_total += producto["precio"] * producto["cantidad"]
+            if producto["precio"] > mas_caro["precio"]:
+                mas_caro = producto
+            if producto["cantidad"] > mayor_stock["cantidad"]:
+                mayor_stock = producto
+
+        return {
+            "unidades_totales": unidades_totales,
+            "valor_total": valor_total,
+            "producto_mas_caro": (mas_caro["nombre"], mas_caro["precio"]),
+            "producto_mayor_stock": (mayor_stock["nombre"], mayor_stock["cantidad"])
+        }
+
+    # ------------------------------------------------------------
+    # Cambios atómicos de stock
+    # ------------------------------------------------------------
+
+    def ajustar_cantidad(self, nombre, cambio, minimo=0):
+        """
+        Suma 'cambio' a la cantidad (negativo para descontar) de forma
+        atómica: leer, calcular y guardar pasa con el candado tomado.
+
+        Parámetros:
+        - nombre: producto a ajustar
+        - cambio: unidades a sumar (ej. -3 para una venta de 3 unidades)
+        - minimo: la cantidad nunca queda por debajo de este valor
+
+        Retorna: la cantidad nueva, o None si no alcanza el stock (en ese
+        caso no se cambia nada). Lanza LookupError si el producto no existe.
+        """
+        clave = clave_nombre(nombre)
+
+        with self._candado(clave):
+            producto = self._producto(clave)
+            if producto is None:
+                raise LookupError(f"No se encontró el producto '{nombre}'")
+
+            nueva = producto["cantidad"] + cambio
+            if nueva < minimo:
+                return None
+
+            producto["cantidad"] = nueva
+            return nueva
+
+    def comparar_y_cambiar(self, nombre, cantidad_esperada, cantidad_nueva):
+        """
+        Cambia la cantidad solo si todavía vale 'cantidad_esperada'.
+
+        Sirve para el estilo "leer, calcular sin candado y confirmar":
+        si otro hilo cambió el producto en el medio, devuelve False y se
+        vuelve a intentar con el valor nuevo.
+
+        Retorna: True si se hizo el cambio, False si no (o si no existe)
+        """
+        clave = clave_nombre(nombre)
+
+        with self._candado(clave):
+            producto = self._producto(clave)
+            if producto is None or producto["cantidad"] != cantidad_esperada:
+                return False
+
+            producto["cantidad"] = cantidad_nueva
+            return True
+
+    # ------------------------------------------------------------
+    # Métodos de lista, para que el código existente siga funcionando
+    # ------------------------------------------------------------
+
+    def append(self, producto):
+        """Agrega un producto (diccionario)"""
+        self.agregar(producto["nombre"], producto["precio"], producto["cantidad"])
+
+    def extend(self, productos):
+        """Agrega varios productos (diccionarios)"""
+        for producto in productos:
+            self.append(producto)
+
+    def clear(self):
+        """Vacía el inventario"""
+        with self._todos_los_candados():
+            self._productos.clear()
+            self._por_nombre.clear()
+
+    def __len__(self):
+        return len(self._productos)
+
+    def __iter__(self):
+        # Se recorre una foto: otros hilos pueden seguir cambiando el inventario
+        return iter(self._foto())
+
+    def __getitem__(self, posicion):
+        return self._foto()[posicion]
+
+    def __repr__(self):
+        return f"InventarioConcurrente({len(self)} productos)"
+
+    # ------------------------------------------------------------
+    # Funciones internas
+    # ------------------------------------------------------------
+
+    def _candado(self, clave):
+        """Candado de la franja que le toca a esa clave"""
+        return self._candados[hash(clave) % len(self._candados)]
+
+    def _producto(self, clave, ocurrencia=0):
+        """
+        El producto número 'ocurrencia' con esa clave, o None.
+        Se llama con el candado de la clave tomado.
+        """
+        numeros = self._por_nombre.get(clave)
+
+        if numeros is None or not 0 <= ocurrencia < len(numeros):
+            return None
+
+        return self._productos[numeros[ocurrencia]]
+
+    def _guardar(self, clave, producto):
+        """
+        Agrega el producto al final. Se llama con el candado de la clave
+        y el candado general tomados.
+        """
+        numero = next(self._llegadas)
+        self._productos[numero] = producto
+        self._por_nombre.setdefault(clave, []).append(numero)
+
+    @contextlib.contextmanager
+    def _todos_los_candados(self):
+        """
+        Toma todos los candados. Siempre en el mismo orden (franjas de
+        menor a mayor y al final el general) para que dos hilos nunca
+        queden esperándose mutuamente.
+        """
+        with contextlib.ExitStack() as pila:
+            for candado in self._candados:
+                pila.enter_context(candado)
+            pila.enter_context(self._estructura)
+            yield
+
+    def _foto(self):
+        """Copia de todos los productos, tomada sin cambios en el medio"""
+        with self._todos_los_candados():
+            return [dict(producto) for producto in self._productos.values()]
@@ -0,0 +1,323 @@
+# diferido.py
+# Abrir el último inventario guardado sin cargarlo hasta que se use
+#
+# Archivos que se usan, para "inventario.csv":
+#   inventario.csv              el inventario (con su .delta, ver incremental.py)
+#   inventario.csv.cache        copia en formato binario (ver snapshot.py)
+#   inventario.csv.cache.json   huella: fecha de modificación y tamaño del CSV,
+#                               del delta y de la copia cuando se armó
+#
+# Si la huella coincide con los archivos, las consultas se responden desde
+# la copia binaria (se abre con mmap, sin leer el CSV). Si el CSV o el delta
+# cambiaron, se lee el CSV una vez y se vuelve a armar la copia.
+
+import json
+import os
+
+from archivos import SUFIJO_DELTA, cargar_csv_por_lotes, nombre_temporal
+from inventario import Inventario
+
+# Sufijos de la copia binaria y de su huella
+SUFIJO_CACHE = ".cache"
+SUFIJO_HUELLA = ".json"
+
+# Archivo (en la carpeta del usuario) donde se anota el último inventario guardado
+ARCHIVO_ULTIMO = ".inventario_ultimo"
+
+
+def _archivo_ultimo():
+    """
+    Archivo donde se anota la ruta del último inventario guardado:
+    ~/.inventario_ultimo, o el que indique la variable INVENTARIO_ULTIMO
+    (definida pero vacía, no se anota nada)
+    """
+    archivo_ultimo = os.environ.get("INVENTARIO_ULTIMO")
+
+    if archivo_ultimo is None:
+        return os.path.join(os.path.expanduser("~"), ARCHIVO_ULTIMO)
+
+    return archivo_ultimo.strip()
+
+
+def recordar_ultimo(ruta):
+    """
+    Anota la ruta del inventario para abrirlo al iniciar la próxima vez.
+
+    Parámetros:
+    - ruta: archivo CSV recién guardado (str)
+
+    Retorna: True si se anotó, False si no se pudo o está desactivado
+    (no es un error grave)
+    """
+    archivo_ultimo = _archivo_ultimo()
+    if archivo_ultimo == "":
+        return False
+
+    try:
+        with open(archivo_ultimo, 'w', encoding='utf-8') as archivo:
+            archivo.write(os.path.abspath(ruta) + "\n")
+        return True
+    except OSError:
+        return False
+
+
+def ultimo_inventario():
+    """
+    Retorna: la ruta del último inventario guardado, o None si no hay
+    ninguno anotado o el archivo ya no existe
+    """
+    archivo_ultimo = _archivo_ultimo()
+    if archivo_ultimo == "":
+        return None
+
+    try:
+        with open(archivo_ultimo, encoding='utf-8') as archivo:
+            ruta = archivo.read().strip()
+    except OSError:
+        return None
+
+    if ruta == "" or not os.path.isfile(ruta):
+        return None
+    return ruta
+
+
+def _huella(ruta):
+    """[fecha de modificación en ns, tamaño] del archivo, o None si no existe"""
+    try:
+        datos = os.stat(ruta)
+    except OSError:
+        return None
+    return [datos.st_mtime_ns, datos.st_size]
+
+
+class InventarioDiferido:
+    """
+    Inventario que se abre recién cuando se usa por primera vez.
+
+    Al crearlo no se lee nada. La primera consulta (buscar, estadísticas,
+    mostrar...) abre la copia binaria del CSV si sigue al día, lo que
+    cuesta lo mismo con 100 productos que con un millón; si no hay copia
+    o el CSV cambió, lee el CSV y deja la copia lista para la próxima vez.
+
+    La copia es de solo lectura: el primer cambio (agregar, actualizar,
+    eliminar...) la convierte en un Inventario normal, y desde ahí todo
+    se hace sobre él. También se convierte al pedir observadores o el
+    índice de búsqueda por prefijo, que se mantienen al día con los cambios.
+
+        inventario = InventarioDiferido("inventario.csv")
+        buscar_producto(inventario, "Café")    # abre la copia binaria
+        agregar_producto(inventario, "Té", 2.5, 10)   # pasa a Inventario
+    """
+
+    def __init__(self, ruta, ruta_cache=None):
+        """
+        Parámetros:
+        - ruta: archivo CSV del inventario (puede estar comprimido)
+        - ruta_cache: dónde guardar la copia binaria (por defecto, junto al CSV)
+        """
+        self.ruta = ruta
+        self.ruta_cache = ruta_cache if ruta_cache is not None else ruta + SUFIJO_CACHE
+        self._snapshot = None     # Copia binaria abierta (solo lectura)
+        self._inventario = None   # Inventario normal, una vez que se cargó o cambió
+
+    # ------------------------------------------------------------
+    # Abrir y cargar
+    # ------------------------------------------------------------
+
+    def abierto(self):
+        """Indica si ya se abrió la copia o se cargó el CSV"""
+        return self._snapshot is not None or self._inventario is not None
+
+    def materializar(self):
+        """
+        Convierte la copia de solo lectura en un Inventario normal (si no
+        se hizo antes).
+
+        Retorna: el Inventario sobre el que se hacen los cambios
+        """
+        if self._inventario is None:
+            datos = self._datos()
+
+            if self._inventario is None:
+                self._inventario = datos.a_inventario()
+                self._cerrar_snapshot()
+
+        return self._inventario
+
+    def cache_al_dia(self):
+        """Indica si la copia binaria corresponde al CSV y al delta actuales"""
+        try:
+            with open(self.ruta_cache + SUFIJO_HUELLA, encoding='utf-8') as archivo:
+                huella = json.load(archivo)
+        except (OSError, ValueError):
+            return False
+
+        return huella == self._huella_actual()
+
+    def cerrar(self):
+        """Libera la copia binaria si está abierta (el Inventario, si existe, sigue igual)"""
+        self._cerrar_snapshot()
+
+    # ------------------------------------------------------------
+    # Consultas: se responden desde la copia mientras no haya cambios
+    # ------------------------------------------------------------
+
+    def buscar(self, nombre, ocurrencia=0):
+        if ocurrencia == 0:
+            return self._datos().buscar(nombre)
+        # La copia binaria solo sabe buscar el primero de cada nombre
+        return self.materializar().buscar(nombre, ocurrencia)
+
+    def estadisticas(self):
+        return self._datos().estadisticas()
+
+    def productos_ordenados(self, criterio, inicio=0, fin=None, descendente=False):
+        return self._datos().productos_ordenados(criterio, inicio, fin, descendente)
+
+    def indices_ordenados(self):
+        # Sobre la copia: rangos y stock bajo sin armar el Inventario (ver snapshot.IndicesSnapshot)
+        return self._datos().indices_ordenados()
+
+    def __len__(self):
+        return len(self._datos())
+
+    def __iter__(self):
+        return iter(self._datos())
+
+    def __getitem__(self, posicion):
+        return self._datos()[posicion]
+
+    def __repr__(self):
+        estado = "materializado" if self._inventario is not None else \
+            "copia abierta" if self._snapshot is not None else "sin abrir"
+        return f"InventarioDiferido({self.ruta!r}, {estado})"
+
+    # ------------------------------------------------------------
+    # Cambios, observadores e índices: necesitan el Inventario normal
+    # ------------------------------------------------------------
+
+    def agregar(self, nombre, precio, cantidad):
+        return self.materializar().agregar(nombre, precio, cantidad)
+
+    def actualizar(self, nombre, nuevo_precio=None, nueva_cantidad=None, ocurrencia=0):
+        return self.materializar().actualizar(nombre, nuevo_precio, nueva_cantidad, ocurrencia)
+
+    def eliminar(self, nombre, ocurrencia=0):
+        return self.materializar().eliminar(nombre, ocurrencia)
+
+    def eliminar_varios(self, nombres):
+        return self.materializar().eliminar_varios(nombres)
+
+    def fusionar(self, producto_nuevo):
+        return self.materializar().fusionar(producto_nuevo)
+
+    def fusionar_valores(self, nombre, precio, cantidad):
+        return self.materializar().fusionar_valores(nombre, precio, cantidad)
+
+    def append(self, producto):
+        self.materializar().append(producto)
+
+    def extend(self, productos):
+        self.materializar().extend(productos)
+
+    def remove(self, producto):
+        self.materializar().remove(producto)
+
+    def agregar_observador(self, observador, avisar_existentes=True):
+        self.materializar().agregar_observador(observador, avisar_existentes)
+
+    def quitar_observador(self, observador):
+        self.materializar().quitar_observador(observador)
+
+    def indice_busqueda(self):
+        return self.materializar().indice_busqueda()
+
+    def repeticiones(self, nombre):
+        # Lo usan los observadores (journal, guardado incremental) y las
+        # transacciones al confirmar: en los dos casos ya hay que materializar
+        return self.materializar().repeticiones(nombre)
+
+    def clear(self):
+        """Vacía el inventario (sin cargarlo antes si todavía no se abrió)"""
+        if self._inventario is None:
+            self._cerrar_snapshot()
+            self._inventario = Inventario()
+        else:
+            self._inventario.clear()
+
+    # ------------------------------------------------------------
+    # Funciones internas
+    # ------------------------------------------------------------
+
+    def _datos(self):
+        """
+        Lo que responde las consultas: el Inventario si ya existe, si no
+        la copia binaria (abriéndola, o armándola desde el CSV)
+        """
+        if self._inventario is not None:
+            return self._inventario
+
+        if self._snapshot is None:
+            # Import local: snapshot.py solo hace falta al abrir la copia
+            from snapshot import InventarioSnapshot
+
+            if self.cache_al_dia():
+                try:
+                    self._snapshot = InventarioSnapshot(self.ruta_cache)
+                except (OSError, ValueError):
+                    self._snapshot = None
+
+            if self._snapshot is None:
+                # Sin copia al día: se lee el CSV y se arma la copia
+                self._inventario = self._cargar_csv()
+                return self._inventario
+
+        return self._snapshot
+
+    def _cargar_csv(self):
+        """Lee el CSV (con su delta) en un Inventario y guarda la copia binaria"""
+        # La huella se toma antes de leer: si el CSV cambia mientras se
+        # lee, la copia queda vieja y se vuelve a armar la próxima vez
+        huella = self._huella_actual()
+        inventario = Inventario()
+        resumen = {}
+
+        for lote in cargar_csv_por_lotes(self.ruta, resumen=resumen):
+            inventario.extend(lote)
+
+        if not resumen["valido"]:
+            print(" Se empieza con un inventario vacío")
+            return Inventario()
+
+        self._guardar_cache(inventario, huella)
+        return inventario
+
+    def _guardar_cache(self, inventario, huella):
+        """Escribe la copia binaria y su huella. Si no se puede, se sigue sin copia"""
+        from snapshot import escribir_snapshot
+
+        ruta_huella = self.ruta_cache + SUFIJO_HUELLA
+        ruta_temporal = nombre_temporal(ruta_huella)
+
+        try:
+            escribir_snapshot(inventario, self.ruta_cache)
+            huella[-1] = _huella(self.ruta_cache)
+
+            with open(ruta_temporal, 'w', encoding='utf-8') as archivo:
+                json.dump(huella, archivo)
+            os.replace(ruta_temporal, ruta_huella)
+
+        except (OSError, ValueError):
+            try:
+                os.remove(ruta_temporal)
+            except OSError:
+                pass
+
+    def _huella_actual(self):
+        """Huellas del CSV, del delta y de la copia binaria, en ese orden"""
+        return [_huella(self.ruta), _huella(self.ruta + SUFIJO_DELTA), _huella(self.ruta_cache)]
+
+    def _cerrar_snapshot(self):
+        if self._snapshot is not None:
+            self._snapshot.cerrar()
+            self._snapshot = None
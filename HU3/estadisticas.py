@@ -0,0 +1,173 @@
+# estadisticas.py
+# Estadísticas del inventario que se actualizan con cada cambio
+
+
+import heapq
+
+
+class EstadisticasIncrementales:
+    """
+    Lleva las estadísticas del inventario al día sin recorrerlo.
+
+    El Inventario le avisa de cada producto agregado, actualizado o
+    eliminado. Con esos avisos se ajustan las unidades y el valor total,
+    y se guardan dos montículos (heaps): uno por precio y otro por stock.
+
+    Cuando un producto cambia o se elimina, sus entradas viejas no se
+    borran del montículo: se descartan al llegar a la cima
+    (invalidación perezosa). Así leer las estadísticas es O(1).
+
+    En caso de empate gana el producto que se agregó primero, igual que
+    en el recorrido de calcular_estadisticas.
+
+    El valor total se suma con compensación (el error de redondeo de cada
+    suma se guarda aparte): millones de sumas y restas no lo hacen derivar.
+    """
+
+    def __init__(self):
+        self.unidades_totales = 0
+        self._valor = 0.0          # Suma de los subtotales...
+        self._compensacion = 0.0   # ...y lo que se perdió al redondear
+
+        self._productos = {}      # id(producto) -> producto
+        self._orden = {}          # id(producto) -> número de llegada
+        self._siguiente_orden = 0
+
+        self._por_precio = []     # Montículo de (-precio, orden, id)
+        self._por_stock = []      # Montículo de (-cantidad, orden, id)
+
+    # ------------------------------------------------------------
+    # Avisos del inventario
+    # ------------------------------------------------------------
+
+    def al_agregar(self, producto):
+        """Un producto nuevo entró al inventario"""
+        pid = id(producto)
+        orden = self._siguiente_orden
+        self._siguiente_orden += 1
+
+        self._productos[pid] = producto
+        self._orden[pid] = orden
+
+        self.unidades_totales += producto["cantidad"]
+        self._sumar_valor(producto["precio"] * producto["cantidad"])
+
+        self._empujar(self._por_precio, (-producto["precio"], orden, pid))
+        self._empujar(self._por_stock, (-producto["cantidad"], orden, pid))
+
+    def al_actualizar(self, producto, precio_anterior, cantidad_anterior):
+        """Cambió el precio y/o la cantidad de un producto"""
+        pid = id(producto)
+        orden = self._orden[pid]
+        precio = producto["precio"]
+        cantidad = producto["cantidad"]
+
+        self.unidades_totales += cantidad - cantidad_anterior
+        self._sumar_valor(precio * cantidad)
+        self._sumar_valor(-precio_anterior * cantidad_anterior)
+
+        # Solo hace falta una entrada nueva si el valor cambió
+        if precio != precio_anterior:
+            self._empujar(self._por_precio, (-precio, orden, pid))
+
+        if cantidad != cantidad_anterior:
+            self._empujar(self._por_stock, (-cantidad, orden, pid))
+
+    def al_eliminar(self, producto):
+        """Un producto salió del inventario"""
+        pid = id(producto)
+        del self._productos[pid]
+        del self._orden[pid]
+
+        self.unidades_totales -= producto["cantidad"]
+        self._sumar_valor(-producto["precio"] * producto["cantidad"])
+
+        # Evitar que quede un residuo de redondeo con el inventario vacío
+        if len(self._productos) == 0:
+            self._valor = self._compensacion = 0.0
+
+    def al_vaciar(self):
+        """El inventario se vació por completo"""
+        self.__init__()
+
+    # ------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------
+
+    @property
+    def valor_total(self):
+        """Suma de precio * cantidad de todos los productos"""
+        return self._valor + self._compensacion
+
+    def producto_mas_caro(self):
+        """Devuelve el producto con mayor precio, o None si no hay"""
+        return self._cima(self._por_precio, "precio")
+
+    def producto_mayor_stock(self):
+        """Devuelve el producto con mayor cantidad, o None si no hay"""
+        return self._cima(self._por_stock, "cantidad")
+
+    def resumen(self):
+        """
+        Devuelve las estadísticas con el mismo formato que
+        calcular_estadisticas, o None si el inventario está vacío.
+        """
+        if len(self._productos) == 0:
+            return None
+
+        mas_caro = self.producto_mas_caro()
+        mayor_stock = self.producto_mayor_stock()
+
+        return {
+            "unidades_totales": self.unidades_totales,
+            "valor_total": self.valor_total,
+            "producto_mas_caro": (mas_caro["nombre"], mas_caro["precio"]),
+            "producto_mayor_stock": (mayor_stock["nombre"], mayor_stock["cantidad"])
+        }
+
+    # ------------------------------------------------------------
+    # Funciones internas
+    # ------------------------------------------------------------
+
+    def _cima(self, monticulo, campo):
+        """Descarta entradas viejas hasta encontrar una válida"""
+        while monticulo:
+            valor_negado, orden, pid = monticulo[0]
+            producto = self._productos.get(pid)
+
+            # La entrada vale si el producto sigue ahí y no cambió
+            if producto is not None and self._orden[pid] == orden and \
+               producto[campo] == -valor_negado:
+                return producto
+
+            heapq.heappop(monticulo)
+
+        return None
+
+    def _sumar_valor(self, subtotal):
+        """Suma al valor total guardando el error de redondeo (suma de Neumaier)"""
+        total = self._valor + subtotal
+
+        if abs(self._valor) >= abs(subtotal):
+            self._compensacion += (self._valor - total) + subtotal
+        else:
+            self._compensacion += (subtotal - total) + self._valor
+
+        self._valor = total
+
+    def _empujar(self, monticulo, entrada):
+        """Agrega una entrada y reconstruye el montículo si hay mucha basura"""
+        heapq.heappush(monticulo, entrada)
+
+        if len(monticulo) > 2 * len(self._productos) + 64:
+            self._reconstruir(monticulo)
+
+    def _reconstruir(self, monticulo):
+        """Deja en el montículo solo una entrada por producto vivo"""
+        campo = "precio" if monticulo is self._por_precio else "cantidad"
+
+        monticulo[:] = [
+            (-producto[campo], self._orden[pid], pid)
+            for pid, producto in self._productos.items()
+        ]
+        heapq.heapify(monticulo)
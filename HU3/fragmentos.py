@@ -0,0 +1,616 @@
+# fragmentos.py
+# Inventario repartido entre varios procesos (uno por núcleo)
+#
+# Cada producto vive en un solo fragmento, elegido con un hash del nombre
+# en minúsculas. Cada fragmento es un proceso con su propio Inventario y
+# usa las mismas funciones de servicios.py y archivos.py. Así las cargas,
+# las fusiones y las estadísticas se reparten entre varios núcleos.
+
+import multiprocessing
+import os
+import zlib
+
+from archivos import (SUFIJO_DELTA, TAMANO_LOTE, PARSER_POR_DEFECTO, detectar_compresion,
+                      dividir_csv, fusionar_lote, leer_csv_por_lotes, leer_rango_csv)
+from inventario import Inventario, clave_nombre
+from servicios import (buscar_producto, actualizar_producto, eliminar_producto,
+                       eliminar_productos, calcular_estadisticas)
+
+# Filas que se juntan antes de mandarlas a los fragmentos
+TAMANO_TANDA = 20000
+
+# Conteos que devuelve fusionar_lote (se suman entre fragmentos)
+CONTEOS_FUSION = ("filas", "duplicados_en_lote", "actualizados", "nuevos", "fusionados")
+
+
+def fragmento_de(nombre, fragmentos):
+    """
+    Número de fragmento (0 a fragmentos - 1) donde vive un producto.
+
+    Se usa crc32 y no hash(): hash() de un texto cambia en cada proceso,
+    y el coordinador y los fragmentos tienen que elegir lo mismo.
+    """
+    return zlib.crc32(clave_nombre(nombre).encode("utf-8")) % fragmentos
+
+
+# ============================================================
+# Lo que corre dentro de cada proceso fragmento
+# ============================================================
+
+def _agregar_columnas(inventario, columnas):
+    """Agrega los productos de una tupla de columnas (nombres, precios, cantidades)"""
+    for nombre, precio, cantidad in zip(*columnas):
+        inventario.agregar(nombre, precio, cantidad)
+    return len(columnas[0])
+
+
+class _Carga:
+    """
+    Productos de un CSV que un fragmento está cargando. Se juntan aparte
+    y recién pasan al inventario con confirmar(), cuando todos los
+    fragmentos terminaron su parte sin errores: si uno falla, ninguno
+    cambia.
+    """
+
+    def __init__(self, fusionar):
+        self.fusionar = fusionar
+        self.propias = None    # Filas del rango leído que le tocan a este fragmento
+        # Al reemplazar se arma un Inventario nuevo; al fusionar se juntan
+        # las filas y se fusionan al confirmar
+        self.nuevo = None if fusionar else Inventario()
+        self.columnas = ([], [], [])
+
+    def leer_rango(self, ruta, inicio, fin, numero, fragmentos, parser):
+        """
+        Lee un rango de bytes del CSV (ver archivos.dividir_csv) y reparte
+        sus filas por fragmento. Las de este fragmento se quedan acá.
+
+        Retorna: (columnas para cada fragmento, con None en el lugar de
+        este, productos válidos, filas inválidas)
+        """
+        nombres, precios, cantidades, filas_invalidas = leer_rango_csv(ruta, inicio, fin, parser)
+        partes = [([], [], []) for _ in range(fragmentos)]
+
+        for nombre, precio, cantidad in zip(nombres, precios, cantidades):
+            columnas = partes[fragmento_de(nombre, fragmentos)]
+            columnas[0].append(nombre)
+            columnas[1].append(precio)
+            columnas[2].append(cantidad)
+
+        self.propias = partes[numero]
+        partes[numero] = None
+        return partes, len(nombres), filas_invalidas
+
+    def sumar(self, *partes):
+        """
+        Agrega a la carga tuplas de columnas, en el orden del archivo
+        (None = las filas propias de leer_rango).
+
+        Retorna: cuántas filas se agregaron
+        """
+        filas = 0
+
+        for columnas in partes:
+            if columnas is None:
+                columnas, self.propias = self.propias, None
+
+            if self.nuevo is not None:
+                filas += _agregar_columnas(self.nuevo, columnas)
+            else:
+                for destino, valores in zip(self.columnas, columnas):
+                    destino.extend(valores)
+                filas += len(columnas[0])
+
+        return filas
+
+    def confirmar(self, inventario):
+        """Retorna: (inventario con el que sigue el fragmento, conteos de la carga)"""
+        if self.fusionar:
+            return inventario, fusionar_lote(inventario, self.columnas)
+        return self.nuevo, {"agregados": len(self.nuevo)}
+
+
+# Operaciones que entiende un fragmento: nombre -> función(inventario, *argumentos)
+_OPERACIONES = {
+    "agregar": lambda inventario, *valores: inventario.agregar(*valores),
+    "buscar": buscar_producto,
+    "actualizar": actualizar_producto,
+    "eliminar": eliminar_producto,
+    "eliminar_varios": eliminar_productos,
+    "fusionar_valores": lambda inventario, *valores: inventario.fusionar_valores(*valores),
+    "estadisticas": calcular_estadisticas,
+    "agregar_columnas": _agregar_columnas,
+    "fusionar_lote": fusionar_lote,
+    "largo": len,
+    "tramo": lambda inventario, inicio, fin: inventario[inicio:fin],
+    "vaciar": lambda inventario: inventario.clear(),
+}
+
+# Pasos de una carga de CSV: nombre -> método de _Carga
+_OPERACIONES_CARGA = {
+    "leer_rango": _Carga.leer_rango,
+    "sumar_a_carga": _Carga.sumar,
+}
+
+
+def _atender(conexion):
+    """
+    Bucle de un proceso fragmento: recibe pedidos (operación, argumentos),
+    los aplica a su Inventario y responde ("ok", resultado) o ("error", excepción).
+    """
+    inventario = Inventario()
+    carga = None   # _Carga en curso (ver InventarioFragmentado.cargar_csv)
+
+    while True:
+        try:
+            operacion, argumentos = conexion.recv()
+        except EOFError:
+            break   # El coordinador se cerró
+
+        if operacion == "cerrar":
+            conexion.send(("ok", None))
+            break
+
+        try:
+            if operacion == "iniciar_carga":
+                carga = _Carga(*argumentos)
+                resultado = None
+            elif operacion == "confirmar_carga":
+                inventario, resultado = carga.confirmar(inventario)
+                carga = None
+            elif operacion == "descartar_carga":
+                carga = resultado = None
+            elif operacion in _OPERACIONES_CARGA:
+                resultado = _OPERACIONES_CARGA[operacion](carga, *argumentos)
+            else:
+                resultado = _OPERACIONES[operacion](inventario, *argumentos)
+            respuesta = ("ok", resultado)
+        except Exception as error:
+            respuesta = ("error", error)
+
+        try:
+            conexion.send(respuesta)
+        except Exception as error:
+            # La respuesta no se pudo empaquetar (pickle): se avisa igual
+            conexion.send(("error", RuntimeError(f"{type(error).__name__}: {error}")))
+
+    conexion.close()
+
+
+# ============================================================
+# Coordinador
+# ============================================================
+
+class InventarioFragmentado:
+    """
+    Inventario repartido entre varios procesos ("fragmentos").
+
+    El coordinador (este objeto) no guarda productos: manda cada
+    operación al fragmento que le corresponde según fragmento_de().
+    - Operaciones de un producto (agregar, buscar, actualizar, eliminar,
+      fusionar): van a un solo fragmento.
+    - Estadísticas: cada fragmento calcula las suyas al mismo tiempo y
+      acá se combinan (sumas y máximos).
+    - Cargas y fusiones grandes (extend, fusionar_lote, cargar_csv): cada
+      fragmento procesa su parte al mismo tiempo que los demás. En
+      cargar_csv cada fragmento lee un tramo distinto del archivo.
+
+    Se usa con las mismas funciones de servicios.py y archivos.py.
+    Diferencias con Inventario:
+    - buscar() y recorrerlo devuelven copias: para cambiar un producto
+      hay que usar actualizar() o fusionar()
+    - el orden es el de carga dentro de cada fragmento, fragmento por
+      fragmento (no el orden de carga global). Lo mismo pasa con los
+      empates en estadisticas(): si dos productos tienen el precio (o la
+      cantidad) máxima, gana el del fragmento de número menor, no
+      necesariamente el que se cargó primero
+    - no admite observadores
+    - hay que cerrarlo al terminar (cerrar() o usarlo con "with")
+
+        with InventarioFragmentado(4) as inventario:
+            inventario.cargar_csv("inventario.csv")
+            print(calcular_estadisticas(inventario))
+
+    Las operaciones de un solo producto cuestan un viaje de ida y vuelta
+    a otro proceso (decenas de microsegundos): conviene cuando lo que
+    pesa son las cargas, las fusiones y las estadísticas.
+    """
+
+    def __init__(self, fragmentos=None, productos=None):
+        if fragmentos is None:
+            fragmentos = os.cpu_count() or 1
+        if fragmentos < 1:
+            raise ValueError("Hace falta al menos un fragmento")
+
+        contexto = multiprocessing.get_context()
+        self._conexiones = []   # Una conexión (Pipe) por fragmento
+        self._procesos = []
+
+        for numero in range(fragmentos):
+            propia, del_fragmento = contexto.Pipe()
+            proceso = contexto.Process(target=_atender, args=(del_fragmento,),
+                                       name=f"fragmento-{numero}", daemon=True)
+            proceso.start()
+            del_fragmento.close()
+            self._conexiones.append(propia)
+            self._procesos.append(proceso)
+
+        if productos is not None:
+            self.extend(productos)
+
+    @property
+    def fragmentos(self):
+        """Cantidad de fragmentos (procesos)"""
+        return len(self._conexiones)
+
+    # ------------------------------------------------------------
+    # Operaciones de un producto (van a un solo fragmento)
+    # ------------------------------------------------------------
+
+    def agregar(self, nombre, precio, cantidad):
+        """Agrega un producto nuevo y devuelve una copia (la que armó el fragmento)"""
+        return self._pedir(self._fragmento(nombre), "agregar", nombre, precio, cantidad)
+
+    def buscar(self, nombre):
+        """Devuelve una copia del producto con ese nombre, o None"""
+        return self._pedir(self._fragmento(nombre), "buscar", nombre)
+
+    def actualizar(self, nombre, nuevo_precio=None, nueva_cantidad=None):
+        """Actualiza precio y/o cantidad. Retorna False si no existe"""
+        return self._pedir(self._fragmento(nombre), "actualizar", nombre, nuevo_precio, nueva_cantidad)
+
+    def eliminar(self, nombre):
+        """Elimina el producto con ese nombre. Retorna False si no existe"""
+        return self._pedir(self._fragmento(nombre), "eliminar", nombre)
+
+    def fusionar(self, producto_nuevo):
+        """
+        Si el producto ya existe suma la cantidad y actualiza el precio;
+        si no existe lo agrega.
+
+        Retorna: True si el producto ya existía, False si se agregó
+        """
+        return self.fusionar_valores(producto_nuevo["nombre"], producto_nuevo["precio"],
+                                     producto_nuevo["cantidad"])
+
+    def fusionar_valores(self, nombre, precio, cantidad):
+        """Igual que fusionar(), pero recibe los valores sueltos"""
+        return self._pedir(self._fragmento(nombre), "fusionar_valores", nombre, precio, cantidad)
+
+    # ------------------------------------------------------------
+    # Operaciones repartidas entre todos los fragmentos
+    # ------------------------------------------------------------
+
+    def eliminar_varios(self, nombres):
+        """Elimina varios productos por nombre. Retorna cuántos se eliminaron"""
+        por_fragmento = [[] for _ in self._conexiones]
+        for nombre in nombres:
+            por_fragmento[self._fragmento(nombre)].append(nombre)
+
+        return sum(self._pedir_a_todos("eliminar_varios", [(nombres,) for nombres in por_fragmento]))
+
+    def estadisticas(self):
+        """
+        Cada fragmento calcula sus estadísticas y acá se combinan.
+        Mismo formato que servicios.calcular_estadisticas.
+        """
+        parciales = [e for e in self._pedir_a_todos("estadisticas") if e is not None]
+
+        if not parciales:
+            return None
+
+        return {
+            "unidades_totales": sum(e["unidades_totales"] for e in parciales),
+            "valor_total": sum(e["valor_total"] for e in parciales),
+            # max() se queda con el primero si hay empate (el del fragmento
+            # de número menor, ver la nota sobre el orden en la clase)
+            "producto_mas_caro": max((e["producto_mas_caro"] for e in parciales),
+                                     key=lambda par: par[1]),
+            "producto_mayor_stock": max((e["producto_mayor_stock"] for e in parciales),
+                                        key=lambda par: par[1]),
+        }
+
+    def fusionar_lote(self, productos_nuevos):
+        """
+        Igual que archivos.fusionar_lote, pero cada fragmento fusiona su
+        parte del lote al mismo tiempo. Todas las filas de un mismo nombre
+        van al mismo fragmento, así que el resultado es el mismo.
+
+        Parámetros:
+        - productos_nuevos: lista o generador de productos (diccionarios),
+          o una tupla de columnas (nombres, precios, cantidades)
+
+        Retorna: diccionario con los conteos (ver archivos.fusionar_lote)
+        """
+        # El lote va entero (una sola tanda): si un nombre quedara en dos
+        # tandas, sus filas repetidas se contarían como actualizados
+        conteos = dict.fromkeys(CONTEOS_FUSION, 0)
+        for parcial in self._repartir("fusionar_lote", productos_nuevos, tamano_tanda=None):
+            for conteo in CONTEOS_FUSION:
+                conteos[conteo] += parcial[conteo]
+        return conteos
+
+    def cargar_csv(self, ruta, fusionar=False, tamano_lote=TAMANO_LOTE, parser=PARSER_POR_DEFECTO):
+        """
+        Carga un archivo CSV repartiendo la lectura entre los fragmentos.
+
+        El archivo se divide en rangos de bytes (como archivos.cargar_csv_paralelo)
+        y cada fragmento lee uno al mismo tiempo que los demás; las filas
+        se mandan después al fragmento que les toca, en el orden del
+        archivo. Un archivo comprimido o con archivo de cambios (.delta)
+        no se puede partir: lo lee el coordinador y lo reparte.
+
+        Los productos se juntan aparte en cada fragmento y recién pasan al
+        inventario cuando todos terminaron sin errores: si algo falla
+        (archivo inválido, error de lectura), el inventario queda como estaba.
+
+        Parámetros:
+        - ruta: nombre/ruta del archivo CSV (str)
+        - fusionar: False reemplaza el inventario; True fusiona los
+          productos del archivo con los que ya hay (como fusionar_lote)
+        - tamano_lote, parser: ver archivos.leer_csv_por_lotes
+
+        Retorna: diccionario con "productos", "filas_invalidas" y
+        "cambios" del archivo, más "agregados" (o los conteos de
+        fusionar_lote si fusionar es True).
+        Lanza las mismas excepciones que leer_csv_por_lotes.
+        """
+        self._pedir_a_todos("iniciar_carga", [(fusionar,)] * len(self._conexiones))
+
+        try:
+            if os.path.exists(ruta + SUFIJO_DELTA) or detectar_compresion(ruta) is not None:
+                resumen = {}
+                filas = (producto for lote in leer_csv_por_lotes(ruta, tamano_lote, resumen, parser)
+                         for producto in lote)
+                self._repartir("sumar_a_carga", filas, TAMANO_TANDA)
+            else:
+                resumen = self._cargar_por_rangos(ruta, parser)
+        except Exception:
+            self._pedir_a_todos("descartar_carga")
+            raise
+
+        resultado = {clave: resumen[clave] for clave in ("productos", "filas_invalidas", "cambios")}
+
+        for conteos in self._pedir_a_todos("confirmar_carga"):
+            for conteo, valor in conteos.items():
+                resultado[conteo] = resultado.get(conteo, 0) + valor
+
+        return resultado
+
+    # ------------------------------------------------------------
+    # Métodos de lista, para que el código existente siga funcionando
+    # ------------------------------------------------------------
+
+    def append(self, producto):
+        """Agrega un producto (diccionario)"""
+        self.agregar(producto["nombre"], producto["precio"], producto["cantidad"])
+
+    def extend(self, productos):
+        """Agrega varios productos (diccionarios), repartidos por tandas"""
+        self._repartir("agregar_columnas", productos, TAMANO_TANDA)
+
+    def clear(self):
+        """Vacía el inventario"""
+        self._pedir_a_todos("vaciar")
+
+    def __len__(self):
+        return sum(self._pedir_a_todos("largo"))
+
+    def __iter__(self):
+        for productos in self._pedir_a_todos("tramo", [(0, None)] * len(self._conexiones)):
+            yield from productos
+
+    def __getitem__(self, posicion):
+        # Posición global = fragmentos uno detrás de otro
+        largos = self._pedir_a_todos("largo")
+        total = sum(largos)
+
+        if not isinstance(posicion, slice):
+            if posicion < 0:
+                posicion += total
+            if not 0 <= posicion < total:
+                raise IndexError("Posición fuera del inventario")
+            return self[posicion:posicion + 1][0]
+
+        inicio, fin, paso = posicion.indices(total)
+        if paso != 1:
+            return list(self)[posicion]
+
+        # Cada fragmento entrega solo la parte del corte que tiene
+        productos = []
+        desde = 0
+        for numero, largo in enumerate(largos):
+            hasta = desde + largo
+            if inicio < hasta and fin > desde:
+                productos += self._pedir(numero, "tramo", max(inicio - desde, 0), min(fin, hasta) - desde)
+            desde = hasta
+        return productos
+
+    def __repr__(self):
+        return f"InventarioFragmentado({len(self._conexiones)} fragmentos)"
+
+    # ------------------------------------------------------------
+    # Cerrar
+    # ------------------------------------------------------------
+
+    def cerrar(self):
+        """Termina los procesos fragmento (los productos se pierden)"""
+        for conexion in self._conexiones:
+            try:
+                conexion.send(("cerrar", ()))
+                conexion.recv()
+            except (EOFError, OSError):
+                pass
+            conexion.close()
+
+        for proceso in self._procesos:
+            proceso.join()
+
+        self._conexiones = []
+        self._procesos = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_error, error, traza):
+        self.cerrar()
+        return False
+
+    # ------------------------------------------------------------
+    # Funciones internas
+    # ------------------------------------------------------------
+
+    def _comprobar_abierto(self):
+        if not self._conexiones:
+            raise RuntimeError("El inventario fragmentado ya se cerró")
+
+    def _fragmento(self, nombre):
+        self._comprobar_abierto()
+        return fragmento_de(nombre, len(self._conexiones))
+
+    def _pedir(self, numero, operacion, *argumentos):
+        """Hace un pedido a un fragmento y espera la respuesta"""
+        self._comprobar_abierto()
+
+        self._conexiones[numero].send((operacion, argumentos))
+        return self._recibir([numero])[0]
+
+    def _pedir_a_todos(self, operacion, argumentos=None):
+        """
+        Manda el pedido a todos los fragmentos y después espera las
+        respuestas: los fragmentos trabajan al mismo tiempo.
+
+        Parámetros:
+        - argumentos: lista con la tupla de argumentos de cada fragmento
+          (None = sin argumentos)
+
+        Retorna: lista con la respuesta de cada fragmento
+        """
+        self._comprobar_abierto()
+
+        if argumentos is None:
+            argumentos = [()] * len(self._conexiones)
+
+        for conexion, propios in zip(self._conexiones, argumentos):
+            conexion.send((operacion, propios))
+        return self._recibir(range(len(self._conexiones)))
+
+    def _recibir(self, numeros):
+        """
+        Espera una respuesta de cada fragmento indicado. Si alguno falló,
+        lanza su error después de recibir todas (así ninguna respuesta
+        queda pendiente para el próximo pedido).
+        """
+        resultados = []
+        primer_error = None
+
+        for numero in numeros:
+            estado, valor = self._conexiones[numero].recv()
+            if estado == "error" and primer_error is None:
+                primer_error = valor
+            resultados.append(valor)
+
+        if primer_error is not None:
+            raise primer_error
+        return resultados
+
+    def _repartir(self, operacion, productos, tamano_tanda):
+        """
+        Reparte los productos entre los fragmentos en tandas de
+        'tamano_tanda' filas (None = una sola tanda), como tuplas de
+        columnas por fragmento.
+
+        Mientras los fragmentos procesan una tanda, acá se arma la
+        siguiente: solo se espera la respuesta de la tanda anterior.
+
+        Retorna: lista con las respuestas de cada fragmento en cada tanda
+        """
+        self._comprobar_abierto()
+
+        respuestas = []
+        pendientes = []   # Fragmentos que todavía no respondieron la tanda anterior
+        error = None
+
+        try:
+            for tanda in self._tandas(productos, tamano_tanda):
+                enviados = []
+                for numero, columnas in enumerate(tanda):
+                    if columnas[0]:
+                        self._conexiones[numero].send((operacion, (columnas,)))
+                        enviados.append(numero)
+
+                try:
+                    respuestas += self._recibir(pendientes)
+                except Exception as falla:
+                    error = error or falla
+                pendientes = enviados
+
+        finally:
+            # También si fallan los productos (por ejemplo, un archivo que
+            # se está leyendo): ninguna respuesta queda pendiente
+            try:
+                respuestas += self._recibir(pendientes)
+            except Exception as falla:
+                error = error or falla
+
+        if error is not None:
+            raise error
+        return respuestas
+
+    def _cargar_por_rangos(self, ruta, parser):
+        """
+        Cada fragmento lee un rango de bytes del CSV; después cada uno
+        recibe las filas que le tocan de los demás rangos.
+
+        Retorna: resumen como el de leer_csv_por_lotes
+        """
+        total = len(self._conexiones)
+        rangos = dividir_csv(ruta, total)
+        # Si el archivo tiene pocas líneas puede haber menos rangos que fragmentos
+        rangos += [(0, 0)] * (total - len(rangos))
+
+        leidos = self._pedir_a_todos(
+            "leer_rango",
+            [(ruta, inicio, fin, numero, total, parser) for numero, (inicio, fin) in enumerate(rangos)]
+        )
+
+        # Para cada fragmento, lo que le toca de cada rango (en orden)
+        self._pedir_a_todos(
+            "sumar_a_carga",
+            [tuple(partes[numero] for partes, _, _ in leidos) for numero in range(total)]
+        )
+
+        return {
+            "productos": sum(productos for _, productos, _ in leidos),
+            "filas_invalidas": sum(invalidas for _, _, invalidas in leidos),
+            "cambios": 0,
+        }
+
+    def _tandas(self, productos, tamano_tanda):
+        """Agrupa los productos en tandas: una tupla de columnas por fragmento"""
+        fragmentos = len(self._conexiones)
+        nueva_tanda = lambda: [([], [], []) for _ in range(fragmentos)]
+        tanda = nueva_tanda()
+        en_tanda = 0
+
+        # Tupla de columnas: (nombres, precios, cantidades)
+        if isinstance(productos, tuple) and len(productos) == 3 and \
+           not isinstance(productos[0], dict):
+            filas = zip(*productos)
+        else:
+            filas = ((p["nombre"], p["precio"], p["cantidad"]) for p in productos)
+
+        for nombre, precio, cantidad in filas:
+            nombres, precios, cantidades = tanda[fragmento_de(nombre, fragmentos)]
+            nombres.append(nombre)
+            precios.append(precio)
+            cantidades.append(cantidad)
+
+            en_tanda += 1
+            if en_tanda == tamano_tanda:
+                yield tanda
+                tanda = nueva_tanda()
+                en_tanda = 0
+
+        if en_tanda:
+            yield tanda
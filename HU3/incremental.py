@@ -0,0 +1,220 @@
+# incremental.py
+# Guardar en CSV solo los productos que cambiaron desde el último guardado
+#
+# Archivos que se usan, para "inventario.csv":
+#   inventario.csv         última copia completa
+#   inventario.csv.delta   productos que cambiaron después (ver archivos.escribir_delta)
+#
+# leer_csv_por_lotes / cargar_csv aplican el delta solos, así que el
+# archivo se carga igual que siempre.
+
+import os
+
+from inventario import clave_nombre
+from archivos import SUFIJO_DELTA, escribir_csv, escribir_delta
+
+# Cada cuántos guardados con cambios se reescribe el archivo completo
+CONSOLIDAR_CADA = 100
+
+# También se reescribe si el delta ya ocupa esta fracción del CSV
+PROPORCION_CONSOLIDAR = 0.25
+
+
+class GuardadoIncremental:
+    """
+    Guarda un Inventario en un CSV escribiendo solo lo que cambió.
+
+    Se conecta al inventario como observador y anota qué productos
+    cambian (agregar_producto, actualizar_producto, eliminar_producto,
+    fusionar_inventarios...). guardar() agrega al archivo delta una
+    línea por producto cambiado, con sus valores finales: si un producto
+    cambió 50 veces se escribe una sola vez. Guardar cuesta lo mismo
+    tenga el inventario 100 productos o un millón.
+
+    De vez en cuando (cada CONSOLIDAR_CADA guardados, o cuando el delta
+    o los cambios pendientes son muchos comparados con el inventario)
+    guardar() reescribe el CSV completo y borra el delta.
+
+        guardado = GuardadoIncremental("inventario.csv")
+        guardado.conectar(inventario)
+        guardado.guardar()     # la primera vez escribe todo
+        ...
+        guardado.guardar()     # después, solo los cambios
+
+    El delta identifica cada producto por su nombre. Si cambia un
+    producto cuyo nombre está repetido (o se agrega uno con un nombre que
+    ya existe), el delta no alcanza para saber cuál era: el siguiente
+    guardar() reescribe el archivo completo.
+    """
+
+    def __init__(self, ruta, consolidar_cada=CONSOLIDAR_CADA,
+                 proporcion_consolidar=PROPORCION_CONSOLIDAR):
+        """
+        Parámetros:
+        - ruta: archivo CSV donde se guarda
+        - consolidar_cada: guardados con cambios entre dos reescrituras completas
+        - proporcion_consolidar: tamaño del delta (fracción del CSV) que
+          fuerza una reescritura completa
+        """
+        self.ruta = ruta
+        self.consolidar_cada = consolidar_cada
+        self.proporcion_consolidar = proporcion_consolidar
+
+        self._inventario = None
+        self._sucios = {}          # clave -> nombre de los productos que cambiaron
+        self._quitados = set()     # claves de los sucios que se eliminaron alguna vez
+        self._vaciado = False      # Se vació el inventario desde el último guardado
+        self._repetido = False     # Cambió un producto con el nombre repetido
+        self._base_al_dia = False  # El CSV (con su delta) tiene lo que había al último guardado
+        self._guardados_delta = 0
+        self._tamano_delta = 0
+        self._tamano_base = 0
+
+    def conectar(self, inventario, base_al_dia=False):
+        """
+        Empieza a anotar los cambios de este inventario.
+
+        Parámetros:
+        - inventario: un Inventario (necesita observadores)
+        - base_al_dia: True si el archivo ya tiene exactamente lo que hay
+          en el inventario (por ejemplo, recién se guardó o se cargó de
+          ahí). Si es False, el primer guardar() escribe todo.
+
+        Retorna: el mismo GuardadoIncremental
+        """
+        if not hasattr(inventario, "agregar_observador"):
+            raise TypeError("El guardado incremental necesita un Inventario (con observadores)")
+
+        self._inventario = inventario
+        inventario.agregar_observador(self, avisar_existentes=False)
+
+        self._base_al_dia = base_al_dia and os.path.exists(self.ruta)
+        if self._base_al_dia:
+            self._tamano_base = os.path.getsize(self.ruta)
+            ruta_delta = self.ruta + SUFIJO_DELTA
+            self._tamano_delta = os.path.getsize(ruta_delta) if os.path.exists(ruta_delta) else 0
+
+        return self
+
+    def cerrar(self):
+        """Deja de anotar cambios (no guarda lo pendiente)"""
+        if self._inventario is not None:
+            self._inventario.quitar_observador(self)
+            self._inventario = None
+
+    # ------------------------------------------------------------
+    # Avisos del inventario
+    # ------------------------------------------------------------
+
+    def al_agregar(self, producto):
+        # Un producto agregado queda al final del inventario: también al
+        # final de los cambios, para cargarlo en el mismo orden
+        self._sucios.pop(clave_nombre(producto["nombre"]), None)
+        self._marcar(producto["nombre"])
+
+    def al_actualizar(self, producto, precio_anterior, cantidad_anterior):
+        self._marcar(producto["nombre"])
+
+    def al_eliminar(self, producto):
+        # Se avisa antes de quitarlo: todavía cuenta en repeticiones()
+        self._marcar(producto["nombre"])
+        self._quitados.add(clave_nombre(producto["nombre"]))
+
+    def al_vaciar(self):
+        # Se reemplazó todo: lo más barato es reescribir el archivo
+        self._vaciado = True
+        self._sucios.clear()
+        self._quitados.clear()
+
+    # ------------------------------------------------------------
+    # Guardar
+    # ------------------------------------------------------------
+
+    def cambios_pendientes(self):
+        """Cuántos productos cambiaron desde el último guardado"""
+        return len(self._sucios)
+
+    def guardar(self):
+        """
+        Guarda los cambios: solo los productos cambiados, o el archivo
+        completo si todavía no se escribió, si se vació el inventario o
+        si toca consolidar.
+
+        Retorna: diccionario con "modo" ("completo", "cambios" o
+        "sin cambios") y "productos" (cuántos se escribieron).
+        Si algo falla lanza la excepción y los cambios quedan pendientes.
+        """
+        if not self._base_al_dia or self._vaciado or self._repetido or self._toca_consolidar():
+            return self.consolidar()
+
+        if not self._sucios:
+            return {"modo": "sin cambios", "productos": 0}
+
+        escritos = self._escribir_cambios()
+        self._guardados_delta += 1
+        return {"modo": "cambios", "productos": escritos}
+
+    def consolidar(self):
+        """
+        Reescribe el CSV completo y borra el delta.
+
+        Antes se pasan al delta los cambios pendientes: si el programa
+        se corta a mitad de camino, el CSV viejo más el delta (o el CSV
+        nuevo más el delta, que ya no cambia nada) dan el inventario actual.
+
+        Retorna: igual que guardar()
+        """
+        if self._base_al_dia and not self._vaciado and not self._repetido and self._sucios:
+            self._escribir_cambios()
+
+        escritos = escribir_csv(self._inventario, self.ruta)
+
+        self._sucios.clear()
+        self._quitados.clear()
+        self._vaciado = False
+        self._repetido = False
+        self._base_al_dia = True
+        self._guardados_delta = 0
+        self._tamano_delta = 0
+        self._tamano_base = os.path.getsize(self.ruta)
+        return {"modo": "completo", "productos": escritos}
+
+    # ------------------------------------------------------------
+    # Funciones internas
+    # ------------------------------------------------------------
+
+    def _marcar(self, nombre):
+        """Anota que el producto cambió (el nombre se guarda para los eliminados)"""
+        clave = clave_nombre(nombre)
+        if clave not in self._sucios:
+            self._sucios[clave] = nombre
+
+        # Con el nombre repetido, el delta no sabría a cuál de todos aplicarlo
+        if self._inventario.repeticiones(nombre) > 1:
+            self._repetido = True
+
+    def _escribir_cambios(self):
+        """Agrega al delta el estado actual de los productos cambiados. Retorna cuántos cambiaron"""
+        registros = []
+
+        for clave, nombre in self._sucios.items():
+            producto = self._inventario.buscar(clave)
+
+            # Un producto eliminado y vuelto a agregar pasa al final, como
+            # en el inventario: por eso también se anota la eliminación
+            if producto is None or clave in self._quitados:
+                registros.append(["D", nombre])
+            if producto is not None:
+                registros.append(["S", producto["nombre"], producto["precio"], producto["cantidad"]])
+
+        self._tamano_delta = escribir_delta(registros, self.ruta)
+        cambiados = len(self._sucios)
+        self._sucios.clear()
+        self._quitados.clear()
+        return cambiados
+
+    def _toca_consolidar(self):
+        """Indica si ya conviene reescribir el archivo completo"""
+        return (self._guardados_delta >= self.consolidar_cada or
+                self._tamano_delta > self._tamano_base * self.proporcion_consolidar or
+                len(self._sucios) > len(self._inventario) * self.proporcion_consolidar)
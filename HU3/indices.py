@@ -0,0 +1,296 @@
+# indices.py
+# Índices ordenados por precio, cantidad y subtotal: consultas por rango
+# ("cantidad menor a 10", "precio entre 5 y 20") y los k mayores o menores
+
+import math
+from bisect import bisect_left, insort
+from itertools import islice
+
+from inventario import CRITERIOS_ORDEN
+
+# Campos que tienen índice
+CAMPOS_INDICE = ("precio", "cantidad", "subtotal")
+
+# Elementos por bloque de ListaOrdenada (un bloque se parte al llegar al doble)
+TAMANO_BLOQUE_INDICE = 1000
+
+
+class ListaOrdenada:
+    """
+    Lista ordenada partida en bloques de ~TAMANO_BLOQUE_INDICE elementos.
+
+    En una sola lista ordenada de un millón de elementos, insertar o
+    quitar uno mueve en memoria todos los que le siguen (~0,25 ms cada
+    vez). Con bloques solo se mueven los de un bloque: se busca el bloque
+    con bisección sobre el último elemento de cada uno, y dentro del
+    bloque se inserta con insort.
+
+    Para contar sin recorrer los bloques, los largos de los bloques se
+    guardan también en un árbol de Fenwick: cuántos elementos hay antes
+    de un bloque se obtiene en O(log n).
+    """
+
+    def __init__(self, valores=()):
+        valores = sorted(valores)
+        self._bloques = [valores[i:i + TAMANO_BLOQUE_INDICE]
+                         for i in range(0, len(valores), TAMANO_BLOQUE_INDICE)]
+        self._maximos = [bloque[-1] for bloque in self._bloques]   # último de cada bloque
+        self._largo = len(valores)
+        self._armar_arbol()
+
+    def agregar(self, valor):
+        """Inserta un valor en su lugar"""
+        self._largo += 1
+
+        if not self._bloques:
+            self._bloques.append([valor])
+            self._maximos.append(valor)
+            self._armar_arbol()
+            return
+
+        # Primer bloque cuyo último elemento no es menor (o el último bloque)
+        i = min(bisect_left(self._maximos, valor), len(self._bloques) - 1)
+        bloque = self._bloques[i]
+        insort(bloque, valor)
+        self._maximos[i] = bloque[-1]
+        self._sumar_al_bloque(i, 1)
+
+        # Bloque demasiado grande: se parte en dos
+        if len(bloque) > 2 * TAMANO_BLOQUE_INDICE:
+            mitad = bloque[TAMANO_BLOQUE_INDICE:]
+            del bloque[TAMANO_BLOQUE_INDICE:]
+            self._bloques.insert(i + 1, mitad)
+            self._maximos[i] = bloque[-1]
+            self._maximos.insert(i + 1, mitad[-1])
+            # Cambió la lista de bloques: el árbol se arma de nuevo (pasa
+            # una vez cada TAMANO_BLOQUE_INDICE inserciones)
+            self._armar_arbol()
+
+    def quitar(self, valor):
+        """Quita un valor que está en la lista. Lanza ValueError si no está"""
+        i = bisect_left(self._maximos, valor)
+        if i < len(self._bloques):
+            bloque = self._bloques[i]
+            j = bisect_left(bloque, valor)
+
+            if j < len(bloque) and bloque[j] == valor:
+                del bloque[j]
+                self._largo -= 1
+
+                if bloque:
+                    self._maximos[i] = bloque[-1]
+                    self._sumar_al_bloque(i, -1)
+                else:
+                    del self._bloques[i]
+                    del self._maximos[i]
+                    self._armar_arbol()
+                return
+
+        raise ValueError(f"{valor!r} no está en la lista")
+
+    def entre(self, desde=None, hasta=None, descendente=False):
+        """
+        Recorre los valores v con desde <= v < hasta (None = sin límite),
+        de menor a mayor o al revés. Ubicar el inicio cuesta O(log n).
+        """
+        inicio = (0, 0) if desde is None else self._ubicar(desde)
+        fin = (len(self._bloques), 0) if hasta is None else self._ubicar(hasta)
+
+        numeros = range(inicio[0], min(fin[0], len(self._bloques) - 1) + 1)
+        if descendente:
+            numeros = reversed(numeros)
+
+        for i in numeros:
+            bloque = self._bloques[i]
+            desde_posicion = inicio[1] if i == inicio[0] else 0
+            hasta_posicion = fin[1] if i == fin[0] else len(bloque)
+
+            if descendente:
+                yield from reversed(bloque[desde_posicion:hasta_posicion])
+            else:
+                yield from islice(bloque, desde_posicion, hasta_posicion)
+
+    def contar(self, desde=None, hasta=None):
+        """Cuántos valores v cumplen desde <= v < hasta, sin recorrerlos"""
+        inicio = 0 if desde is None else self._posicion(desde)
+        fin = self._largo if hasta is None else self._posicion(hasta)
+        return max(0, fin - inicio)
+
+    def __len__(self):
+        return self._largo
+
+    def __iter__(self):
+        return self.entre()
+
+    def _ubicar(self, valor):
+        """(bloque, posición dentro del bloque) del primer elemento >= valor"""
+        i = bisect_left(self._maximos, valor)
+        if i == len(self._bloques):
+            return (i, 0)
+        return (i, bisect_left(self._bloques[i], valor))
+
+    def _posicion(self, valor):
+        """Cuántos elementos son menores que valor"""
+        i, j = self._ubicar(valor)
+        return self._antes_del_bloque(i) + j
+
+    # Árbol de Fenwick sobre los largos de los bloques: _arbol[k] (desde 1)
+    # guarda la suma de los largos de los bloques k - (k & -k) hasta k - 1
+
+    def _armar_arbol(self):
+        """Arma el árbol con los largos actuales (O(cantidad de bloques))"""
+        arbol = [0] + [len(bloque) for bloque in self._bloques]
+        for k in range(1, len(arbol)):
+            padre = k + (k & -k)
+            if padre < len(arbol):
+                arbol[padre] += arbol[k]
+        self._arbol = arbol
+
+    def _sumar_al_bloque(self, i, cambio):
+        """El bloque i ganó (o perdió) 'cambio' elementos"""
+        k = i + 1
+        while k < len(self._arbol):
+            self._arbol[k] += cambio
+            k += k & -k
+
+    def _antes_del_bloque(self, i):
+        """Cuántos elementos hay en los bloques 0 a i - 1"""
+        total = 0
+        k = i
+        while k > 0:
+            total += self._arbol[k]
+            k -= k & -k
+        return total
+
+
+class IndicesOrdenados:
+    """
+    Índices ordenados por precio, cantidad y subtotal (precio × cantidad).
+
+    Se conecta al Inventario como observador, así se mantiene al día con
+    agregar_producto, actualizar_producto, eliminar_producto,
+    fusionar_inventarios, etc. Cada índice guarda tuplas
+    (valor, orden de llegada): dos productos con el mismo valor salen en
+    el orden en que se agregaron.
+
+    Las consultas cuestan O(log n + k) para k resultados, en vez de
+    recorrer todo el inventario. Devuelven los mismos productos
+    (diccionarios) que tiene el inventario.
+    """
+
+    def __init__(self, productos=()):
+        # Carga inicial de una sola vez (ordenar al final es más rápido
+        # que insertar uno por uno). El orden de llegada es la posición
+        productos = list(productos)
+        self._productos = dict(enumerate(productos))   # orden -> producto
+        self._orden = {id(producto): orden for orden, producto in enumerate(productos)}   # id -> orden
+        self._siguiente_orden = len(productos)
+
+        self._indices = {}
+        for campo in CAMPOS_INDICE:
+            # Se ordenan las posiciones por valor (comparar números es más
+            # rápido que comparar tuplas) y recién después se arman las tuplas
+            valores = list(map(CRITERIOS_ORDEN[campo], productos))
+            posiciones = sorted(range(len(valores)), key=valores.__getitem__)
+            self._indices[campo] = ListaOrdenada([(valores[orden], orden) for orden in posiciones])
+
+    # ------------------------------------------------------------
+    # Avisos del inventario
+    # ------------------------------------------------------------
+
+    def al_agregar(self, producto):
+        orden = self._registrar(producto)
+        for campo in CAMPOS_INDICE:
+            self._indices[campo].agregar((CRITERIOS_ORDEN[campo](producto), orden))
+
+    def al_actualizar(self, producto, precio_anterior, cantidad_anterior):
+        orden = self._orden[id(producto)]
+        anteriores = {
+            "precio": precio_anterior,
+            "cantidad": cantidad_anterior,
+            "subtotal": precio_anterior * cantidad_anterior,
+        }
+
+        for campo in CAMPOS_INDICE:
+            nuevo = CRITERIOS_ORDEN[campo](producto)
+            if nuevo != anteriores[campo]:
+                self._indices[campo].quitar((anteriores[campo], orden))
+                self._indices[campo].agregar((nuevo, orden))
+
+    def al_eliminar(self, producto):
+        orden = self._orden.pop(id(producto))
+        del self._productos[orden]
+        for campo in CAMPOS_INDICE:
+            self._indices[campo].quitar((CRITERIOS_ORDEN[campo](producto), orden))
+
+    def al_vaciar(self):
+        self.__init__()
+
+    # ------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------
+
+    def rango(self, campo, minimo=None, maximo=None, limite=None, descendente=False,
+              incluir_maximo=True):
+        """
+        Productos con minimo <= valor <= maximo (None = sin límite).
+
+        Parámetros:
+        - campo: "precio", "cantidad" o "subtotal"
+        - minimo, maximo: límites del rango (incluidos)
+        - limite: máximo de productos a devolver (None = todos)
+        - descendente: si es True, empieza por los de mayor valor
+        - incluir_maximo: si es False, el máximo queda afuera (valor < maximo)
+
+        Retorna: lista de productos ordenada por ese campo
+        """
+        desde, hasta = self._limites(minimo, maximo, incluir_maximo)
+        entradas = self._indice(campo).entre(desde, hasta, descendente)
+        return [self._productos[orden] for _, orden in islice(entradas, limite)]
+
+    def contar(self, campo, minimo=None, maximo=None, incluir_maximo=True):
+        """Cuántos productos hay en el rango (mismos límites que rango())"""
+        desde, hasta = self._limites(minimo, maximo, incluir_maximo)
+        return self._indice(campo).contar(desde, hasta)
+
+    def top(self, campo, k=10, descendente=True):
+        """Los k productos de mayor valor (o de menor, con descendente=False)"""
+        return self.rango(campo, limite=k, descendente=descendente)
+
+    def __len__(self):
+        return len(self._productos)
+
+    # ------------------------------------------------------------
+    # Funciones internas
+    # ------------------------------------------------------------
+
+    def _registrar(self, producto):
+        """Le da al producto su número de llegada"""
+        orden = self._siguiente_orden
+        self._siguiente_orden += 1
+        self._orden[id(producto)] = orden
+        self._productos[orden] = producto
+        return orden
+
+    def _indice(self, campo):
+        if campo not in self._indices:
+            raise ValueError(f"No hay índice por '{campo}' (opciones: {', '.join(CAMPOS_INDICE)})")
+        return self._indices[campo]
+
+    @staticmethod
+    def _limites(minimo, maximo, incluir_maximo):
+        """
+        Convierte el rango de valores en límites de entradas (valor, orden):
+        (minimo,) va antes que cualquier (minimo, orden) y (maximo, inf)
+        después que cualquier (maximo, orden).
+        """
+        desde = None if minimo is None else (minimo,)
+
+        if maximo is None:
+            hasta = None
+        elif incluir_maximo:
+            hasta = (maximo, math.inf)
+        else:
+            hasta = (maximo,)
+
+        return desde, hasta
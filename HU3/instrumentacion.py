@@ -0,0 +1,452 @@
+# instrumentacion.py
+# Métricas de las funciones de servicios.py y archivos.py, y perfiles
+# con cProfile o tracemalloc
+#
+# Variables de entorno (se leen al iniciar el programa):
+#   INVENTARIO_METRICAS=1                  mide cada función pública
+#   INVENTARIO_METRICAS_SALIDA=m.json      al salir guarda las métricas
+#                                          (JSON, o formato Prometheus si termina en .prom)
+#   INVENTARIO_PERFIL=cprofile             perfil de todo el programa
+#                    (o tracemalloc)       (el resultado se muestra al salir)
+#   INVENTARIO_PERFIL_SALIDA=perfil.prof   además lo guarda en un archivo
+#
+# Sin INVENTARIO_METRICAS las funciones quedan tal cual: no hay ningún
+# costo extra.
+
+import contextlib
+import functools
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+# Se decide una sola vez, al importar: las funciones se envuelven o no
+ACTIVA = os.environ.get("INVENTARIO_METRICAS", "").strip() not in ("", "0")
+
+# Latencias que se guardan por función para calcular percentiles
+# (pasado ese número se reemplazan al azar y la muestra sigue siendo pareja)
+MUESTRAS_LATENCIA = 4096
+
+# Modos de captura disponibles
+MODOS_CAPTURA = ("cprofile", "tracemalloc")
+
+_metricas = {}              # "modulo.funcion" -> Metrica
+_candado = threading.Lock()
+_captura = None             # Captura en curso, o None
+
+
+class Metrica:
+    """Llamadas, errores, tiempo y elementos procesados de una función"""
+
+    def __init__(self, nombre, cuenta_elementos):
+        self.nombre = nombre
+        self.cuenta_elementos = cuenta_elementos
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Pone los contadores en cero"""
+        with _candado:
+            self.llamadas = 0
+            self.errores = 0
+            self.total_ns = 0
+            self.maximo_ns = 0
+            self.elementos = 0 if self.cuenta_elementos else None
+            self._muestras = []
+            self._azar = random.Random(0)
+
+    def registrar(self, duracion_ns, elementos=0, error=False):
+        with _candado:
+            self.llamadas += 1
+            self.total_ns += duracion_ns
+            if duracion_ns > self.maximo_ns:
+                self.maximo_ns = duracion_ns
+            if error:
+                self.errores += 1
+            if self.elementos is not None:
+                self.elementos += elementos
+
+            # Muestra al azar de tamaño fijo (reservoir sampling)
+            if len(self._muestras) < MUESTRAS_LATENCIA:
+                self._muestras.append(duracion_ns)
+            else:
+                posicion = self._azar.randrange(self.llamadas)
+                if posicion < MUESTRAS_LATENCIA:
+                    self._muestras[posicion] = duracion_ns
+
+    def resumen(self):
+        """Diccionario con los valores (se puede pasar a JSON)"""
+        with _candado:
+            muestras = sorted(self._muestras)
+            segundos = self.total_ns / 1e9
+            resultado = {
+                "llamadas": self.llamadas,
+                "errores": self.errores,
+                "segundos": segundos,
+                "latencia_us": {
+                    "p50": percentil(muestras, 50) / 1000,
+                    "p90": percentil(muestras, 90) / 1000,
+                    "p99": percentil(muestras, 99) / 1000,
+                    "max": self.maximo_ns / 1000,
+                },
+            }
+            if self.elementos is not None:
+                resultado["elementos"] = self.elementos
+                resultado["elementos_por_segundo"] = self.elementos / segundos if segundos > 0 else None
+
+        return resultado
+
+
+# ============================================================
+# Percentiles (también los usan benchmark.py y cliente.py)
+# ============================================================
+
+def percentil(valores_ordenados, p):
+    """Percentil p (0-100) de una lista ya ordenada"""
+    if not valores_ordenados:
+        return 0.0
+    posicion = min(len(valores_ordenados) - 1, int(len(valores_ordenados) * p / 100))
+    return valores_ordenados[posicion]
+
+
+def resumir_latencias(latencias_ns, total_s, elementos=None):
+    """Arma el resumen de una medición a partir de las latencias de cada llamada"""
+    latencias_ns.sort()
+    operaciones = len(latencias_ns)
+    elementos = operaciones if elementos is None else elementos
+
+    return {
+        "operaciones": operaciones,
+        "elementos": elementos,
+        "segundos": total_s,
+        "elementos_por_segundo": elementos / total_s if total_s > 0 else None,
+        "latencia_us": {
+            "p50": percentil(latencias_ns, 50) / 1000,
+            "p90": percentil(latencias_ns, 90) / 1000,
+            "p99": percentil(latencias_ns, 99) / 1000,
+            "max": latencias_ns[-1] / 1000 if latencias_ns else 0.0,
+        },
+    }
+
+
+# ============================================================
+# Envolver las funciones
+# ============================================================
+
+def instrumentar_modulo(espacio, elementos=None):
+    """
+    Envuelve todas las funciones públicas de un módulo para medirlas.
+    Se llama al final del módulo con globals(). Si la instrumentación no
+    está activa no hace nada.
+
+    Parámetros:
+    - espacio: globals() del módulo
+    - elementos: diccionario nombre de función -> función que cuenta los
+      elementos procesados. Recibe (resultado, *args, **kwargs) de la
+      llamada; en los generadores, "resultado" es cada valor entregado.
+      Ver por_resultado, por_largo y por_largo_del_argumento.
+    """
+    if not ACTIVA:
+        return
+
+    # Import local: sin métricas no hace falta (así el programa arranca más rápido)
+    import inspect
+
+    modulo = espacio["__name__"]
+    elementos = elementos or {}
+
+    for nombre, valor in list(espacio.items()):
+        # Solo las funciones públicas definidas en este módulo (no las importadas)
+        if nombre.startswith("_") or not inspect.isfunction(valor) or valor.__module__ != modulo:
+            continue
+
+        metrica = Metrica(f"{modulo}.{nombre}", nombre in elementos)
+        _metricas[metrica.nombre] = metrica
+        espacio[nombre] = _envolver(valor, metrica, elementos.get(nombre))
+
+
+def _envolver(funcion, metrica, contar):
+    """Devuelve la función envuelta: misma firma, pero anota cada llamada"""
+    import inspect
+
+    reloj = time.perf_counter_ns
+
+    if inspect.isgeneratorfunction(funcion):
+        @functools.wraps(funcion)
+        def envoltura_generador(*args, **kwargs):
+            # Se mide solo el tiempo dentro del generador, no el de quien lo recorre
+            generador = funcion(*args, **kwargs)
+            duracion = 0
+            cantidad = 0
+            error = False
+
+            try:
+                while True:
+                    antes = reloj()
+                    try:
+                        valor = next(generador)
+                    except StopIteration:
+                        duracion += reloj() - antes
+                        break
+                    duracion += reloj() - antes
+
+                    if contar is not None:
+                        cantidad += contar(valor, *args, **kwargs)
+                    yield valor
+
+            except GeneratorExit:
+                # Quien lo recorría dejó de pedir valores: no es un error
+                raise
+            except BaseException:
+                error = True
+                raise
+            finally:
+                generador.close()
+                metrica.registrar(duracion, cantidad, error)
+
+        return envoltura_generador
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        antes = reloj()
+        try:
+            resultado = funcion(*args, **kwargs)
+        except BaseException:
+            metrica.registrar(reloj() - antes, 0, error=True)
+            raise
+        duracion = reloj() - antes
+
+        metrica.registrar(duracion, contar(resultado, *args, **kwargs) if contar is not None else 0)
+        return resultado
+
+    return envoltura
+
+
+# Contadores de elementos para instrumentar_modulo
+
+def por_resultado(resultado, *args, **kwargs):
+    """La función devuelve la cantidad procesada"""
+    return resultado or 0
+
+
+def por_largo(resultado, *args, **kwargs):
+    """La función devuelve (o entrega) una lista: se cuenta su largo"""
+    return len(resultado) if resultado is not None else 0
+
+
+def por_largo_del_argumento(posicion, nombre):
+    """Se cuenta el largo de un argumento (por ejemplo, la lista de productos recibida)"""
+    def contar(resultado, *args, **kwargs):
+        valor = args[posicion] if len(args) > posicion else kwargs.get(nombre)
+        try:
+            return len(valor)
+        except TypeError:
+            # Generador u otro iterable sin largo: no se puede saber
+            return 0
+    return contar
+
+
+# ============================================================
+# Consultar y exportar las métricas
+# ============================================================
+
+def metricas_activas():
+    """Indica si las funciones se están midiendo"""
+    return ACTIVA
+
+
+def resumen_metricas():
+    """
+    Retorna: diccionario "modulo.funcion" -> resumen (ver Metrica.resumen),
+    solo de las funciones que se llamaron al menos una vez
+    """
+    return {
+        nombre: metrica.resumen()
+        for nombre, metrica in sorted(_metricas.items())
+        if metrica.llamadas > 0
+    }
+
+
+def reiniciar_metricas():
+    """Pone todos los contadores en cero"""
+    for metrica in _metricas.values():
+        metrica.reiniciar()
+
+
+def exportar_prometheus():
+    """Las métricas en el formato de texto de Prometheus"""
+    lineas = []
+
+    def familia(nombre, tipo, ayuda):
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+
+    resumen = resumen_metricas()
+    etiquetas = {}
+    for nombre in resumen:
+        modulo, funcion = nombre.rsplit(".", 1)
+        etiquetas[nombre] = f'modulo="{modulo}",funcion="{funcion}"'
+
+    familia("inventario_llamadas_total", "counter", "Llamadas a la función")
+    for nombre, datos in resumen.items():
+        lineas.append(f"inventario_llamadas_total{{{etiquetas[nombre]}}} {datos['llamadas']}")
+
+    familia("inventario_errores_total", "counter", "Llamadas que terminaron con una excepción")
+    for nombre, datos in resumen.items():
+        lineas.append(f"inventario_errores_total{{{etiquetas[nombre]}}} {datos['errores']}")
+
+    familia("inventario_duracion_segundos", "summary", "Duración de cada llamada")
+    for nombre, datos in resumen.items():
+        for cuantil, clave in (("0.5", "p50"), ("0.9", "p90"), ("0.99", "p99")):
+            segundos = datos["latencia_us"][clave] / 1e6
+            lineas.append(f'inventario_duracion_segundos{{{etiquetas[nombre]},quantile="{cuantil}"}} {segundos!r}')
+        lineas.append(f"inventario_duracion_segundos_sum{{{etiquetas[nombre]}}} {datos['segundos']!r}")
+        lineas.append(f"inventario_duracion_segundos_count{{{etiquetas[nombre]}}} {datos['llamadas']}")
+
+    familia("inventario_elementos_total", "counter", "Elementos procesados (filas leídas, productos fusionados o escritos)")
+    for nombre, datos in resumen.items():
+        if "elementos" in datos:
+            lineas.append(f"inventario_elementos_total{{{etiquetas[nombre]}}} {datos['elementos']}")
+
+    return "\n".join(lineas) + "\n"
+
+
+def guardar_metricas(ruta):
+    """
+    Guarda las métricas en un archivo: formato Prometheus si termina en
+    .prom, JSON en cualquier otro caso.
+    """
+    if ruta.endswith(".prom"):
+        texto = exportar_prometheus()
+    else:
+        texto = json.dumps(resumen_metricas(), ensure_ascii=False, indent=2) + "\n"
+
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        archivo.write(texto)
+
+
+# ============================================================
+# Captura con cProfile o tracemalloc
+# ============================================================
+
+class Captura:
+    """
+    Perfil de todo lo que pasa entre iniciar() y detener():
+    - "cprofile": tiempo de cada función (incluidas las de Python)
+    - "tracemalloc": memoria reservada por cada línea de código
+    """
+
+    def __init__(self, modo):
+        if modo not in MODOS_CAPTURA:
+            raise ValueError(f"Modo de captura desconocido: '{modo}' (opciones: {', '.join(MODOS_CAPTURA)})")
+        self.modo = modo
+        self._perfil = None
+
+    def iniciar(self):
+        # Imports locales: solo hacen falta al capturar (así el programa
+        # arranca más rápido)
+        if self.modo == "cprofile":
+            import cProfile
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        else:
+            import tracemalloc
+            tracemalloc.start()
+
+    def detener(self, ruta=None, limite=20):
+        """
+        Termina la captura.
+
+        Parámetros:
+        - ruta: archivo opcional donde guardar el resultado completo
+          (para cprofile se abre con pstats o snakeviz)
+        - limite: cuántas filas muestra el informe
+
+        Retorna: el informe en texto
+        """
+        if self.modo == "cprofile":
+            import pstats
+
+            self._perfil.disable()
+            if ruta:
+                self._perfil.dump_stats(ruta)
+
+            salida = io.StringIO()
+            estadisticas = pstats.Stats(self._perfil, stream=salida)
+            estadisticas.sort_stats("cumulative").print_stats(limite)
+            return salida.getvalue()
+
+        import tracemalloc
+
+        foto = tracemalloc.take_snapshot()
+        actual, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if ruta:
+            foto.dump(ruta)
+
+        lineas = [f"Memoria en uso: {actual / 1024:.1f} KB (pico: {pico / 1024:.1f} KB)"]
+        for estadistica in foto.statistics("lineno")[:limite]:
+            lineas.append(str(estadistica))
+        return "\n".join(lineas) + "\n"
+
+
+def iniciar_captura(modo):
+    """Empieza una captura ("cprofile" o "tracemalloc"). Lanza ValueError si ya hay una"""
+    global _captura
+
+    if _captura is not None:
+        raise ValueError(f"Ya hay una captura en curso ({_captura.modo})")
+
+    captura = Captura(modo)
+    captura.iniciar()
+    _captura = captura
+
+
+def detener_captura(ruta=None, limite=20):
+    """Termina la captura en curso. Retorna el informe (ver Captura.detener), o None si no había"""
+    global _captura
+
+    if _captura is None:
+        return None
+
+    captura, _captura = _captura, None
+    return captura.detener(ruta, limite)
+
+
+def captura_activa():
+    """Modo de la captura en curso, o None"""
+    return _captura.modo if _captura is not None else None
+
+
+@contextlib.contextmanager
+def desde_entorno(salida=None):
+    """
+    Aplica las variables de entorno de arriba a un bloque de código:
+    empieza el perfil (INVENTARIO_PERFIL) y al terminar muestra su
+    informe y guarda las métricas (INVENTARIO_METRICAS_SALIDA).
+
+    Parámetros:
+    - salida: dónde se escribe el informe (por defecto, la salida de errores,
+      para no mezclarlo con la salida normal del programa)
+    """
+    salida = salida or sys.stderr
+    modo = os.environ.get("INVENTARIO_PERFIL", "").strip()
+
+    if modo:
+        try:
+            iniciar_captura(modo)
+        except ValueError as error:
+            salida.write(f"INVENTARIO_PERFIL: {error}\n")
+
+    try:
+        yield
+    finally:
+        informe = detener_captura(os.environ.get("INVENTARIO_PERFIL_SALIDA", "").strip() or None)
+        if informe is not None:
+            salida.write(informe)
+
+        ruta_metricas = os.environ.get("INVENTARIO_METRICAS_SALIDA", "").strip()
+        if ACTIVA and ruta_metricas:
+            guardar_metricas(ruta_metricas)
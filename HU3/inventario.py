@@ -0,0 +1,446 @@
+# inventario.py
+# Contenedor de productos con un índice por nombre para búsquedas rápidas
+
+from estadisticas import EstadisticasIncrementales
+
+
+def clave_nombre(nombre):
+    """
+    Devuelve la clave con la que se indexa un producto.
+
+    Se usa el nombre en minúsculas, igual que la comparación que
+    hacía buscar_producto, para que la búsqueda no distinga mayúsculas.
+    Si el nombre ya está en minúsculas se reutiliza el mismo texto en
+    vez de guardar una copia igual en el índice.
+    """
+    clave = nombre.lower()
+
+    if clave == nombre:
+        return nombre
+
+    return clave
+
+
+# Se compacta la lista cuando los huecos superan esta proporción del total
+PROPORCION_COMPACTAR = 0.5
+
+# Por debajo de este número de huecos nunca se compacta (no vale la pena)
+MINIMO_COMPACTAR = 1024
+
+# Criterios para ordenar productos -> valor por el que se ordena cada producto
+CRITERIOS_ORDEN = {
+    "nombre": lambda producto: clave_nombre(producto["nombre"]),
+    "precio": lambda producto: producto["precio"],
+    "cantidad": lambda producto: producto["cantidad"],
+    "subtotal": lambda producto: producto["precio"] * producto["cantidad"],
+}
+
+
+class Inventario:
+    """
+    Inventario de productos que se usa igual que una lista de diccionarios
+    {"nombre", "precio", "cantidad"}, pero que además mantiene un índice
+    nombre -> posición.
+
+    Gracias al índice, buscar, actualizar, eliminar y fusionar un producto
+    ya no necesitan recorrer toda la lista.
+
+    Al eliminar no se mueve la lista: la posición queda como un hueco
+    (None) y los huecos se limpian de vez en cuando (compactación).
+
+    Si se agregan varios productos con el mismo nombre, el índice apunta
+    al primero (igual que la búsqueda lineal de antes).
+
+    Otros objetos pueden registrarse como observadores para enterarse de
+    cada cambio. Un observador tiene los métodos:
+    - al_agregar(producto)
+    - al_actualizar(producto, precio_anterior, cantidad_anterior)
+    - al_eliminar(producto)
+    - al_vaciar()
+    Por eso los precios y cantidades se deben cambiar con actualizar() o
+    fusionar(), no modificando el diccionario directamente.
+    """
+
+    def __init__(self, productos=None):
+        self._productos = []   # Productos en orden; None = producto eliminado
+        self._indice = {}      # clave -> posición en self._productos
+        self._repetidos = {}   # clave -> cuántos productos extra tienen ese nombre
+        self._huecos = 0       # Cuántas posiciones son None
+        self._observadores = []
+        self._busqueda = None  # Índice de búsqueda (se crea la primera vez que se usa)
+        self._indices = None   # Índices por precio, cantidad y subtotal (ídem)
+        self._version = 0      # Aumenta con cada cambio
+        self._ordenes = {}     # (criterio, descendente) -> productos ordenados
+        self._version_ordenes = 0
+
+        # Estadísticas que se mantienen con cada cambio
+        self._estadisticas = EstadisticasIncrementales()
+        self.agregar_observador(self._estadisticas)
+
+        if productos is not None:
+            self.extend(productos)
+
+    # ------------------------------------------------------------
+    # Operaciones que usan el índice
+    # ------------------------------------------------------------
+
+    def agregar(self, nombre, precio, cantidad):
+        """Crea un producto nuevo, lo agrega y lo devuelve"""
+        producto = {
+            "nombre": nombre,
+            "precio": precio,
+            "cantidad": cantidad
+        }
+        self.append(producto)
+        return producto
+
+    def buscar(self, nombre, ocurrencia=0):
+        """
+        Devuelve el producto con ese nombre, o None si no existe.
+        Con nombres repetidos, 'ocurrencia' elige cuál (0 = el primero)
+        """
+        posicion = self._posicion(nombre, ocurrencia)
+
+        if posicion is None:
+            return None
+
+        return self._productos[posicion]
+
+    def actualizar(self, nombre, nuevo_precio=None, nueva_cantidad=None, ocurrencia=0):
+        """
+        Actualiza precio y/o cantidad. Retorna False si no existe.
+        Con nombres repetidos, 'ocurrencia' elige cuál (0 = el primero)
+        """
+        posicion = self._posicion(nombre, ocurrencia)
+
+        if posicion is None:
+            return False
+
+        producto = self._productos[posicion]
+
+        precio_anterior = producto["precio"]
+        cantidad_anterior = producto["cantidad"]
+
+        if nuevo_precio is not None:
+            producto["precio"] = nuevo_precio
+
+        if nueva_cantidad is not None:
+            producto["cantidad"] = nueva_cantidad
+
+        self._avisar("al_actualizar", producto, precio_anterior, cantidad_anterior)
+        return True
+
+    def eliminar(self, nombre, ocurrencia=0):
+        """
+        Elimina el producto con ese nombre. Retorna False si no existe.
+        Con nombres repetidos, 'ocurrencia' elige cuál (0 = el primero)
+        """
+        posicion = self._posicion(nombre, ocurrencia)
+
+        if posicion is None:
+            return False
+
+        self._quitar_posicion(posicion)
+        self._compactar_si_hace_falta()
+        return True
+
+    def eliminar_varios(self, nombres):
+        """
+        Elimina varios productos por nombre.
+        La compactación se hace una sola vez al final.
+
+        Retorna: cuántos productos se eliminaron
+        """
+        eliminados = 0
+
+        for nombre in nombres:
+            posicion = self._indice.get(clave_nombre(nombre))
+
+            if posicion is not None:
+                self._quitar_posicion(posicion)
+                eliminados += 1
+
+        self._compactar_si_hace_falta()
+        return eliminados
+
+    def fusionar(self, producto_nuevo):
+        """
+        Fusiona un producto: si ya existe suma la cantidad y actualiza
+        el precio; si no existe lo agrega.
+
+        Retorna: True si el producto ya existía, False si se agregó
+        """
+        return self.fusionar_valores(producto_nuevo["nombre"], producto_nuevo["precio"],
+                                     producto_nuevo["cantidad"])
+
+    def fusionar_valores(self, nombre, precio, cantidad):
+        """
+        Igual que fusionar(), pero recibe los valores sueltos
+        (así no hace falta crear un diccionario por fila).
+
+        Retorna: True si el producto ya existía, False si se agregó
+        """
+        posicion = self._indice.get(clave_nombre(nombre))
+
+        if posicion is None:
+            self.agregar(nombre, precio, cantidad)
+            return False
+
+        producto_existente = self._productos[posicion]
+        precio_anterior = producto_existente["precio"]
+        cantidad_anterior = producto_existente["cantidad"]
+
+        producto_existente["cantidad"] += cantidad
+        producto_existente["precio"] = precio
+
+        self._avisar("al_actualizar", producto_existente,
+                     precio_anterior, cantidad_anterior)
+        return True
+
+    def repeticiones(self, nombre):
+        """Cuántos productos tienen ese nombre (sin distinguir mayúsculas)"""
+        clave = clave_nombre(nombre)
+
+        if clave not in self._indice:
+            return 0
+
+        return 1 + self._repetidos.get(clave, 0)
+
+    def ocurrencia(self, producto):
+        """
+        Cuántos productos con el mismo nombre están antes que este
+        (0 = es el que devuelve buscar). Sin nombres repetidos no recorre
+        nada. Lanza ValueError si el producto no está en el inventario.
+        """
+        clave = clave_nombre(producto["nombre"])
+        posicion = self._indice.get(clave)
+
+        if posicion is not None:
+            if self._productos[posicion] is producto:
+                return 0
+
+            # Los repetidos siempre están después del primero
+            anteriores = 0
+            for siguiente in range(posicion, len(self._productos)):
+                otro = self._productos[siguiente]
+                if otro is producto:
+                    return anteriores
+                if otro is not None and clave_nombre(otro["nombre"]) == clave:
+                    anteriores += 1
+
+        raise ValueError("El producto no está en el inventario")
+
+    def estadisticas(self):
+        """
+        Devuelve las estadísticas sin recorrer el inventario (O(1)).
+        Mismo formato que servicios.calcular_estadisticas.
+        """
+        return self._estadisticas.resumen()
+
+    def agregar_observador(self, observador, avisar_existentes=True):
+        """
+        Registra un observador. Si avisar_existentes es True, además le
+        avisa (con al_agregar) de los productos que ya hay.
+        """
+        self._observadores.append(observador)
+
+        if avisar_existentes:
+            for producto in self:
+                observador.al_agregar(producto)
+
+    def quitar_observador(self, observador):
+        """Deja de avisarle a un observador"""
+        self._observadores.remove(observador)
+
+    def indice_busqueda(self):
+        """
+        Devuelve el índice para buscar por prefijo o con errores de tipeo
+        (ver busqueda.py). Se arma la primera vez que se pide y después
+        se mantiene al día como observador.
+        """
+        if self._busqueda is None:
+            # Import local: busqueda.py importa este módulo
+            from busqueda import IndiceBusqueda
+
+            self._busqueda = IndiceBusqueda(self)
+            self.agregar_observador(self._busqueda, avisar_existentes=False)
+
+        return self._busqueda
+
+    def indices_ordenados(self):
+        """
+        Devuelve los índices por precio, cantidad y subtotal para
+        consultas por rango (ver indices.py). Se arman la primera vez que
+        se piden y después se mantienen al día como observador.
+        """
+        if self._indices is None:
+            # Import local: indices.py importa este módulo
+            from indices import IndicesOrdenados
+
+            self._indices = IndicesOrdenados(self)
+            self.agregar_observador(self._indices, avisar_existentes=False)
+
+        return self._indices
+
+    def productos_ordenados(self, criterio, inicio=0, fin=None, descendente=False):
+        """
+        Devuelve los productos ordenados por 'criterio' (ver CRITERIOS_ORDEN),
+        solo los que van de la posición 'inicio' a 'fin'.
+
+        El orden se calcula una vez y se reutiliza mientras el inventario
+        no cambie, así pedir otra página no vuelve a ordenar todo.
+        """
+        if self._version_ordenes != self._version:
+            self._ordenes.clear()
+            self._version_ordenes = self._version
+
+        ordenados = self._ordenes.get((criterio, descendente))
+
+        if ordenados is None:
+            ordenados = sorted(self, key=CRITERIOS_ORDEN[criterio], reverse=descendente)
+            self._ordenes[(criterio, descendente)] = ordenados
+
+        return ordenados[inicio:fin]
+
+    # ------------------------------------------------------------
+    # Métodos de lista, para que el código existente siga funcionando
+    # ------------------------------------------------------------
+
+    def append(self, producto):
+        """Agrega un producto (diccionario) al final"""
+        clave = clave_nombre(producto["nombre"])
+
+        if clave in self._indice:
+            # Nombre repetido: se guarda, pero el índice sigue en el primero
+            self._repetidos[clave] = self._repetidos.get(clave, 0) + 1
+        else:
+            self._indice[clave] = len(self._productos)
+
+        self._productos.append(producto)
+        self._avisar("al_agregar", producto)
+
+    def extend(self, productos):
+        """Agrega varios productos al final"""
+        for producto in productos:
+            self.append(producto)
+
+    def remove(self, producto):
+        """Elimina el primer producto igual al indicado (como list.remove)"""
+        for posicion, otro in enumerate(self._productos):
+            if otro is not None and (otro is producto or otro == producto):
+                self._quitar_posicion(posicion)
+                self._compactar_si_hace_falta()
+                return
+
+        raise ValueError("El producto no está en el inventario")
+
+    def clear(self):
+        """Vacía el inventario"""
+        self._productos.clear()
+        self._indice.clear()
+        self._repetidos.clear()
+        self._huecos = 0
+        self._avisar("al_vaciar")
+
+    def compactar(self):
+        """Quita los huecos de la lista y recalcula las posiciones del índice"""
+        if self._huecos == 0:
+            return
+
+        self._productos = [p for p in self._productos if p is not None]
+        self._huecos = 0
+
+        # Reconstruir el índice con las nuevas posiciones
+        self._indice.clear()
+        for posicion, producto in enumerate(self._productos):
+            clave = clave_nombre(producto["nombre"])
+            if clave not in self._indice:
+                self._indice[clave] = posicion
+
+    def __len__(self):
+        return len(self._productos) - self._huecos
+
+    def __iter__(self):
+        if self._huecos == 0:
+            return iter(self._productos)
+        return (p for p in self._productos if p is not None)
+
+    def __getitem__(self, posicion):
+        # Las posiciones solo tienen sentido sin huecos
+        self.compactar()
+        return self._productos[posicion]
+
+    def __repr__(self):
+        return f"Inventario({list(self)!r})"
+
+    # ------------------------------------------------------------
+    # Funciones internas
+    # ------------------------------------------------------------
+
+    def _posicion(self, nombre, ocurrencia=0):
+        """Posición del producto número 'ocurrencia' con ese nombre, o None"""
+        clave = clave_nombre(nombre)
+        posicion = self._indice.get(clave)
+
+        if posicion is None or ocurrencia == 0:
+            return posicion
+
+        # Los repetidos siempre están después del primero
+        for siguiente in range(posicion + 1, len(self._productos)):
+            otro = self._productos[siguiente]
+            if otro is not None and clave_nombre(otro["nombre"]) == clave:
+                ocurrencia -= 1
+                if ocurrencia == 0:
+                    return siguiente
+
+        return None
+
+    def _quitar_posicion(self, posicion):
+        """Deja un hueco en esa posición y mantiene el índice al día"""
+        producto = self._productos[posicion]
+
+        # Se avisa antes de quitarlo: los observadores todavía lo ven en su
+        # lugar (el registro de cambios anota cuál de los repetidos era) y,
+        # si alguno falla, el producto no se pierde
+        self._avisar("al_eliminar", producto)
+
+        self._productos[posicion] = None
+        self._huecos += 1
+
+        clave = clave_nombre(producto["nombre"])
+
+        if self._indice.get(clave) != posicion:
+            # Era uno de los repetidos, el índice no cambia
+            self._descontar_repetido(clave)
+            return
+
+        if clave not in self._repetidos:
+            del self._indice[clave]
+            return
+
+        # Había repetidos: el siguiente con ese nombre pasa al índice
+        for siguiente in range(posicion + 1, len(self._productos)):
+            otro = self._productos[siguiente]
+            if otro is not None and clave_nombre(otro["nombre"]) == clave:
+                self._indice[clave] = siguiente
+                break
+        self._descontar_repetido(clave)
+
+    def _avisar(self, evento, *datos):
+        """Llama al método 'evento' de cada observador"""
+        self._version += 1
+        for observador in self._observadores:
+            getattr(observador, evento)(*datos)
+
+    def _compactar_si_hace_falta(self):
+        """Compacta cuando hay demasiados huecos"""
+        if self._huecos >= MINIMO_COMPACTAR and \
+           self._huecos > len(self._productos) * PROPORCION_COMPACTAR:
+            self.compactar()
+
+    def _descontar_repetido(self, clave):
+        """Resta uno al contador de nombres repetidos"""
+        if self._repetidos[clave] == 1:
+            del self._repetidos[clave]
+        else:
+            self._repetidos[clave] -= 1
@@ -0,0 +1,275 @@
+# journal.py
+# Registro de cambios (write-ahead log) para no perder trabajo
+#
+# Cada cambio del inventario se agrega al final de un archivo de registro
+# (una línea JSON por cambio). Guardar un cambio cuesta lo mismo tenga
+# el inventario 10 productos o un millón.
+#
+# Archivos que se usan, para una base "inventario.csv":
+#   inventario.csv               última copia completa (CSV o snapshot)
+#   inventario.csv.log           cambios desde esa copia
+#   inventario.csv.log.anterior  cambios que se están pasando a la copia
+#
+# Para recuperar: se carga la copia completa y se vuelven a aplicar los
+# cambios de los registros. Cada registro deja un valor absoluto
+# (no "sumar 3" sino "ahora hay 10"), así que aplicar un registro dos
+# veces da el mismo resultado. Como puede haber varios productos con el
+# mismo nombre, cada registro dice también de cuál se trata.
+
+import json
+import os
+import threading
+
+from inventario import Inventario
+from archivos import cargar_csv, escribir_csv
+from snapshot import FIRMA, InventarioSnapshot, escribir_snapshot
+
+# Cuando el registro supera este tamaño se compacta en segundo plano (64 MB)
+TAMANO_COMPACTAR = 64 * 1024 * 1024
+
+
+class Journal:
+    """
+    Registro de cambios de un Inventario.
+
+    Se conecta al inventario como observador: cada producto agregado,
+    actualizado (también al fusionar) o eliminado se escribe como una
+    línea en el registro:
+    - ["A", nombre, precio, cantidad, n]   se agregó un producto; después
+                                           hay n con ese nombre
+    - ["S", nombre, precio, cantidad, k]   el producto queda con esos valores
+    - ["D", nombre, k]                     el producto se eliminó
+    - ["C"]                                el inventario se vació
+
+    k indica cuál de los productos con ese nombre (0 = el primero, el
+    que encuentra buscar). Los registros de versiones anteriores, sin k,
+    se leen como k = 0.
+
+    compactar() guarda una copia completa nueva en un hilo aparte y
+    empieza un registro vacío.
+    """
+
+    def __init__(self, ruta_base, tamano_compactar=TAMANO_COMPACTAR, sincronizar=False):
+        """
+        Parámetros:
+        - ruta_base: archivo con la copia completa (CSV, o snapshot si termina en .bin)
+        - tamano_compactar: bytes de registro que disparan la compactación
+        - sincronizar: si es True se hace fsync después de cada cambio
+          (más lento, pero sobrevive a un corte de luz)
+        """
+        self.ruta_base = ruta_base
+        self.ruta_log = ruta_base + ".log"
+        self.ruta_log_anterior = ruta_base + ".log.anterior"
+        self.tamano_compactar = tamano_compactar
+        self.sincronizar = sincronizar
+
+        self._inventario = None
+        self._hilo = None
+        self.error_compactacion = None
+        self._archivo = self._abrir_log()
+
+    def conectar(self, inventario):
+        """Empieza a registrar los cambios de este inventario"""
+        self._inventario = inventario
+        inventario.agregar_observador(self, avisar_existentes=False)
+
+    # ------------------------------------------------------------
+    # Avisos del inventario
+    # ------------------------------------------------------------
+
+    def al_agregar(self, producto):
+        self._escribir(["A", producto["nombre"], producto["precio"], producto["cantidad"],
+                        self._inventario.repeticiones(producto["nombre"])])
+
+    def al_actualizar(self, producto, precio_anterior, cantidad_anterior):
+        self._escribir(["S", producto["nombre"], producto["precio"], producto["cantidad"],
+                        self._inventario.ocurrencia(producto)])
+
+    def al_eliminar(self, producto):
+        # El inventario avisa antes de quitarlo, así que todavía está en su lugar
+        self._escribir(["D", producto["nombre"], self._inventario.ocurrencia(producto)])
+
+    def al_vaciar(self):
+        self._escribir(["C"])
+
+    # ------------------------------------------------------------
+    # Compactación
+    # ------------------------------------------------------------
+
+    def compactar(self, esperar=False):
+        """
+        Pasa los cambios registrados a una copia completa nueva.
+
+        En el hilo principal solo se copia el inventario en memoria y se
+        cambia de archivo de registro; escribir la copia a disco se hace
+        en un hilo aparte. Si esperar es True, espera a que termine.
+        """
+        # Solo una compactación a la vez
+        self._esperar_hilo()
+
+        productos = [dict(producto) for producto in self._inventario]
+
+        # Los cambios hasta ahora pasan al registro "anterior"
+        self._archivo.close()
+        if os.path.exists(self.ruta_log_anterior):
+            # Quedó uno de una compactación que falló: se le agrega este
+            _agregar_al_final(self.ruta_log, self.ruta_log_anterior)
+            os.remove(self.ruta_log)
+        else:
+            os.replace(self.ruta_log, self.ruta_log_anterior)
+        self._archivo = self._abrir_log()
+
+        self._hilo = threading.Thread(target=self._escribir_base, args=(productos,), daemon=True)
+        self._hilo.start()
+
+        if esperar:
+            self._esperar_hilo()
+
+    def cerrar(self):
+        """Espera la compactación pendiente y cierra el registro"""
+        self._esperar_hilo()
+
+        if self._inventario is not None:
+            self._inventario.quitar_observador(self)
+            self._inventario = None
+
+        self._archivo.close()
+
+    # ------------------------------------------------------------
+    # Funciones internas
+    # ------------------------------------------------------------
+
+    def _abrir_log(self):
+        """Abre el registro para agregar líneas al final"""
+        # Si la última línea quedó cortada, se termina para no mezclarla con la siguiente
+        if os.path.exists(self.ruta_log) and os.path.getsize(self.ruta_log) > 0:
+            with open(self.ruta_log, 'rb+') as archivo:
+                archivo.seek(-1, os.SEEK_END)
+                if archivo.read(1) != b"\n":
+                    archivo.write(b"\n")
+
+        return open(self.ruta_log, 'a', encoding='utf-8')
+
+    def _escribir(self, registro):
+        """Agrega una línea al registro y la manda al sistema operativo"""
+        self._archivo.write(json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._archivo.flush()
+
+        if self.sincronizar:
+            os.fsync(self._archivo.fileno())
+
+        if self._archivo.tell() > self.tamano_compactar and \
+           (self._hilo is None or not self._hilo.is_alive()):
+            self.compactar()
+
+    def _escribir_base(self, productos):
+        """(En otro hilo) escribe la copia completa y borra el registro anterior"""
+        try:
+            if self.ruta_base.endswith(".bin"):
+                escribir_snapshot(productos, self.ruta_base)
+            else:
+                escribir_csv(productos, self.ruta_base)
+            os.remove(self.ruta_log_anterior)
+            self.error_compactacion = None
+
+        except Exception as error:
+            # El registro anterior se conserva: se aplicará al recuperar
+            self.error_compactacion = error
+
+    def _esperar_hilo(self):
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+
+def recuperar(ruta_base, **opciones):
+    """
+    Reconstruye el inventario: carga la última copia completa y aplica
+    los registros de cambios. Después deja el registro conectado.
+
+    Parámetros:
+    - ruta_base: archivo con la copia completa (CSV o snapshot)
+    - opciones: se pasan a Journal (tamano_compactar, sincronizar)
+
+    Retorna: (inventario, journal)
+    """
+    inventario = Inventario()
+
+    if os.path.exists(ruta_base):
+        if _es_snapshot(ruta_base):
+            snapshot = InventarioSnapshot(ruta_base)
+            inventario.extend(snapshot)
+            snapshot.cerrar()
+        else:
+            productos = cargar_csv(ruta_base)
+            if productos is not None:
+                inventario.extend(productos)
+
+    journal = Journal(ruta_base, **opciones)
+
+    # Primero los cambios que quedaron de una compactación sin terminar
+    for ruta in (journal.ruta_log_anterior, journal.ruta_log):
+        if os.path.exists(ruta):
+            reproducir(inventario, ruta)
+
+    journal.conectar(inventario)
+    return inventario, journal
+
+
+def reproducir(inventario, ruta_log):
+    """
+    Aplica al inventario los cambios de un archivo de registro.
+    Una última línea incompleta (el programa se cerró mientras se
+    escribía) se ignora.
+
+    Retorna: cuántos cambios se aplicaron
+    """
+    aplicados = 0
+
+    with open(ruta_log, 'r', encoding='utf-8') as archivo:
+        for linea in archivo:
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                continue
+
+            tipo = registro[0]
+
+            if tipo == "A":
+                # Si ya hay n productos con ese nombre, el agregado ya está
+                # en la copia completa: solo se le ponen los valores
+                _, nombre, precio, cantidad, total = registro
+                if inventario.repeticiones(nombre) < total:
+                    inventario.agregar(nombre, precio, cantidad)
+                else:
+                    inventario.actualizar(nombre, precio, cantidad, total - 1)
+            elif tipo == "S":
+                nombre, precio, cantidad = registro[1:4]
+                ocurrencia = registro[4] if len(registro) > 4 else 0
+                if not inventario.actualizar(nombre, precio, cantidad, ocurrencia):
+                    inventario.agregar(nombre, precio, cantidad)
+            elif tipo == "D":
+                ocurrencia = registro[2] if len(registro) > 2 else 0
+                inventario.eliminar(registro[1], ocurrencia)
+            elif tipo == "C":
+                inventario.clear()
+
+            aplicados += 1
+
+    return aplicados
+
+
+def _es_snapshot(ruta):
+    """Indica si el archivo empieza con la firma de un snapshot binario"""
+    with open(ruta, 'rb') as archivo:
+        return archivo.read(len(FIRMA)) == FIRMA
+
+
+def _agregar_al_final(origen, destino):
+    """Copia el contenido de 'origen' al final de 'destino'"""
+    with open(origen, 'rb') as entrada, open(destino, 'ab') as salida:
+        while True:
+            bloque = entrada.read(1024 * 1024)
+            if not bloque:
+                break
+            salida.write(bloque)
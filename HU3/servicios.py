@@ -1,18 +1,45 @@
 # servicios.py
 # Funciones para gestionar el inventario de productos
+#
+# Todas las funciones aceptan una lista de diccionarios o un Inventario
+# (ver inventario.py). Con un Inventario se usa su índice por nombre y
+# las operaciones ya no recorren toda la lista.
+
+import sys
+
+from busqueda import IndiceBusqueda
+from indices import IndicesOrdenados
+from instrumentacion import instrumentar_modulo, por_largo, por_largo_del_argumento, por_resultado
+from inventario import CRITERIOS_ORDEN
+
+# Filas que se arman antes de escribirlas juntas en la pantalla
+FILAS_POR_BLOQUE = 1000
+
+# Cantidad por debajo de la cual un producto tiene stock bajo
+UMBRAL_STOCK_BAJO = 10
+
+
+def _es_indexado(inventario):
+    """Indica si el inventario tiene su propio índice (no es una lista simple)"""
+    return not isinstance(inventario, list)
+
 
 def agregar_producto(inventario, nombre, precio, cantidad):
     """
     Agrega un nuevo producto al inventario.
     
     Parámetros:
-    - inventario: lista de productos (diccionarios)
+    - inventario: lista de productos (diccionarios) o Inventario
     - nombre: nombre del producto (str)
     - precio: precio unitario (float)
     - cantidad: cantidad disponible (int)
     
     Retorna: True si se agregó correctamente
     """
+    if _es_indexado(inventario):
+        inventario.agregar(nombre, precio, cantidad)
+        return True
+    
     # Crear un nuevo producto como diccionario
     producto = {
         "nombre": nombre,
@@ -25,33 +52,104 @@ def agregar_producto(inventario, nombre, precio, cantidad):
     return True
 
 
-def mostrar_inventario(inventario):
+def mostrar_inventario(inventario, pagina=None, por_pagina=50, ordenar_por=None,
+                       descendente=False, limite=None, salida=None):
     """
-    Muestra todos los productos del inventario en formato tabla.
+    Muestra los productos del inventario en formato tabla.
+    
+    El texto se arma en bloques grandes y se escribe de una vez por
+    bloque (no una llamada a print por fila). Con un Inventario el orden
+    se calcula una sola vez y se reutiliza para todas las páginas.
     
     Parámetros:
     - inventario: lista de productos
+    - pagina: número de página a mostrar (desde 1; si pasa de la última se
+      muestra la última); None = todas las filas
+    - por_pagina: filas por página (1 o más)
+    - ordenar_por: "nombre", "precio", "cantidad", "subtotal" o None (orden de carga)
+    - descendente: si es True, de mayor a menor
+    - limite: máximo de filas a considerar (None = sin límite)
+    - salida: dónde escribir (por defecto la pantalla)
     
-    Retorna: None
+    Retorna: cantidad total de páginas (0 si el inventario está vacío).
+    Lanza ValueError si el criterio, la página, por_pagina o el límite no
+    son válidos.
     """
-    if len(inventario) == 0:
-        print("\n El inventario está vacío")
-        return
+    if ordenar_por is not None and ordenar_por not in CRITERIOS_ORDEN:
+        raise ValueError(f"No se puede ordenar por '{ordenar_por}'")
     
-    print("\n" + "="*60)
-    print(" INVENTARIO DE PRODUCTOS")
-    print("="*60)
-    print(f"{'Producto':<25} {'Precio':>10} {'Cantidad':>10}")
-    print("-"*60)
+    if por_pagina < 1:
+        raise ValueError(f"Debe haber al menos 1 producto por página (se pidió {por_pagina})")
     
-    # Recorrer cada producto y mostrarlo
-    for producto in inventario:
-        nombre = producto["nombre"]
-        precio = producto["precio"]
-        cantidad = producto["cantidad"]
-        print(f"{nombre:<25} ${precio:>9.2f} {cantidad:>10}")
+    if pagina is not None and pagina < 1:
+        raise ValueError(f"Las páginas empiezan en 1 (se pidió la {pagina})")
+    
+    if limite is not None and limite < 0:
+        raise ValueError(f"El límite no puede ser negativo (se pidió {limite})")
+    
+    if salida is None:
+        salida = sys.stdout
+    
+    total = len(inventario)
+    if limite is not None:
+        total = min(total, limite)
+    
+    if total == 0:
+        salida.write("\n El inventario está vacío\n")
+        return 0
+    
+    paginas = (total + por_pagina - 1) // por_pagina
+    
+    # Qué filas se muestran
+    if pagina is None:
+        inicio, fin = 0, total
+    else:
+        pagina = min(pagina, paginas)
+        inicio = (pagina - 1) * por_pagina
+        fin = min(inicio + por_pagina, total)
+    
+    con_subtotal = ordenar_por == "subtotal"
+    
+    if ordenar_por is not None and not hasattr(inventario, "productos_ordenados"):
+        # Lista simple: se ordena una sola vez para todos los bloques
+        inventario = sorted(inventario, key=CRITERIOS_ORDEN[ordenar_por], reverse=descendente)
+        ordenar_por = None
+    
+    ancho = 72 if con_subtotal else 60
+    
+    encabezado = ["", "=" * ancho, " INVENTARIO DE PRODUCTOS"]
+    if pagina is not None:
+        encabezado[-1] += f" (página {pagina} de {paginas}, {total} productos)"
+    encabezado += ["=" * ancho, f"{'Producto':<25} {'Precio':>10} {'Cantidad':>10}"
+                   + (f" {'Subtotal':>12}" if con_subtotal else ""), "-" * ancho]
+    salida.write("\n".join(encabezado) + "\n")
+    
+    # Escribir las filas por bloques
+    for desde in range(inicio, fin, FILAS_POR_BLOQUE):
+        hasta = min(desde + FILAS_POR_BLOQUE, fin)
+        bloque = _productos_a_mostrar(inventario, ordenar_por, descendente, desde, hasta)
+        
+        if con_subtotal:
+            filas = [f"{p['nombre']:<25} ${p['precio']:>9.2f} {p['cantidad']:>10} "
+                     f"${p['precio'] * p['cantidad']:>11.2f}" for p in bloque]
+        else:
+            filas = [f"{p['nombre']:<25} ${p['precio']:>9.2f} {p['cantidad']:>10}"
+                     for p in bloque]
+        
+        salida.write("\n".join(filas) + "\n")
+    
+    salida.write("=" * ancho + "\n\n")
+    salida.flush()
+    return paginas
+
+
+def _productos_a_mostrar(inventario, ordenar_por, descendente, inicio, fin):
+    """Productos de las posiciones inicio..fin, en el orden pedido"""
+    if ordenar_por is None:
+        # Inventario e InventarioColumnar aceptan cortes igual que una lista
+        return inventario[inicio:fin]
     
-    print("="*60 + "\n")
+    return inventario.productos_ordenados(ordenar_por, inicio, fin, descendente)
 
 
 def buscar_producto(inventario, nombre):
@@ -64,6 +162,10 @@ def buscar_producto(inventario, nombre):
     
     Retorna: el diccionario del producto si lo encuentra, o None si no existe
     """
+    # Con un Inventario la búsqueda usa el índice por nombre
+    if _es_indexado(inventario):
+        return inventario.buscar(nombre)
+    
     # Recorrer el inventario buscando el producto
     for producto in inventario:
         if producto["nombre"].lower() == nombre.lower():
@@ -72,6 +174,120 @@ def buscar_producto(inventario, nombre):
     return None  # No se encontró el producto
 
 
+def _indice_busqueda(inventario):
+    """
+    Índice de búsqueda del inventario. Un Inventario lo mantiene al día;
+    para otros inventarios (lista, columnar) se arma uno en el momento.
+    """
+    if hasattr(inventario, "indice_busqueda"):
+        return inventario.indice_busqueda()
+    return IndiceBusqueda(inventario)
+
+
+def buscar_por_prefijo(inventario, prefijo, limite=10):
+    """
+    Busca los productos cuyo nombre empieza con el texto indicado.
+    
+    Parámetros:
+    - inventario: lista de productos
+    - prefijo: comienzo del nombre (sin distinguir mayúsculas)
+    - limite: cantidad máxima de resultados
+    
+    Retorna: lista de productos en orden alfabético
+    """
+    return _indice_busqueda(inventario).por_prefijo(prefijo, limite)
+
+
+def buscar_similares(inventario, texto, limite=5):
+    """
+    Busca productos con nombre parecido al texto (tolera errores de tipeo).
+    
+    Parámetros:
+    - inventario: lista de productos
+    - texto: nombre aproximado a buscar
+    - limite: cantidad máxima de resultados
+    
+    Retorna: lista de tuplas (producto, similitud), de la más parecida a la
+             menos; la similitud va de 0 a 1
+    """
+    return _indice_busqueda(inventario).similares(texto, limite)
+
+
+def _indices_ordenados(inventario):
+    """
+    Índices por precio, cantidad y subtotal. Un Inventario los mantiene al
+    día; para otros inventarios (lista, columnar) se arman en el momento.
+    """
+    if hasattr(inventario, "indices_ordenados"):
+        return inventario.indices_ordenados()
+    return IndicesOrdenados(inventario)
+
+
+def productos_en_rango(inventario, campo, minimo=None, maximo=None, limite=None,
+                       descendente=False):
+    """
+    Busca los productos cuyo precio, cantidad o subtotal está en un rango.
+    
+    Parámetros:
+    - inventario: lista de productos
+    - campo: "precio", "cantidad" o "subtotal"
+    - minimo, maximo: límites del rango, incluidos (None = sin límite)
+    - limite: cantidad máxima de resultados (None = todos)
+    - descendente: si es True, empieza por los de mayor valor
+    
+    Retorna: lista de productos ordenada por ese campo
+    """
+    return _indices_ordenados(inventario).rango(campo, minimo, maximo, limite, descendente)
+
+
+def contar_en_rango(inventario, campo, minimo=None, maximo=None):
+    """
+    Cuenta los productos cuyo campo está en el rango, sin armar la lista.
+    
+    Parámetros: los mismos que productos_en_rango
+    
+    Retorna: cantidad de productos
+    """
+    return _indices_ordenados(inventario).contar(campo, minimo, maximo)
+
+
+def top_productos(inventario, campo, k=10, descendente=True):
+    """
+    Busca los k productos de mayor (o menor) precio, cantidad o subtotal.
+    
+    Parámetros:
+    - inventario: lista de productos
+    - campo: "precio", "cantidad" o "subtotal"
+    - k: cantidad de productos
+    - descendente: True para los mayores, False para los menores
+    
+    Retorna: lista de productos, del primero al último del ranking
+    """
+    return _indices_ordenados(inventario).top(campo, k, descendente)
+
+
+def reporte_stock_bajo(inventario, umbral=UMBRAL_STOCK_BAJO, limite=None):
+    """
+    Arma el reporte de productos con poco stock (cantidad menor al umbral).
+    
+    Parámetros:
+    - inventario: lista de productos
+    - umbral: cantidad mínima para no estar en el reporte
+    - limite: cantidad máxima de productos a listar (None = todos)
+    
+    Retorna: diccionario con "umbral", "total" (cuántos productos tienen
+             stock bajo) y "productos" (de menor a mayor cantidad)
+    """
+    indices = _indices_ordenados(inventario)
+    
+    return {
+        "umbral": umbral,
+        "total": indices.contar("cantidad", maximo=umbral, incluir_maximo=False),
+        "productos": indices.rango("cantidad", maximo=umbral, limite=limite,
+                                   incluir_maximo=False),
+    }
+
+
 def actualizar_producto(inventario, nombre, nuevo_precio=None, nueva_cantidad=None):
     """
     Actualiza el precio y/o cantidad de un producto existente.
@@ -84,6 +300,9 @@ def actualizar_producto(inventario, nombre, nuevo_precio=None, nueva_cantidad=No
     
     Retorna: True si se actualizó, False si no se encontró el producto
     """
+    if _es_indexado(inventario):
+        return inventario.actualizar(nombre, nuevo_precio, nueva_cantidad)
+    
     # Buscar el producto
     producto = buscar_producto(inventario, nombre)
     
@@ -110,6 +329,9 @@ def eliminar_producto(inventario, nombre):
     
     Retorna: True si se eliminó, False si no se encontró
     """
+    if _es_indexado(inventario):
+        return inventario.eliminar(nombre)
+    
     # Buscar el producto
     producto = buscar_producto(inventario, nombre)
     
@@ -121,6 +343,40 @@ def eliminar_producto(inventario, nombre):
     return True
 
 
+def eliminar_productos(inventario, nombres):
+    """
+    Elimina varios productos del inventario de una sola vez.
+    
+    Parámetros:
+    - inventario: lista de productos
+    - nombres: nombres de los productos a eliminar (lista o cualquier iterable)
+    
+    Retorna: cuántos productos se eliminaron
+    """
+    if _es_indexado(inventario):
+        return inventario.eliminar_varios(nombres)
+    
+    # Contar cuántas veces se pide eliminar cada nombre
+    pendientes = {}
+    for nombre in nombres:
+        clave = nombre.lower()
+        pendientes[clave] = pendientes.get(clave, 0) + 1
+    
+    # Recorrer la lista una sola vez y quedarse con los que no se eliminan
+    conservados = []
+    eliminados = 0
+    for producto in inventario:
+        clave = producto["nombre"].lower()
+        if pendientes.get(clave, 0) > 0:
+            pendientes[clave] -= 1
+            eliminados += 1
+        else:
+            conservados.append(producto)
+    
+    inventario[:] = conservados
+    return eliminados
+
+
 def calcular_estadisticas(inventario):
     """
     Calcula estadísticas del inventario completo.
@@ -131,6 +387,11 @@ def calcular_estadisticas(inventario):
     Retorna: diccionario con estadísticas (unidades_totales, valor_total,
              producto_mas_caro, producto_mayor_stock)
     """
+    # Un Inventario ya tiene las estadísticas calculadas (se actualizan
+    # con cada cambio), así que no hace falta recorrerlo
+    if _es_indexado(inventario):
+        return inventario.estadisticas()
+    
     if len(inventario) == 0:
         return None
     
@@ -165,4 +426,17 @@ def calcular_estadisticas(inventario):
         "producto_mayor_stock": (producto_mayor_stock["nombre"], producto_mayor_stock["cantidad"])
     }
     
-    return estadisticas
\ No newline at end of file
+    return estadisticas
+
+
+# Medición opcional de todas las funciones públicas (ver instrumentacion.py);
+# si no está activada no cambia nada
+instrumentar_modulo(globals(), elementos={
+    "buscar_por_prefijo": por_largo,
+    "buscar_similares": por_largo,
+    "productos_en_rango": por_largo,
+    "top_productos": por_largo,
+    "reporte_stock_bajo": lambda reporte: len(reporte["productos"]),
+    "eliminar_productos": por_resultado,
+    "calcular_estadisticas": por_largo_del_argumento(0, "inventario"),
+})
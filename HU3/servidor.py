@@ -0,0 +1,398 @@
+# servidor.py
+# Servicio de inventario para varias terminales a la vez (asyncio)
+#
+# Protocolo: cada pedido es una línea JSON y cada respuesta también, en
+# el mismo orden en que llegaron los pedidos. Un cliente puede mandar
+# muchos pedidos seguidos sin esperar las respuestas.
+#
+#   -> {"id": 1, "op": "add", "nombre": "Pan", "precio": 1.5, "cantidad": 10}
+#   <- {"id": 1, "ok": true, "resultado": null}
+#   <- {"id": 2, "ok": false, "error": "No se encontró el producto 'Leche'"}
+#
+# Operaciones:
+#   add      nombre, precio, cantidad
+#   search   nombre                   -> producto o null
+#   prefix   prefijo, limite (opc.)   -> lista de productos
+#   similar  texto, limite (opc.)     -> lista de [producto, similitud]
+#   update   nombre, precio y/o cantidad
+#   delete   nombre
+#   stats                             -> estadísticas o null
+#   load     ruta                     reemplaza el inventario con un CSV
+#   merge    ruta                     fusiona un CSV -> conteos de la fusión
+#   save     ruta                     guarda el inventario en CSV
+#   batch    ops: lista de pedidos    -> lista de respuestas
+#
+# Uso:
+#   python3 servidor.py --puerto 8765 --cargar inventario.csv
+#   python3 cliente.py --puerto 8765          (generador de carga)
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+
+from servicios import (agregar_producto, buscar_producto, actualizar_producto,
+                       eliminar_producto, calcular_estadisticas,
+                       buscar_por_prefijo, buscar_similares)
+from archivos import leer_csv_por_lotes, escribir_csv, fusionar_lote
+from inventario import Inventario
+
+PUERTO = 8765
+
+# Bytes que se leen de una vez del socket; todos los pedidos completos
+# que llegan en un bloque se responden juntos con un solo envío
+TAMANO_LECTURA = 64 * 1024
+
+
+class CandadoLecturaEscritura:
+    """
+    Candado para asyncio: muchos lectores a la vez o un solo escritor.
+    Cuando un escritor está esperando, los lectores nuevos esperan
+    detrás de él (así las escrituras no se quedan esperando para siempre).
+    """
+
+    def __init__(self):
+        self._condicion = asyncio.Condition()
+        self._lectores = 0
+        self._escribiendo = False
+        self._escritores_esperando = 0
+
+    @contextlib.asynccontextmanager
+    async def lectura(self):
+        async with self._condicion:
+            await self._condicion.wait_for(
+                lambda: not self._escribiendo and self._escritores_esperando == 0)
+            self._lectores += 1
+        try:
+            yield
+        finally:
+            async with self._condicion:
+                self._lectores -= 1
+                if self._lectores == 0:
+                    self._condicion.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def escritura(self):
+        async with self._condicion:
+            self._escritores_esperando += 1
+            try:
+                await self._condicion.wait_for(
+                    lambda: not self._escribiendo and self._lectores == 0)
+            finally:
+                self._escritores_esperando -= 1
+            self._escribiendo = True
+        try:
+            yield
+        finally:
+            async with self._condicion:
+                self._escribiendo = False
+                self._condicion.notify_all()
+
+
+def _texto(pedido, campo):
+    """Campo de texto obligatorio y no vacío del pedido"""
+    valor = pedido.get(campo)
+    if not isinstance(valor, str) or valor.strip() == "":
+        raise ValueError(f"Falta el campo '{campo}'")
+    return valor.strip()
+
+
+def _numero(pedido, campo, tipo, obligatorio=True):
+    """Campo numérico no negativo del pedido (None si es opcional y falta)"""
+    valor = pedido.get(campo)
+
+    if valor is None and not obligatorio:
+        return None
+
+    # bool es un int en Python, pero no es un número válido aquí
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        raise ValueError(f"El campo '{campo}' debe ser un número")
+
+    if tipo is int and not isinstance(valor, int):
+        raise ValueError(f"El campo '{campo}' debe ser un número entero")
+
+    # json acepta NaN e Infinity, y un entero enorme no entra en un float
+    try:
+        finito = math.isfinite(valor)
+    except OverflowError:
+        finito = False
+    if not finito:
+        raise ValueError(f"El campo '{campo}' debe ser un número finito")
+
+    if valor < 0:
+        raise ValueError("El precio y la cantidad deben ser positivos")
+
+    return tipo(valor)
+
+
+def _operacion(pedido):
+    """Nombre de la operación del pedido (campo 'op', siempre un texto)"""
+    op = pedido.get("op")
+    if not isinstance(op, str):
+        raise ValueError("El campo 'op' debe ser el nombre de una operación")
+    return op
+
+
+def _limite(pedido, por_defecto):
+    """Campo 'limite' opcional (entero positivo)"""
+    limite = pedido.get("limite", por_defecto)
+    if isinstance(limite, bool) or not isinstance(limite, int) or limite < 1:
+        raise ValueError("El campo 'limite' debe ser un entero positivo")
+    return limite
+
+
+class ServidorInventario:
+    """
+    Atiende a varios clientes sobre un mismo inventario.
+
+    Todas las operaciones corren en el mismo hilo (el de asyncio), así
+    que una operación en memoria nunca se mezcla con otra. El candado de
+    lectura/escritura importa para las operaciones con archivos, que se
+    hacen en otro hilo para no frenar al resto: mientras se guarda se
+    puede seguir consultando, pero los cambios esperan a que termine.
+    """
+
+    def __init__(self, inventario=None):
+        self.inventario = inventario if inventario is not None else Inventario()
+        self.candado = CandadoLecturaEscritura()
+        self.pedidos = 0
+        self.conexiones = 0
+
+        # op -> (función, es_escritura)
+        self._operaciones = {
+            "add": (self._agregar, True),
+            "search": (self._buscar, False),
+            "prefix": (self._prefijo, False),
+            "similar": (self._similares, False),
+            "update": (self._actualizar, True),
+            "delete": (self._eliminar, True),
+            "stats": (self._estadisticas, False),
+        }
+
+        # Operaciones con archivos (son corutinas y manejan el candado solas)
+        self._operaciones_archivo = {
+            "load": self._cargar,
+            "merge": self._fusionar,
+            "save": self._guardar,
+        }
+
+    async def iniciar(self, host="127.0.0.1", puerto=PUERTO):
+        """Empieza a escuchar conexiones y devuelve el asyncio.Server"""
+        return await asyncio.start_server(self.atender, host, puerto)
+
+    async def atender(self, lector, escritor):
+        """Atiende a un cliente hasta que cierra la conexión"""
+        self.conexiones += 1
+        pendiente = b""
+
+        try:
+            while True:
+                datos = await lector.read(TAMANO_LECTURA)
+                if not datos:
+                    break
+
+                # Todas las líneas completas del bloque; lo que sobra queda pendiente
+                lineas = (pendiente + datos).split(b"\n")
+                pendiente = lineas.pop()
+
+                respuestas = [await self.procesar_linea(linea) for linea in lineas if linea.strip()]
+                if respuestas:
+                    escritor.write(b"".join(respuestas))
+                    await escritor.drain()
+
+        except ConnectionError:
+            pass
+
+        finally:
+            self.conexiones -= 1
+            escritor.close()
+
+    async def procesar_linea(self, linea):
+        """Procesa una línea JSON y devuelve la respuesta (bytes, con salto de línea)"""
+        try:
+            pedido = json.loads(linea)
+            if not isinstance(pedido, dict):
+                raise ValueError("El pedido debe ser un objeto JSON")
+        except (ValueError, RecursionError) as error:
+            respuesta = {"id": None, "ok": False, "error": f"JSON inválido: {error}"}
+        else:
+            respuesta = await self.procesar(pedido)
+
+        return (json.dumps(respuesta, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+    async def procesar(self, pedido):
+        """
+        Ejecuta un pedido (diccionario) y devuelve la respuesta (diccionario).
+        Nunca lanza excepciones: cualquier error es una respuesta con
+        "ok": false, así los demás pedidos de la conexión siguen su curso.
+        """
+        try:
+            op = _operacion(pedido)
+
+            if op == "batch":
+                resultado = await self._lote(pedido)
+            elif op in self._operaciones_archivo:
+                resultado = await self._operaciones_archivo[op](pedido)
+            elif op in self._operaciones:
+                funcion, es_escritura = self._operaciones[op]
+                candado = self.candado.escritura() if es_escritura else self.candado.lectura()
+                async with candado:
+                    resultado = funcion(pedido)
+            else:
+                raise ValueError(f"Operación desconocida: {op}")
+
+        except (ValueError, LookupError, OSError) as error:
+            return {"id": pedido.get("id"), "ok": False, "error": str(error)}
+
+        except Exception as error:
+            # Un error que no se esperaba no debe cortar la conexión
+            return {"id": pedido.get("id"), "ok": False, "error": f"Error interno: {error!r}"}
+
+        finally:
+            self.pedidos += 1
+
+        return {"id": pedido.get("id"), "ok": True, "resultado": resultado}
+
+    # ------------------------------------------------------------
+    # Operaciones en memoria (se llaman con el candado tomado)
+    # ------------------------------------------------------------
+
+    def _agregar(self, pedido):
+        agregar_producto(self.inventario, _texto(pedido, "nombre"),
+                         _numero(pedido, "precio", float), _numero(pedido, "cantidad", int))
+
+    def _buscar(self, pedido):
+        return buscar_producto(self.inventario, _texto(pedido, "nombre"))
+
+    def _prefijo(self, pedido):
+        return buscar_por_prefijo(self.inventario, _texto(pedido, "prefijo"),
+                                  _limite(pedido, 10))
+
+    def _similares(self, pedido):
+        return buscar_similares(self.inventario, _texto(pedido, "texto"),
+                                _limite(pedido, 5))
+
+    def _actualizar(self, pedido):
+        nombre = _texto(pedido, "nombre")
+        nuevo_precio = _numero(pedido, "precio", float, obligatorio=False)
+        nueva_cantidad = _numero(pedido, "cantidad", int, obligatorio=False)
+
+        if not actualizar_producto(self.inventario, nombre, nuevo_precio, nueva_cantidad):
+            raise LookupError(f"No se encontró el producto '{nombre}'")
+
+    def _eliminar(self, pedido):
+        nombre = _texto(pedido, "nombre")
+        if not eliminar_producto(self.inventario, nombre):
+            raise LookupError(f"No se encontró el producto '{nombre}'")
+
+    def _estadisticas(self, pedido):
+        return calcular_estadisticas(self.inventario)
+
+    async def _lote(self, pedido):
+        """
+        Ejecuta varios pedidos tomando el candado una sola vez (de
+        escritura si alguno modifica el inventario). Cada pedido tiene su
+        propia respuesta; si uno falla los demás se ejecutan igual.
+        """
+        pedidos = pedido.get("ops")
+        if not isinstance(pedidos, list) or not all(isinstance(p, dict) for p in pedidos):
+            raise ValueError("'ops' debe ser una lista de pedidos")
+
+        for interno in pedidos:
+            if _operacion(interno) not in self._operaciones:
+                raise ValueError(f"Operación no permitida en un lote: {interno['op']}")
+
+        es_escritura = any(self._operaciones[p["op"]][1] for p in pedidos)
+        candado = self.candado.escritura() if es_escritura else self.candado.lectura()
+
+        respuestas = []
+        async with candado:
+            for interno in pedidos:
+                funcion = self._operaciones[interno["op"]][0]
+                try:
+                    respuestas.append({"id": interno.get("id"), "ok": True,
+                                       "resultado": funcion(interno)})
+                except (ValueError, LookupError) as error:
+                    respuestas.append({"id": interno.get("id"), "ok": False, "error": str(error)})
+                except Exception as error:
+                    respuestas.append({"id": interno.get("id"), "ok": False,
+                                       "error": f"Error interno: {error!r}"})
+
+        return respuestas
+
+    # ------------------------------------------------------------
+    # Operaciones con archivos (el trabajo pesado va en otro hilo)
+    # ------------------------------------------------------------
+
+    async def _cargar(self, pedido):
+        ruta = _texto(pedido, "ruta")
+
+        # Leer y armar el inventario nuevo no toca el actual: sin candado
+        nuevo = await asyncio.to_thread(_leer_inventario, ruta)
+
+        async with self.candado.escritura():
+            self.inventario = nuevo
+
+        return {"productos": len(nuevo)}
+
+    async def _fusionar(self, pedido):
+        ruta = _texto(pedido, "ruta")
+        lotes = await asyncio.to_thread(lambda: list(leer_csv_por_lotes(ruta)))
+
+        conteos = {"filas": 0, "duplicados_en_lote": 0, "actualizados": 0, "nuevos": 0}
+        async with self.candado.escritura():
+            for lote in lotes:
+                resultado = fusionar_lote(self.inventario, lote)
+                for clave in conteos:
+                    conteos[clave] += resultado[clave]
+
+        return conteos
+
+    async def _guardar(self, pedido):
+        ruta = _texto(pedido, "ruta")
+
+        # Con candado de lectura: se puede consultar mientras se escribe
+        async with self.candado.lectura():
+            await asyncio.to_thread(escribir_csv, self.inventario, ruta)
+
+        return {"productos": len(self.inventario)}
+
+
+def _leer_inventario(ruta):
+    """Lee un CSV completo y arma un Inventario nuevo"""
+    inventario = Inventario()
+    for lote in leer_csv_por_lotes(ruta):
+        inventario.extend(lote)
+    return inventario
+
+
+async def servir(host, puerto, inventario=None):
+    """Inicia el servicio y lo mantiene hasta que se interrumpe"""
+    servicio = ServidorInventario(inventario)
+    servidor = await servicio.iniciar(host, puerto)
+
+    print(f" Servicio de inventario escuchando en {host}:{puerto} "
+          f"({len(servicio.inventario)} productos)")
+
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Servicio de inventario por socket (JSON por líneas)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--cargar", metavar="ARCHIVO", help="CSV con el inventario inicial")
+    opciones = parser.parse_args(argumentos)
+
+    inventario = _leer_inventario(opciones.cargar) if opciones.cargar else None
+
+    try:
+        asyncio.run(servir(opciones.host, opciones.puerto, inventario))
+    except KeyboardInterrupt:
+        print("\n Servicio detenido")
+
+
+if __name__ == "__main__":
+    main()
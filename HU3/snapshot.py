@@ -0,0 +1,455 @@
+# snapshot.py
+# Guardar y abrir el inventario en un formato binario que se lee sin procesar
+#
+# Estructura del archivo (todos los números en little-endian):
+#
+#   Encabezado (64 bytes)
+#     - firma b"INVS" y versión del formato
+#     - número de productos
+#     - estadísticas ya calculadas: unidades, valor total y la posición
+#       del producto más caro y del de mayor stock
+#     - tamaño del bloque de nombres
+#   precios      n números decimales de 8 bytes
+#   cantidades   n enteros de 8 bytes
+#   desplaz.     n + 1 posiciones donde empieza cada nombre en el bloque
+#   orden        n posiciones de los productos ordenados por nombre
+#   nombres      todos los nombres en UTF-8, uno detrás de otro
+#
+# Como todas las columnas tienen tamaño fijo, el archivo se abre con mmap
+# y se consulta directamente, sin leerlo ni convertirlo.
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import islice
+
+from archivos import nombre_temporal
+from inventario import Inventario, clave_nombre, CRITERIOS_ORDEN
+from indices import CAMPOS_INDICE
+from columnar import InventarioColumnar
+
+FIRMA = b"INVS"
+VERSION = 1
+
+# firma, versión, reservado, productos, unidades, valor total,
+# posición más caro, posición mayor stock, tamaño de nombres, reservado
+FORMATO_ENCABEZADO = "<4sHHQqdqqQQ"
+TAMANO_ENCABEZADO = struct.calcsize(FORMATO_ENCABEZADO)
+
+
+def guardar_snapshot(inventario, ruta):
+    """
+    Guarda el inventario en formato binario (ver escribir_snapshot).
+
+    Parámetros:
+    - inventario: lista de productos, Inventario o InventarioColumnar
+    - ruta: nombre/ruta del archivo (str)
+
+    Retorna: True si se guardó correctamente, False si hubo error
+    """
+    try:
+        escribir_snapshot(inventario, ruta)
+        print(f"\n Snapshot guardado en: {ruta}")
+        return True
+
+    except PermissionError:
+        print(f"\n Error: No tienes permisos para escribir en '{ruta}'")
+        return False
+
+    except Exception as error:
+        print(f"\n Error al guardar el snapshot: {error}")
+        return False
+
+
+def escribir_snapshot(inventario, ruta):
+    """
+    Escribe el inventario en formato binario sin mostrar mensajes.
+
+    Igual que escribir_csv, se escribe primero a un archivo temporal y
+    luego se renombra, así nunca queda un archivo a medias.
+
+    Parámetros:
+    - inventario: lista de productos (o cualquier iterable de productos)
+    - ruta: nombre/ruta del archivo (str)
+
+    Retorna: cuántos productos se escribieron.
+    Si algo falla lanza la excepción.
+    """
+    if sys.byteorder != "little":
+        raise ValueError("El formato binario solo está disponible en equipos little-endian")
+
+    # Armar las columnas
+    nombres = []
+    precios = array('d')
+    cantidades = array('q')
+
+    for producto in inventario:
+        nombres.append(producto["nombre"])
+        precios.append(producto["precio"])
+        cantidades.append(producto["cantidad"])
+
+    n = len(nombres)
+
+    # Estadísticas: se calculan una vez al guardar y quedan en el encabezado
+    unidades_totales = sum(cantidades)
+    valor_total = sum(p * c for p, c in zip(precios, cantidades))
+    mas_caro = precios.index(max(precios)) if n > 0 else -1
+    mayor_stock = cantidades.index(max(cantidades)) if n > 0 else -1
+
+    # Bloque de nombres y dónde empieza cada uno
+    codificados = [nombre.encode('utf-8') for nombre in nombres]
+    desplazamientos = array('Q', [0])
+    total = 0
+    for codificado in codificados:
+        total += len(codificado)
+        desplazamientos.append(total)
+
+    # Orden por nombre (sin distinguir mayúsculas) para buscar con bisección.
+    # sorted() es estable: con nombres repetidos queda primero el más antiguo
+    claves = [clave_nombre(nombre) for nombre in nombres]
+    orden = array('Q', sorted(range(n), key=claves.__getitem__))
+
+    encabezado = struct.pack(
+        FORMATO_ENCABEZADO, FIRMA, VERSION, 0, n,
+        unidades_totales, valor_total, mas_caro, mayor_stock, total, 0
+    )
+
+    ruta_temporal = nombre_temporal(ruta)
+
+    try:
+        with open(ruta_temporal, 'wb') as archivo:
+            archivo.write(encabezado)
+            archivo.write(precios.tobytes())
+            archivo.write(cantidades.tobytes())
+            archivo.write(desplazamientos.tobytes())
+            archivo.write(orden.tobytes())
+            archivo.write(b"".join(codificados))
+
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+        os.replace(ruta_temporal, ruta)
+
+    except BaseException:
+        _borrar(ruta_temporal)
+        raise
+
+    return n
+
+
+def cargar_snapshot(ruta):
+    """
+    Abre un snapshot binario sin leerlo entero (usa mmap).
+
+    Parámetros:
+    - ruta: nombre/ruta del archivo (str)
+
+    Retorna: un InventarioSnapshot (solo lectura), o None si hubo error
+    """
+    try:
+        return InventarioSnapshot(ruta)
+
+    except FileNotFoundError:
+        print(f"\n Error: El archivo '{ruta}' no existe")
+        return None
+
+    except ValueError as error:
+        print(f"\n Error: {error}")
+        return None
+
+    except Exception as error:
+        print(f"\n Error al abrir el snapshot: {error}")
+        return None
+
+
+class InventarioSnapshot:
+    """
+    Inventario de solo lectura que consulta directamente el archivo
+    binario mapeado en memoria.
+
+    - buscar(): búsqueda binaria sobre la columna 'orden' (O(log n))
+    - estadisticas(): se leen del encabezado (O(1))
+    - recorrerlo devuelve diccionarios como los del resto del sistema
+
+    Para modificarlo hay que convertirlo con a_inventario() o
+    a_columnar().
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+
+        if sys.byteorder != "little":
+            raise ValueError("El formato binario solo está disponible en equipos little-endian")
+
+        with open(ruta, 'rb') as archivo:
+            if os.fstat(archivo.fileno()).st_size < TAMANO_ENCABEZADO:
+                raise ValueError(f"'{ruta}' no es un snapshot de inventario")
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (firma, version, _, n, self._unidades, self._valor,
+         self._mas_caro, self._mayor_stock, tamano_nombres, _) = \
+            struct.unpack_from(FORMATO_ENCABEZADO, self._mapa, 0)
+
+        if firma != FIRMA:
+            self._mapa.close()
+            raise ValueError(f"'{ruta}' no es un snapshot de inventario")
+
+        if version != VERSION:
+            self._mapa.close()
+            raise ValueError(f"Versión de snapshot no soportada: {version}")
+
+        # Un archivo cortado (copia a medias, disco lleno) no alcanza para
+        # las columnas que anuncia el encabezado
+        if len(self._mapa) < TAMANO_ENCABEZADO + 8 * (4 * n + 1) + tamano_nombres:
+            self._mapa.close()
+            raise ValueError(f"'{ruta}' está incompleto: el snapshot está dañado")
+
+        self._n = n
+
+        # Vistas sobre cada columna (no copian datos)
+        vista = memoryview(self._mapa)
+        inicio = TAMANO_ENCABEZADO
+        self._precios = vista[inicio:inicio + 8 * n].cast('d')
+        inicio += 8 * n
+        self._cantidades = vista[inicio:inicio + 8 * n].cast('q')
+        inicio += 8 * n
+        self._desplazamientos = vista[inicio:inicio + 8 * (n + 1)].cast('Q')
+        inicio += 8 * (n + 1)
+        self._orden = vista[inicio:inicio + 8 * n].cast('Q')
+        inicio += 8 * n
+        self._nombres = vista[inicio:inicio + tamano_nombres]
+        self._vista = vista
+
+        # Órdenes ya calculados (el snapshot no cambia, así que no caducan)
+        self._ordenes = {("nombre", False): self._orden}
+
+    # ------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------
+
+    def nombre(self, posicion):
+        """Nombre del producto en esa posición (se decodifica al pedirlo)"""
+        inicio = self._desplazamientos[posicion]
+        fin = self._desplazamientos[posicion + 1]
+        return str(self._nombres[inicio:fin], 'utf-8')
+
+    def buscar(self, nombre):
+        """Devuelve el producto con ese nombre (diccionario nuevo), o None"""
+        clave = clave_nombre(nombre)
+
+        # Búsqueda binaria: primera posición cuyo nombre no es menor
+        bajo = 0
+        alto = self._n
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if clave_nombre(self.nombre(self._orden[medio])) < clave:
+                bajo = medio + 1
+            else:
+                alto = medio
+
+        if bajo < self._n:
+            posicion = self._orden[bajo]
+            if clave_nombre(self.nombre(posicion)) == clave:
+                return self._producto(posicion)
+
+        return None
+
+    def estadisticas(self):
+        """Estadísticas guardadas en el encabezado (mismo formato que calcular_estadisticas)"""
+        if self._n == 0:
+            return None
+
+        return {
+            "unidades_totales": self._unidades,
+            "valor_total": self._valor,
+            "producto_mas_caro": (self.nombre(self._mas_caro), self._precios[self._mas_caro]),
+            "producto_mayor_stock": (self.nombre(self._mayor_stock), self._cantidades[self._mayor_stock])
+        }
+
+    def productos_ordenados(self, criterio, inicio=0, fin=None, descendente=False):
+        """
+        Productos ordenados por 'criterio' (ver inventario.CRITERIOS_ORDEN),
+        solo los de las posiciones 'inicio' a 'fin'. El orden por nombre ya
+        viene en el archivo; los demás se calculan la primera vez.
+        """
+        if criterio not in CRITERIOS_ORDEN:
+            raise KeyError(criterio)
+
+        posiciones = self._posiciones_ordenadas(criterio, descendente)
+        return [self._producto(i) for i in posiciones[inicio:fin]]
+
+    def indices_ordenados(self):
+        """
+        Consultas por rango de precio, cantidad o subtotal (mismas que
+        indices.IndicesOrdenados), respondidas con el orden del snapshot:
+        no hace falta convertirlo en Inventario.
+        """
+        return IndicesSnapshot(self)
+
+    def a_columnar(self):
+        """Copia el snapshot a un InventarioColumnar que se puede modificar"""
+        return InventarioColumnar.desde_columnas(
+            [self.nombre(i) for i in range(self._n)],
+            array('d', self._precios),
+            array('q', self._cantidades)
+        )
+
+    def a_inventario(self):
+        """Copia el snapshot a un Inventario (lista de diccionarios con índice)"""
+        return Inventario(self)
+
+    def cerrar(self):
+        """Libera el archivo mapeado"""
+        self._ordenes.clear()
+        for vista in (self._precios, self._cantidades, self._desplazamientos,
+                      self._orden, self._nombres, self._vista):
+            vista.release()
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        self.cerrar()
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        for posicion in range(self._n):
+            yield self._producto(posicion)
+
+    def __getitem__(self, posicion):
+        if isinstance(posicion, slice):
+            return [self._producto(i) for i in range(self._n)[posicion]]
+
+        if posicion < 0:
+            posicion += self._n
+        if not 0 <= posicion < self._n:
+            raise IndexError("Posición fuera del inventario")
+        return self._producto(posicion)
+
+    def __repr__(self):
+        return f"InventarioSnapshot({self.ruta!r}, {self._n} productos)"
+
+    # ------------------------------------------------------------
+    # Modificar no está permitido
+    # ------------------------------------------------------------
+
+    def _solo_lectura(self, *datos):
+        raise TypeError("El snapshot es de solo lectura; usa a_inventario() para modificarlo")
+
+    agregar = actualizar = eliminar = eliminar_varios = _solo_lectura
+    fusionar = fusionar_valores = _solo_lectura
+    append = extend = remove = clear = _solo_lectura
+
+    # ------------------------------------------------------------
+    # Funciones internas
+    # ------------------------------------------------------------
+
+    def _clave(self, criterio):
+        """Función posición -> valor por el que se ordena con ese criterio"""
+        precios, cantidades = self._precios, self._cantidades
+        return {
+            "nombre": lambda i: clave_nombre(self.nombre(i)),
+            "precio": precios.__getitem__,
+            "cantidad": cantidades.__getitem__,
+            "subtotal": lambda i: precios[i] * cantidades[i],
+        }[criterio]
+
+    def _posiciones_ordenadas(self, criterio, descendente=False):
+        """Posiciones de los productos ordenados por 'criterio' (se calculan una vez)"""
+        posiciones = self._ordenes.get((criterio, descendente))
+
+        if posiciones is None:
+            posiciones = array('q', sorted(range(self._n), key=self._clave(criterio),
+                                           reverse=descendente))
+            self._ordenes[(criterio, descendente)] = posiciones
+
+        return posiciones
+
+    def _producto(self, posicion):
+        """Arma el diccionario del producto que está en esa posición"""
+        return {
+            "nombre": self.nombre(posicion),
+            "precio": self._precios[posicion],
+            "cantidad": self._cantidades[posicion]
+        }
+
+
+class IndicesSnapshot:
+    """
+    Consultas por rango y los k mayores sobre un InventarioSnapshot, con
+    los mismos resultados que indices.IndicesOrdenados: se busca con
+    bisección sobre las posiciones ordenadas por el campo, que se
+    calculan la primera vez y quedan guardadas en el snapshot.
+    """
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def rango(self, campo, minimo=None, maximo=None, limite=None, descendente=False,
+              incluir_maximo=True):
+        """Igual que IndicesOrdenados.rango"""
+        posiciones, desde, hasta = self._tramo(campo, minimo, maximo, incluir_maximo)
+
+        elegidas = range(desde, hasta)
+        if descendente:
+            # Con valores iguales, el último en llegar primero (como IndicesOrdenados)
+            elegidas = reversed(elegidas)
+
+        producto = self._snapshot._producto
+        return [producto(posiciones[i]) for i in islice(elegidas, limite)]
+
+    def contar(self, campo, minimo=None, maximo=None, incluir_maximo=True):
+        """Igual que IndicesOrdenados.contar"""
+        _, desde, hasta = self._tramo(campo, minimo, maximo, incluir_maximo)
+        return hasta - desde
+
+    def top(self, campo, k=10, descendente=True):
+        """Igual que IndicesOrdenados.top"""
+        return self.rango(campo, limite=k, descendente=descendente)
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def _tramo(self, campo, minimo, maximo, incluir_maximo):
+        """(posiciones ordenadas, desde, hasta): el rango es posiciones[desde:hasta]"""
+        if campo not in CAMPOS_INDICE:
+            raise ValueError(f"No hay índice por '{campo}' (opciones: {', '.join(CAMPOS_INDICE)})")
+
+        posiciones = self._snapshot._posiciones_ordenadas(campo)
+        valor = self._snapshot._clave(campo)
+
+        desde = 0 if minimo is None else _primera(posiciones, valor, lambda v: v >= minimo)
+        if maximo is None:
+            hasta = len(posiciones)
+        elif incluir_maximo:
+            hasta = _primera(posiciones, valor, lambda v: v > maximo)
+        else:
+            hasta = _primera(posiciones, valor, lambda v: v >= maximo)
+
+        return posiciones, desde, max(desde, hasta)
+
+
+def _primera(posiciones, valor, cumple):
+    """Búsqueda binaria: primer i cuyo valor cumple la condición (que es creciente)"""
+    bajo = 0
+    alto = len(posiciones)
+    while bajo < alto:
+        medio = (bajo + alto) // 2
+        if cumple(valor(posiciones[medio])):
+            alto = medio
+        else:
+            bajo = medio + 1
+    return bajo
+
+
+def _borrar(ruta):
+    """Borra un archivo temporal si quedó de un guardado que falló"""
+    try:
+        os.remove(ruta)
+    except OSError:
+        pass
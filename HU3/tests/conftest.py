@@ -0,0 +1,12 @@
+# conftest.py
+# Configuración de pytest: los módulos del inventario están en la carpeta
+# HU3 y se importan por su nombre (from inventario import Inventario),
+# igual que cuando se ejecuta app.py desde ahí.
+#
+# Uso (desde la carpeta del repositorio):
+#   python3 -m pytest HU3/tests
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,291 @@
+# Pruebas de lectura y escritura de CSV (archivos.py)
+
+import importlib.util
+import os
+import threading
+
+import pytest
+
+import archivos
+from archivos import (ErrorFormatoCSV, cargar_csv, cargar_csv_paralelo, cargar_csv_por_lotes,
+                      escribir_csv, fusionar_lote, importar_archivos, leer_csv_por_lotes)
+from columnar import InventarioColumnar
+from concurrente import InventarioConcurrente
+from inventario import Inventario
+
+
+def test_nombres_con_comas_comillas_y_saltos_de_linea(tmp_path):
+    ruta = str(tmp_path / "inventario.csv")
+    productos = [
+        {"nombre": "Pan", "precio": 1.5, "cantidad": 3},
+        {"nombre": "Tornillo, 3 mm", "precio": 0.1, "cantidad": 500},
+        {"nombre": 'Monitor 24"', "precio": 120.0, "cantidad": 2},
+        {"nombre": "Línea 1\nLínea 2", "precio": 2.0, "cantidad": 1},
+        {"nombre": 'Caja "grande",\r\nroja', "precio": 3.0, "cantidad": 4},
+        {"nombre": "Leche", "precio": 0.9, "cantidad": 10},
+    ]
+
+    assert escribir_csv(productos, ruta) == len(productos)
+    cargados = cargar_csv(ruta)
+
+    # Los saltos de línea quedan como espacios; nada más cambia
+    assert [p["nombre"] for p in cargados] == [
+        "Pan", "Tornillo, 3 mm", 'Monitor 24"', "Línea 1 Línea 2", 'Caja "grande", roja', "Leche",
+    ]
+    assert [(p["precio"], p["cantidad"]) for p in cargados] == \
+        [(p["precio"], p["cantidad"]) for p in productos]
+
+
+def _csv_variado(ruta, filas):
+    lineas = ["nombre,precio,cantidad"]
+    for i in range(filas):
+        if i % 97 == 0:
+            lineas.append(f"sin numeros {i},precio,x")
+        elif i % 31 == 0:
+            lineas.append(f'"Tornillo, {i} mm",0.{i % 10}5,{i}')
+        elif i % 53 == 0:
+            lineas.append("")
+        else:
+            lineas.append(f"Producto {i},{i % 100}.5,{i % 7}")
+    # Saltos de línea de Windows y sin salto al final
+    with open(ruta, "w", encoding="utf-8", newline="") as archivo:
+        archivo.write("\r\n".join(lineas))
+
+
+@pytest.mark.parametrize("procesos", [2, 3, 8])
+def test_carga_en_paralelo_igual_que_la_normal(tmp_path, monkeypatch, procesos):
+    ruta = str(tmp_path / "inventario.csv")
+    _csv_variado(ruta, 5000)
+    # Archivo chico: se baja el mínimo para que igual se reparta
+    monkeypatch.setattr(archivos, "TAMANO_MINIMO_PARALELO", 0)
+
+    paralelo = cargar_csv_paralelo(ruta, procesos)
+    assert paralelo == cargar_csv(ruta)
+    assert len(paralelo) > 4000
+
+
+def test_carga_en_paralelo_con_archivo_invalido(tmp_path, monkeypatch):
+    monkeypatch.setattr(archivos, "TAMANO_MINIMO_PARALELO", 0)
+
+    sin_encabezado = tmp_path / "sin_encabezado.csv"
+    sin_encabezado.write_text("a,b,c\nPan,1.0,2\n", encoding="utf-8")
+    assert cargar_csv_paralelo(str(sin_encabezado), 2) is None
+
+    no_es_texto = tmp_path / "no_es_texto.csv"
+    no_es_texto.write_bytes(b"nombre,precio,cantidad\n" + b"Pan,1.0,2\n" * 100 + b"\xff\xfe,1,1\n")
+    assert cargar_csv_paralelo(str(no_es_texto), 2) is None
+
+    assert cargar_csv_paralelo(str(tmp_path / "no_existe.csv"), 2) is None
+
+
+@pytest.mark.parametrize("parser", ["csv", "numpy"])
+def test_los_parsers_dan_lo_mismo_que_filas(tmp_path, parser):
+    if parser == "numpy":
+        pytest.importorskip("numpy")
+
+    ruta = str(tmp_path / "inventario.csv")
+    _csv_variado(ruta, 3000)
+    # Filas que cada parser descarta a su manera (máscaras, conversión, etc.)
+    with open(ruta, "a", encoding="utf-8") as archivo:
+        archivo.write("\nNegativo,-1.0,3\nSin stock,1.0,-2\nRaro,nan,1\nInfinito,inf,1"
+                      "\nEnorme,1.0,99999999999999999999\nCorta,1.0\nLarga,1.0,2,3\n")
+
+    resumen_filas = {}
+    esperado = list(leer_csv_por_lotes(ruta, 250, resumen_filas, parser="filas"))
+    resumen = {}
+    obtenido = list(leer_csv_por_lotes(ruta, 250, resumen, parser=parser))
+
+    assert obtenido == esperado
+    assert resumen == resumen_filas
+    assert resumen["filas_invalidas"] > 0
+
+
+def test_parser_desconocido(tmp_path):
+    ruta = str(tmp_path / "inventario.csv")
+    _csv_variado(ruta, 10)
+
+    with pytest.raises(ValueError):
+        list(leer_csv_por_lotes(ruta, parser="otro"))
+
+
+def test_guardar_desde_varios_hilos_a_la_vez(tmp_path):
+    # Como la compactación del journal (otro hilo) y un guardado normal
+    ruta = str(tmp_path / "inventario.csv")
+    productos = [{"nombre": f"Producto {i}", "precio": 1.0, "cantidad": i} for i in range(2000)]
+    errores = []
+
+    def guardar():
+        try:
+            for _ in range(10):
+                escribir_csv(productos, ruta)
+        except Exception as error:
+            errores.append(error)
+
+    hilos = [threading.Thread(target=guardar) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert errores == []
+    assert cargar_csv(ruta) == productos
+    assert os.listdir(tmp_path) == ["inventario.csv"]   # No quedan temporales
+
+
+def test_lotes_y_conteos_de_la_carga_por_lotes(tmp_path):
+    ruta = str(tmp_path / "inventario.csv")
+    # Más de un bloque de lectura (1 MB): hay líneas partidas entre bloques
+    filas = 60000
+    _csv_variado(ruta, filas)
+
+    resumen = {}
+    lotes = list(leer_csv_por_lotes(ruta, 7000, resumen))
+
+    # Todos los lotes llenos menos el último
+    assert all(len(lote) == 7000 for lote in lotes[:-1])
+    assert 0 < len(lotes[-1]) <= 7000
+    assert sum(len(lote) for lote in lotes) == resumen["productos"]
+
+    # En _csv_variado una de cada 97 filas no tiene números (inválida) y
+    # una de cada 53, si no le tocó otro caso, es una línea vacía (no cuenta)
+    invalidas = len(range(0, filas, 97))
+    vacias = sum(1 for i in range(filas) if i % 53 == 0 and i % 97 != 0 and i % 31 != 0)
+    assert resumen["filas_invalidas"] == invalidas
+    assert resumen["productos"] == filas - invalidas - vacias
+    assert resumen["encabezado"] == "nombre,precio,cantidad"
+    assert [producto for lote in lotes for producto in lote] == cargar_csv(ruta)
+
+
+def test_carga_por_lotes_con_archivo_invalido(tmp_path, capsys):
+    ruta = tmp_path / "inventario.csv"
+    ruta.write_text("producto,valor\nPan,1.0\n", encoding="utf-8")
+
+    with pytest.raises(ErrorFormatoCSV):
+        list(leer_csv_por_lotes(str(ruta)))
+
+    # La versión con mensajes no lanza: lo anota en el resumen
+    resumen = {}
+    assert list(cargar_csv_por_lotes(str(ruta), resumen=resumen)) == []
+    assert resumen["valido"] is False
+    assert "Se encontró: producto,valor" in capsys.readouterr().out
+
+    resumen = {}
+    assert list(cargar_csv_por_lotes(str(tmp_path / "no_existe.csv"), resumen=resumen)) == []
+    assert resumen["valido"] is False
+    assert "no existe" in capsys.readouterr().out
+
+
+def _lote_con_repetidos():
+    return [
+        {"nombre": "Pan", "precio": 1.2, "cantidad": 3},      # Ya existe
+        {"nombre": "Té", "precio": 2.5, "cantidad": 10},      # Nuevo
+        {"nombre": "PAN", "precio": 1.3, "cantidad": 2},      # Repetido en el lote
+        {"nombre": "té", "precio": 2.4, "cantidad": 1},       # Repetido en el lote
+        {"nombre": "Café", "precio": 5.0, "cantidad": 4},     # Nuevo
+        {"nombre": "Leche", "precio": 0.9, "cantidad": 6},    # Ya existe
+    ]
+
+
+@pytest.mark.parametrize("clase", [list, Inventario, InventarioColumnar, InventarioConcurrente])
+@pytest.mark.parametrize("columnas", [False, True])
+def test_fusionar_lote_agrupa_repetidos_y_cuenta(clase, columnas):
+    existentes = [{"nombre": "Pan", "precio": 1.0, "cantidad": 5},
+                  {"nombre": "Leche", "precio": 1.0, "cantidad": 1}]
+    inventario = clase([dict(producto) for producto in existentes])
+    lote = _lote_con_repetidos()
+    if columnas:
+        lote = tuple(zip(*((p["nombre"], p["precio"], p["cantidad"]) for p in lote)))
+
+    conteos = fusionar_lote(inventario, lote)
+
+    assert conteos == {"filas": 6, "duplicados_en_lote": 2, "actualizados": 2,
+                       "nuevos": 2, "fusionados": 4}
+
+    # Mismo resultado que fusionar fila por fila (gana el último precio)
+    uno_por_uno = Inventario([dict(producto) for producto in existentes])
+    fusionados = sum(uno_por_uno.fusionar(producto) for producto in _lote_con_repetidos())
+    assert fusionados == conteos["fusionados"]
+    assert [dict(producto) for producto in inventario] == [dict(producto) for producto in uno_por_uno]
+
+
+@pytest.mark.parametrize("extension", [".gz", ".bz2", ".xz", ".zst"])
+def test_ida_y_vuelta_comprimido(tmp_path, extension):
+    if extension == ".zst":
+        pytest.importorskip("zstandard")
+
+    ruta = str(tmp_path / f"inventario.csv{extension}")
+    productos = [{"nombre": f"Producto {i}", "precio": i / 4, "cantidad": i} for i in range(5000)]
+    productos.append({"nombre": 'Caja "grande", roja', "precio": 3.0, "cantidad": 4})
+
+    assert escribir_csv(productos, ruta) == len(productos)
+
+    # Está comprimido de verdad, y se reconoce por los primeros bytes
+    compresion = archivos.compresion_por_nombre(ruta)
+    with open(ruta, "rb") as archivo:
+        assert archivo.read(8).startswith(archivos.COMPRESIONES[compresion][1])
+    assert os.path.getsize(ruta) < sum(len(p["nombre"]) for p in productos)
+
+    assert cargar_csv(ruta) == productos
+    otro_nombre = str(tmp_path / "sin_extension.csv")
+    os.replace(ruta, otro_nombre)
+    assert archivos.detectar_compresion(otro_nombre) == compresion
+    assert cargar_csv(otro_nombre) == productos
+
+
+def test_gzip_guarda_el_nombre_final(tmp_path):
+    ruta = str(tmp_path / "inventario.csv.gz")
+    escribir_csv([{"nombre": "Pan", "precio": 1.0, "cantidad": 1}], ruta)
+
+    # El encabezado gzip anota el nombre del archivo descomprimido (el
+    # final sin .gz), no el del temporal
+    with open(ruta, "rb") as archivo:
+        encabezado = archivo.read(64)
+    assert b"inventario.csv\x00" in encabezado
+    assert b".tmp" not in encabezado
+
+
+def test_zst_sin_zstandard(tmp_path):
+    if importlib.util.find_spec("zstandard") is not None:
+        pytest.skip("zstandard está instalado")
+
+    with pytest.raises(ValueError):
+        escribir_csv([{"nombre": "Pan", "precio": 1.0, "cantidad": 1}], str(tmp_path / "a.csv.zst"))
+    assert os.listdir(tmp_path) == []
+
+
+def _carpeta_de_proveedores(carpeta):
+    carpeta.mkdir()
+    # El primero es el más grande: con varios procesos termina de leerse último
+    grande = [{"nombre": f"Relleno {i}", "precio": 1.0, "cantidad": 1} for i in range(30000)]
+    escribir_csv([{"nombre": "Pan", "precio": 1.0, "cantidad": 1}] + grande, str(carpeta / "a.csv"))
+    escribir_csv([{"nombre": "PAN", "precio": 2.0, "cantidad": 10},
+                  {"nombre": "Té", "precio": 3.0, "cantidad": 1}], str(carpeta / "b.csv.gz"))
+    (carpeta / "c.csv").write_text("otro,encabezado\nPan,9.9,9\n", encoding="utf-8")
+    escribir_csv([{"nombre": "pan", "precio": 4.0, "cantidad": 100},
+                  {"nombre": "Café", "precio": 5.0, "cantidad": 2}], str(carpeta / "d.csv"))
+    # Ni los temporales ni otros archivos se importan
+    (carpeta / "d.csv.123.tmp").write_text("nombre,precio,cantidad\nPan,7.0,7\n", encoding="utf-8")
+    (carpeta / "notas.txt").write_text("nombre,precio,cantidad\nPan,8.0,8\n", encoding="utf-8")
+
+
+@pytest.mark.parametrize("procesos", [1, 3])
+def test_importar_archivos_fusiona_en_orden_de_nombre(tmp_path, procesos):
+    carpeta = tmp_path / "proveedores"
+    _carpeta_de_proveedores(carpeta)
+    inventario = Inventario()
+    inventario.agregar("Pan", 0.5, 1000)
+
+    resultado = importar_archivos(inventario, str(carpeta), procesos)
+
+    assert [os.path.basename(datos["ruta"]) for datos in resultado["archivos"]] == \
+        ["a.csv", "b.csv.gz", "c.csv", "d.csv"]
+    assert [datos["valido"] for datos in resultado["archivos"]] == [True, True, False, True]
+
+    # Se suman todas las cantidades y queda el precio del último archivo (d.csv)
+    assert inventario.buscar("pan") == {"nombre": "Pan", "precio": 4.0, "cantidad": 1111}
+    # Los nuevos quedan en el orden de los archivos
+    nuevos = [producto["nombre"] for producto in inventario if not producto["nombre"].startswith("Relleno")]
+    assert nuevos == ["Pan", "Té", "Café"]
+    assert resultado["fusion"]["actualizados"] == 3
+    assert resultado["fusion"]["nuevos"] == 30002
+    assert resultado["productos"] == 30001 + 2 + 2
@@ -0,0 +1,59 @@
+# Pruebas de la búsqueda por prefijo y aproximada (busqueda.py)
+
+import indices
+from inventario import Inventario
+
+
+def _inventario():
+    inventario = Inventario()
+    for nombre in ["Tornillo 3 mm", "Tuerca", "tornillo 5 mm", "Taladro", "Pan", "Tornillo 3 mm"]:
+        inventario.agregar(nombre, 1.0, 1)
+    return inventario
+
+
+def test_por_prefijo():
+    indice = _inventario().indice_busqueda()
+
+    nombres = [producto["nombre"] for producto in indice.por_prefijo("TORN")]
+    assert nombres == ["Tornillo 3 mm", "tornillo 5 mm"]   # Un resultado por nombre
+
+    assert [producto["nombre"] for producto in indice.por_prefijo("t", limite=2)] == \
+        ["Taladro", "Tornillo 3 mm"]
+    assert indice.por_prefijo("zz") == []
+    assert len(indice.por_prefijo("")) == 5
+
+
+def test_por_prefijo_se_mantiene_al_dia(monkeypatch):
+    # Bloques chicos para que la lista ordenada se parta y se vacíen bloques
+    monkeypatch.setattr(indices, "TAMANO_BLOQUE_INDICE", 4)
+    inventario = Inventario()
+    indice = inventario.indice_busqueda()
+
+    for numero in range(50):
+        inventario.agregar(f"Producto {numero:02d}", 1.0, 1)
+    for numero in range(0, 50, 3):
+        inventario.eliminar(f"producto {numero:02d}")
+
+    esperados = [f"Producto {numero:02d}" for numero in range(50) if numero % 3 != 0]
+    assert [producto["nombre"] for producto in indice.por_prefijo("prod", limite=100)] == esperados
+    assert [producto["nombre"] for producto in indice.por_prefijo("producto 1")] == \
+        [nombre for nombre in esperados if nombre.startswith("Producto 1")]
+    assert len(indice) == len(esperados)
+
+
+def test_similares_con_errores_de_tipeo():
+    inventario = _inventario()
+    indice = inventario.indice_busqueda()
+
+    resultados = indice.similares("tornilo 3mm")
+    assert resultados[0][0]["nombre"] == "Tornillo 3 mm"
+    similitudes = [similitud for _, similitud in resultados]
+    assert similitudes == sorted(similitudes, reverse=True)
+    assert all(0 < similitud <= 1 for similitud in similitudes)
+    assert "Pan" not in [producto["nombre"] for producto, _ in resultados]
+
+    # Eliminar solo uno de los dos "Tornillo 3 mm" no lo saca del índice
+    inventario.eliminar("Tornillo 3 mm")
+    assert indice.similares("tornilo 3mm")[0][0]["nombre"] == "Tornillo 3 mm"
+    inventario.eliminar("Tornillo 3 mm")
+    assert "Tornillo 3 mm" not in [producto["nombre"] for producto, _ in indice.similares("tornilo 3mm")]
@@ -0,0 +1,91 @@
+# Pruebas del inventario por columnas (columnar.py)
+
+import pytest
+
+from columnar import InventarioColumnar
+from inventario import CRITERIOS_ORDEN, MINIMO_COMPACTAR, Inventario
+from servicios import calcular_estadisticas
+
+
+def _productos(cantidad):
+    return [{"nombre": f"Producto {i}", "precio": float(i % 13) + 0.25, "cantidad": i % 7}
+            for i in range(cantidad)]
+
+
+def _cambios(inventario):
+    inventario.agregar("Tornillo", 0.1, 100)
+    inventario.agregar("tornillo", 0.2, 50)      # Nombre repetido
+    inventario.fusionar({"nombre": "TORNILLO", "precio": 0.15, "cantidad": 10})
+    inventario.actualizar("Producto 3", nueva_cantidad=99)
+    inventario.eliminar("Producto 5")
+    inventario.eliminar("tornillo")              # Solo el primero
+    inventario.fusionar_valores("Tuerca", 0.05, 7)
+
+
+def test_mismos_resultados_que_inventario():
+    columnar = InventarioColumnar(_productos(20))
+    normal = Inventario(_productos(20))
+
+    _cambios(columnar)
+    _cambios(normal)
+
+    assert list(columnar) == [dict(producto) for producto in normal]
+    assert len(columnar) == len(normal)
+    assert columnar.buscar("TORNILLO") == {"nombre": "tornillo", "precio": 0.2, "cantidad": 50}
+    assert columnar.repeticiones("tornillo") == normal.repeticiones("tornillo") == 1
+    assert columnar.estadisticas() == calcular_estadisticas(list(normal))
+    assert columnar[2:4] == [dict(producto) for producto in normal[2:4]]
+
+
+def test_buscar_devuelve_copias():
+    columnar = InventarioColumnar(_productos(3))
+    producto = columnar.buscar("Producto 1")
+    producto["cantidad"] = 1000
+
+    assert columnar.buscar("Producto 1")["cantidad"] == 1
+
+
+def test_compacta_despues_de_muchas_eliminaciones():
+    cantidad = 3 * MINIMO_COMPACTAR
+    columnar = InventarioColumnar(_productos(cantidad))
+
+    borrados = columnar.eliminar_varios(f"Producto {i}" for i in range(0, cantidad, 3))
+    borrados += sum(columnar.eliminar(f"Producto {i}") for i in range(1, cantidad, 3))
+
+    # Se compactó: las columnas ya no tienen los huecos
+    assert borrados == 2 * MINIMO_COMPACTAR
+    assert len(columnar._nombres) < cantidad
+    esperados = [producto for i, producto in enumerate(_productos(cantidad)) if i % 3 == 2]
+    assert list(columnar) == esperados
+    assert columnar.buscar("Producto 5") == esperados[1]
+    assert columnar.estadisticas() == calcular_estadisticas(esperados)
+
+
+@pytest.mark.parametrize("criterio", list(CRITERIOS_ORDEN))
+def test_productos_ordenados(criterio):
+    columnar = InventarioColumnar(_productos(50))
+    columnar.eliminar("Producto 10")
+    esperados = sorted(columnar, key=CRITERIOS_ORDEN[criterio])
+
+    assert columnar.productos_ordenados(criterio) == esperados
+    assert columnar.productos_ordenados(criterio, 5, 15) == esperados[5:15]
+    assert columnar.productos_ordenados(criterio, descendente=True) == \
+        sorted(columnar, key=CRITERIOS_ORDEN[criterio], reverse=True)
+
+    # Un cambio invalida el orden guardado
+    columnar.actualizar("Producto 0", 1000.0, 1000)
+    assert columnar.productos_ordenados(criterio) == sorted(columnar, key=CRITERIOS_ORDEN[criterio])
+
+
+def test_desde_columnas():
+    productos = _productos(10)
+    columnar = InventarioColumnar.desde_columnas(
+        [p["nombre"] for p in productos],
+        [p["precio"] for p in productos],
+        [p["cantidad"] for p in productos],
+    )
+
+    assert list(columnar) == productos
+    assert columnar.buscar("producto 9") == productos[9]
+    columnar.remove(productos[4])
+    assert columnar.buscar("Producto 4") is None
@@ -0,0 +1,88 @@
+# Pruebas del modo por lotes (comandos.py y app.py --batch)
+
+import json
+import os
+import subprocess
+import sys
+
+from archivos import cargar_csv
+from comandos import ejecutar_comandos
+from inventario import Inventario
+
+CARPETA_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_ejecutar_comandos(tmp_path):
+    proveedor = tmp_path / "proveedor.csv"
+    proveedor.write_text("nombre,precio,cantidad\nPan,1.5,10\nTé,2.0,3\npan,1.6,1\n", encoding="utf-8")
+    guardado = tmp_path / "guardado.csv"
+
+    lineas = [
+        "# Comentario y línea vacía: se ignoran",
+        "",
+        "add,Pan,1.0,5",
+        'agregar,"Tornillo, 3 mm",0.1,100',
+        "update,Tornillo, 3 mm,,",               # Sin comillas: datos de más
+        'update,"tornillo, 3 mm",,250',
+        "add,Leche,-1,3",                        # Precio negativo
+        "delete,Queso",                          # No existe
+        "volar,Pan",                             # Comando desconocido
+        f"merge,{proveedor}",
+        f"save,{guardado}",
+        "stats",
+    ]
+    inventario = Inventario()
+    resumen = ejecutar_comandos(lineas, inventario)
+
+    assert resumen["comandos"] == 10
+    assert resumen["errores"] == 4
+    assert [error["linea"] for error in resumen["detalle_errores"]] == [5, 7, 8, 9]
+    assert resumen["por_tipo"] == {"add": 1, "agregar": 1, "update": 1, "merge": 1,
+                                   "save": 1, "stats": 1}
+    assert resumen["fusion"] == {"actualizados": 1, "nuevos": 1, "duplicados_en_lote": 1}
+    assert resumen["productos"] == 3
+
+    assert inventario.buscar("Pan") == {"nombre": "Pan", "precio": 1.6, "cantidad": 16}
+    assert inventario.buscar("TORNILLO, 3 MM")["cantidad"] == 250
+    assert resumen["estadisticas"]["unidades_totales"] == 16 + 250 + 3
+    assert cargar_csv(str(guardado)) == [dict(producto) for producto in inventario]
+
+
+def test_una_carga_con_errores_no_cambia_el_inventario(tmp_path):
+    invalido = tmp_path / "invalido.csv"
+    invalido.write_text("otro,encabezado\nPan,1.0,1\n", encoding="utf-8")
+
+    inventario = Inventario()
+    inventario.agregar("Pan", 1.0, 5)
+    resumen = ejecutar_comandos([f"load,{invalido}", f"load,{tmp_path / 'no_existe.csv'}"], inventario)
+
+    assert resumen["errores"] == 2
+    assert list(inventario) == [{"nombre": "Pan", "precio": 1.0, "cantidad": 5}]
+
+
+def _ejecutar_app(*argumentos, entrada=None):
+    return subprocess.run([sys.executable, os.path.join(CARPETA_APP, "app.py"), *argumentos],
+                          input=entrada, capture_output=True, text=True, cwd=CARPETA_APP,
+                          timeout=60)
+
+
+def test_app_batch_desde_archivo(tmp_path):
+    comandos = tmp_path / "comandos.txt"
+    comandos.write_text("add,Pan,1.0,5\nadd,Té,2.0,1\nstats\n", encoding="utf-8")
+    salida = tmp_path / "resumen.json"
+
+    proceso = _ejecutar_app("--batch", str(comandos), "--salida", str(salida))
+
+    assert proceso.returncode == 0
+    resumen = json.loads(salida.read_text(encoding="utf-8"))
+    assert resumen["comandos"] == 3 and resumen["productos"] == 2
+    assert resumen["estadisticas"]["valor_total"] == 7.0
+
+
+def test_app_batch_desde_la_entrada_con_errores():
+    proceso = _ejecutar_app("--batch", "-", entrada="add,Pan,1.0,5\ndelete,Queso\n")
+
+    # Con algún error el código de salida es 1, y el resumen sale por pantalla
+    assert proceso.returncode == 1
+    resumen = json.loads(proceso.stdout)
+    assert resumen["errores"] == 1 and resumen["productos"] == 1
@@ -0,0 +1,59 @@
+# Pruebas del inventario para varios hilos (concurrente.py)
+
+import threading
+
+from concurrente import InventarioConcurrente
+
+
+def test_fusionar_desde_varios_hilos_no_pierde_unidades():
+    # Pocas franjas: varios nombres comparten candado y se cruzan a propósito
+    inventario = InventarioConcurrente(franjas=4)
+    nombres = [f"Producto {i}" for i in range(20)]
+    hilos_totales = 8
+    vueltas = 200
+    arranque = threading.Barrier(hilos_totales)
+
+    def trabajar():
+        arranque.wait()
+        for _ in range(vueltas):
+            for nombre in nombres:
+                inventario.fusionar({"nombre": nombre, "precio": 1.0, "cantidad": 1})
+
+    hilos = [threading.Thread(target=trabajar) for _ in range(hilos_totales)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    # Cada nombre se agregó una sola vez y recibió todas las sumas
+    assert len(inventario) == len(nombres)
+    for nombre in nombres:
+        assert inventario.repeticiones(nombre) == 1
+        assert inventario.buscar(nombre)["cantidad"] == hilos_totales * vueltas
+
+    estadisticas = inventario.estadisticas()
+    assert estadisticas["unidades_totales"] == hilos_totales * vueltas * len(nombres)
+
+
+def test_admite_nombres_repetidos_como_inventario():
+    inventario = InventarioConcurrente()
+    inventario.agregar("Tornillo", 1.0, 10)
+    inventario.agregar("Tuerca", 2.0, 20)
+    inventario.agregar("tornillo", 3.0, 30)
+
+    assert len(inventario) == 3
+    assert inventario.repeticiones("TORNILLO") == 2
+    assert inventario.buscar("tornillo")["cantidad"] == 10
+    assert inventario.buscar("tornillo", ocurrencia=1)["cantidad"] == 30
+
+    # fusionar y eliminar usan el primero; se conserva el orden de llegada
+    inventario.fusionar({"nombre": "Tornillo", "precio": 1.5, "cantidad": 5})
+    assert [p["cantidad"] for p in inventario] == [15, 20, 30]
+
+    assert inventario.eliminar("Tornillo")
+    assert [p["nombre"] for p in inventario] == ["Tuerca", "tornillo"]
+    assert inventario.buscar("Tornillo")["cantidad"] == 30
+
+    assert inventario.eliminar("tornillo", ocurrencia=1) is False
+    inventario.clear()
+    assert len(inventario) == 0 and inventario.repeticiones("Tornillo") == 0
@@ -0,0 +1,98 @@
+# Pruebas del inventario que se abre al usarse (diferido.py)
+
+import random
+
+from archivos import escribir_csv
+from diferido import InventarioDiferido, recordar_ultimo, ultimo_inventario
+from inventario import Inventario
+from servicios import productos_en_rango, reporte_stock_bajo
+
+
+def _crear_csv(tmp_path, cantidad=300):
+    generador = random.Random(7)
+    productos = [{"nombre": f"Producto {i}", "precio": round(generador.uniform(1, 50), 2),
+                  "cantidad": generador.randint(0, 40)} for i in range(cantidad)]
+    ruta = str(tmp_path / "inventario.csv")
+    escribir_csv(productos, ruta)
+    return ruta, productos
+
+
+def _abrir_desde_copia(ruta):
+    # La primera apertura arma la copia binaria; la segunda ya la usa
+    primero = InventarioDiferido(ruta)
+    len(primero)
+    primero.cerrar()
+    diferido = InventarioDiferido(ruta)
+    assert diferido.cache_al_dia()
+    return diferido
+
+
+def test_stock_bajo_desde_la_copia_sin_cargar_el_inventario(tmp_path):
+    ruta, productos = _crear_csv(tmp_path)
+    normal = Inventario()
+    normal.extend(productos)
+    diferido = _abrir_desde_copia(ruta)
+
+    for limite in (None, 5):
+        esperado = reporte_stock_bajo(normal, 10, limite)
+        obtenido = reporte_stock_bajo(diferido, 10, limite)
+        assert obtenido["total"] == esperado["total"]
+        assert [dict(p) for p in obtenido["productos"]] == esperado["productos"]
+
+    for campo in ("precio", "cantidad", "subtotal"):
+        for descendente in (False, True):
+            esperado = productos_en_rango(normal, campo, 10, 30, limite=20, descendente=descendente)
+            obtenido = productos_en_rango(diferido, campo, 10, 30, limite=20, descendente=descendente)
+            assert [dict(p) for p in obtenido] == esperado
+
+    assert "copia abierta" in repr(diferido)
+    diferido.cerrar()
+
+
+def test_campo_desconocido(tmp_path):
+    ruta, _ = _crear_csv(tmp_path, 10)
+    diferido = _abrir_desde_copia(ruta)
+
+    try:
+        diferido.indices_ordenados().rango("peso")
+        assert False, "se esperaba ValueError"
+    except ValueError:
+        pass
+    finally:
+        diferido.cerrar()
+
+
+def test_la_copia_se_rearma_si_cambia_el_csv(tmp_path):
+    ruta, productos = _crear_csv(tmp_path, 10)
+    _abrir_desde_copia(ruta).cerrar()
+
+    escribir_csv(productos[:3], ruta)
+    diferido = InventarioDiferido(ruta)
+    assert not diferido.cache_al_dia()
+    assert len(diferido) == 3
+
+
+def test_recordar_ultimo(tmp_path, monkeypatch):
+    ruta, _ = _crear_csv(tmp_path, 1)
+    casa = tmp_path / "casa"
+    casa.mkdir()
+
+    # Sin la variable se anota en la carpeta del usuario
+    monkeypatch.delenv("INVENTARIO_ULTIMO", raising=False)
+    monkeypatch.setenv("HOME", str(casa))
+    assert ultimo_inventario() is None
+    assert recordar_ultimo(ruta) is True
+    assert (casa / ".inventario_ultimo").exists()
+    assert ultimo_inventario() == ruta
+
+    # La variable indica otro archivo
+    anotado = tmp_path / "ultimo"
+    monkeypatch.setenv("INVENTARIO_ULTIMO", str(anotado))
+    assert ultimo_inventario() is None
+    assert recordar_ultimo(ruta) is True
+    assert ultimo_inventario() == ruta
+
+    # Vacía, no se recuerda nada
+    monkeypatch.setenv("INVENTARIO_ULTIMO", "")
+    assert recordar_ultimo(ruta) is False
+    assert ultimo_inventario() is None
@@ -0,0 +1,45 @@
+# Pruebas de las estadísticas incrementales (estadisticas.py)
+
+import math
+import random
+
+from inventario import Inventario
+from servicios import calcular_estadisticas
+
+
+def test_valor_total_no_deriva_con_muchos_cambios():
+    generador = random.Random(3)
+    inventario = Inventario()
+    nombres = []
+
+    # Productos baratos que quedan, y caros que entran y salen sin parar
+    for i in range(20):
+        inventario.agregar(f"Barato {i}", round(generador.uniform(0.01, 1), 2), generador.randint(1, 5))
+
+    for paso in range(20000):
+        accion = generador.random()
+        if accion < 0.4 or not nombres:
+            nombre = f"Caro {paso}"
+            inventario.agregar(nombre, generador.uniform(1e5, 1e7), generador.randint(1, 10 ** 6))
+            nombres.append(nombre)
+        elif accion < 0.7:
+            inventario.actualizar(generador.choice(nombres), generador.uniform(1e5, 1e7),
+                                  generador.randint(1, 10 ** 6))
+        else:
+            inventario.eliminar(nombres.pop(generador.randrange(len(nombres))))
+
+        if paso % 1000 == 0:
+            esperado = calcular_estadisticas([dict(p) for p in inventario])
+            assert math.isclose(inventario.estadisticas()["valor_total"], esperado["valor_total"],
+                                rel_tol=1e-12)
+
+    # Sin los caros solo quedan unos pocos pesos: ahí se notaría el error acumulado
+    for nombre in nombres:
+        inventario.eliminar(nombre)
+
+    obtenido = inventario.estadisticas()
+    esperado = calcular_estadisticas([dict(p) for p in inventario])
+    assert obtenido["unidades_totales"] == esperado["unidades_totales"]
+    assert math.isclose(obtenido["valor_total"], esperado["valor_total"], rel_tol=1e-12)
+    assert obtenido["producto_mas_caro"] == esperado["producto_mas_caro"]
+    assert obtenido["producto_mayor_stock"] == esperado["producto_mayor_stock"]
@@ -0,0 +1,101 @@
+# Pruebas del inventario repartido en procesos (fragmentos.py)
+
+import pytest
+
+from archivos import ErrorFormatoCSV, cargar_csv, escribir_csv
+from fragmentos import InventarioFragmentado, fragmento_de
+
+FRAGMENTOS = 3
+
+
+def _productos(cantidad):
+    return [{"nombre": f"Producto {i}", "precio": float(i % 17) + 0.5, "cantidad": i % 9}
+            for i in range(cantidad)]
+
+
+@pytest.fixture
+def inventario():
+    with InventarioFragmentado(FRAGMENTOS) as inventario:
+        yield inventario
+
+
+def test_cada_producto_vive_en_su_fragmento(inventario):
+    for producto in _productos(60):
+        agregado = inventario.agregar(producto["nombre"], producto["precio"], producto["cantidad"])
+        assert agregado == producto
+
+    assert len(inventario) == 60
+    assert fragmento_de("PRODUCTO 7", FRAGMENTOS) == fragmento_de("producto 7", FRAGMENTOS)
+
+    for producto in _productos(60):
+        nombre = producto["nombre"]
+        assert inventario.buscar(nombre.upper()) == producto
+        for numero in range(FRAGMENTOS):
+            encontrado = inventario._pedir(numero, "buscar", nombre)
+            assert (encontrado is not None) == (numero == fragmento_de(nombre, FRAGMENTOS))
+
+    assert inventario.actualizar("producto 3", nueva_cantidad=100)
+    assert inventario.buscar("Producto 3")["cantidad"] == 100
+    assert inventario.eliminar("Producto 3")
+    assert inventario.buscar("Producto 3") is None
+
+
+def test_cargar_csv_igual_que_la_carga_normal(inventario, tmp_path):
+    ruta = str(tmp_path / "inventario.csv")
+    productos = _productos(5000) + [{"nombre": "Producto 10", "precio": 9.0, "cantidad": 1}]
+    escribir_csv(productos, ruta)
+    with open(ruta, "a", encoding="utf-8") as archivo:
+        archivo.write("fila,sin,numeros\n")
+
+    resultado = inventario.cargar_csv(ruta)
+    esperados = cargar_csv(ruta)
+
+    assert resultado["productos"] == len(esperados) == len(productos)
+    assert resultado["filas_invalidas"] == 1
+    assert resultado["agregados"] == len(productos)
+
+    # Dentro de cada fragmento se mantiene el orden del archivo
+    for numero in range(FRAGMENTOS):
+        propios = [p for p in esperados if fragmento_de(p["nombre"], FRAGMENTOS) == numero]
+        assert inventario._pedir(numero, "tramo", 0, None) == propios
+
+
+def test_cargar_csv_comprimido_y_fusionando(inventario, tmp_path):
+    ruta = str(tmp_path / "inventario.csv.gz")
+    escribir_csv(_productos(300), ruta)
+    inventario.agregar("Producto 1", 1.0, 1000)
+
+    resultado = inventario.cargar_csv(ruta, fusionar=True)
+
+    assert resultado["productos"] == 300
+    assert resultado["actualizados"] == 1
+    assert len(inventario) == 300
+    assert inventario.buscar("Producto 1")["cantidad"] == 1001
+
+
+def test_si_un_tramo_falla_no_cambia_ningun_fragmento(inventario, tmp_path):
+    buena = str(tmp_path / "buena.csv")
+    escribir_csv(_productos(100), buena)
+    inventario.cargar_csv(buena)
+    antes = sorted(inventario, key=lambda p: p["nombre"])
+
+    # Un byte que no es UTF-8 al final: solo el último tramo falla
+    mala = str(tmp_path / "mala.csv")
+    escribir_csv(_productos(3000), mala)
+    with open(mala, "ab") as archivo:
+        archivo.write(b"Roto \xff,1.0,1\n")
+
+    with pytest.raises(UnicodeDecodeError):
+        inventario.cargar_csv(mala)
+    assert sorted(inventario, key=lambda p: p["nombre"]) == antes
+
+    sin_encabezado = str(tmp_path / "sin_encabezado.csv")
+    with open(sin_encabezado, "w", encoding="utf-8") as archivo:
+        archivo.write("a,b,c\nPan,1.0,2\n")
+
+    with pytest.raises(ErrorFormatoCSV):
+        inventario.cargar_csv(sin_encabezado)
+    assert sorted(inventario, key=lambda p: p["nombre"]) == antes
+
+    # Después del error los fragmentos siguen respondiendo en orden
+    assert inventario.buscar("Producto 5")["precio"] == 5.5
@@ -0,0 +1,132 @@
+# Pruebas del guardado de solo los cambios (incremental.py)
+
+import random
+
+import pytest
+
+import incremental
+from archivos import SUFIJO_DELTA, cargar_csv
+from incremental import GuardadoIncremental
+from inventario import Inventario
+
+
+def _productos(inventario):
+    return [dict(producto) for producto in inventario]
+
+
+def _cambiar_al_azar(inventario, generador, pasos):
+    for _ in range(pasos):
+        nombre = f"Producto {generador.randint(0, 60)}"
+        accion = generador.random()
+
+        if inventario.buscar(nombre) is None:
+            inventario.agregar(nombre, round(generador.uniform(1, 9), 2), generador.randint(0, 50))
+        elif accion < 0.5:
+            inventario.actualizar(nombre, nueva_cantidad=generador.randint(0, 50))
+        elif accion < 0.8:
+            inventario.eliminar(nombre)
+        else:
+            inventario.fusionar_valores(nombre, 3.0, 1)
+
+
+def test_el_csv_con_su_delta_da_el_inventario(tmp_path):
+    ruta = str(tmp_path / "inventario.csv")
+    generador = random.Random(11)
+    inventario = Inventario()
+    guardado = GuardadoIncremental(ruta, consolidar_cada=1000, proporcion_consolidar=1000).conectar(inventario)
+
+    _cambiar_al_azar(inventario, generador, 100)
+    assert guardado.guardar()["modo"] == "completo"
+
+    for _ in range(30):
+        _cambiar_al_azar(inventario, generador, 15)
+        assert guardado.guardar()["modo"] in ("cambios", "sin cambios")
+        # Mismos productos y en el mismo orden
+        assert cargar_csv(ruta) == _productos(inventario)
+
+    # Vaciar obliga a reescribir todo, y el delta desaparece
+    inventario.clear()
+    inventario.agregar("Solo", 1.0, 1)
+    assert guardado.guardar()["modo"] == "completo"
+    assert cargar_csv(ruta) == _productos(inventario)
+    assert not (tmp_path / ("inventario.csv" + SUFIJO_DELTA)).exists()
+
+
+def test_si_falla_los_cambios_quedan_pendientes(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "inventario.csv")
+    inventario = Inventario()
+    inventario.agregar("Pan", 1.0, 5)
+    guardado = GuardadoIncremental(ruta, proporcion_consolidar=1000).conectar(inventario)
+    guardado.guardar()
+
+    inventario.actualizar("Pan", nueva_cantidad=7)
+    inventario.agregar("Leche", 2.0, 3)
+
+    def sin_espacio(registros, ruta):
+        raise OSError("No queda espacio en el disco")
+
+    monkeypatch.setattr(incremental, "escribir_delta", sin_espacio)
+    with pytest.raises(OSError):
+        guardado.guardar()
+    assert guardado.cambios_pendientes() == 2
+
+    monkeypatch.undo()
+    assert guardado.guardar() == {"modo": "cambios", "productos": 2}
+    assert cargar_csv(ruta) == _productos(inventario)
+
+
+def test_linea_cortada_al_final_del_delta(tmp_path):
+    ruta = str(tmp_path / "inventario.csv")
+    inventario = Inventario()
+    inventario.agregar("Pan", 1.0, 5)
+    guardado = GuardadoIncremental(ruta).conectar(inventario)
+    guardado.guardar()
+
+    inventario.actualizar("Pan", nueva_cantidad=9)
+    guardado.guardar()
+
+    # El programa se cerró mientras escribía el siguiente cambio
+    with open(ruta + SUFIJO_DELTA, "a", encoding="utf-8") as archivo:
+        archivo.write('["S","Pan",1.0,')
+
+    assert cargar_csv(ruta) == [{"nombre": "Pan", "precio": 1.0, "cantidad": 9}]
+
+
+def _con_repetidos(tmp_path):
+    # Inventario grande para que el guardado siga en modo "cambios"
+    ruta = str(tmp_path / "inventario.csv")
+    inventario = Inventario()
+    for numero in range(198):
+        inventario.agregar(f"Producto {numero}", 1.0, numero)
+    inventario.agregar("Tornillo", 0.1, 100)
+    inventario.agregar("tornillo", 0.2, 50)
+
+    guardado = GuardadoIncremental(ruta).conectar(inventario)
+    guardado.guardar()
+    assert cargar_csv(ruta) == _productos(inventario)
+    return ruta, inventario, guardado
+
+
+def test_eliminar_uno_de_dos_con_el_mismo_nombre(tmp_path):
+    ruta, inventario, guardado = _con_repetidos(tmp_path)
+
+    inventario.eliminar("Tornillo")
+    guardado.guardar()
+
+    assert len(cargar_csv(ruta)) == 199
+    assert cargar_csv(ruta) == _productos(inventario)
+
+
+def test_agregar_con_un_nombre_que_ya_existe(tmp_path):
+    ruta, inventario, guardado = _con_repetidos(tmp_path)
+
+    inventario.agregar("Producto 5", 9.0, 1)
+    inventario.actualizar("tornillo", nueva_cantidad=7, ocurrencia=1)
+    guardado.guardar()
+
+    assert cargar_csv(ruta) == _productos(inventario)
+
+    # Después de reescribir todo, los cambios sin repetidos vuelven a ir al delta
+    inventario.actualizar("Producto 9", nueva_cantidad=1)
+    assert guardado.guardar()["modo"] == "cambios"
+    assert cargar_csv(ruta) == _productos(inventario)
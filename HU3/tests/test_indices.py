@@ -0,0 +1,49 @@
+# Pruebas de la lista ordenada por bloques (indices.py)
+
+import random
+from bisect import bisect_left
+
+import indices
+from indices import ListaOrdenada
+
+
+def test_contar_y_recorrer_igual_que_una_lista(monkeypatch):
+    # Bloques chicos para que se partan y se vacíen muchas veces
+    monkeypatch.setattr(indices, "TAMANO_BLOQUE_INDICE", 4)
+    generador = random.Random(5)
+    valores = [generador.randint(0, 300) for _ in range(50)]
+    lista = ListaOrdenada(valores)
+    valores.sort()
+
+    for _ in range(3000):
+        if valores and generador.random() < 0.45:
+            valor = generador.choice(valores)
+            lista.quitar(valor)
+            valores.remove(valor)
+        else:
+            valor = generador.randint(0, 300)
+            lista.agregar(valor)
+            valores.insert(bisect_left(valores, valor), valor)
+
+        desde = generador.randint(-10, 310)
+        hasta = desde + generador.randint(0, 120)
+        esperados = [v for v in valores if desde <= v < hasta]
+
+        assert len(lista) == len(valores)
+        assert lista.contar(desde, hasta) == len(esperados)
+        assert lista.contar(None, hasta) == bisect_left(valores, hasta)
+        assert lista.contar(desde) == len(valores) - bisect_left(valores, desde)
+        assert list(lista.entre(desde, hasta)) == esperados
+        assert list(lista.entre(desde, hasta, descendente=True)) == esperados[::-1]
+
+    assert list(lista) == valores
+
+
+def test_quitar_un_valor_que_no_esta():
+    lista = ListaOrdenada([1, 2, 3])
+    try:
+        lista.quitar(7)
+        assert False, "se esperaba ValueError"
+    except ValueError:
+        pass
+    assert list(lista) == [1, 2, 3]
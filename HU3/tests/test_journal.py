@@ -0,0 +1,100 @@
+# Pruebas del registro de cambios (journal.py)
+
+import json
+
+from inventario import Inventario
+from journal import Journal, recuperar, reproducir
+
+
+def _productos(inventario):
+    return [dict(producto) for producto in inventario]
+
+
+def test_recupera_los_cambios(tmp_path):
+    base = str(tmp_path / "inventario.csv")
+
+    inventario, journal = recuperar(base)
+    inventario.agregar("Pan", 1.0, 5)
+    inventario.agregar("Leche", 2.0, 3)
+    inventario.actualizar("pan", nueva_cantidad=8)
+    inventario.eliminar("Leche")
+    journal.cerrar()
+
+    recuperado, journal = recuperar(base)
+    journal.cerrar()
+    assert _productos(recuperado) == [{"nombre": "Pan", "precio": 1.0, "cantidad": 8}]
+
+
+def test_nombres_repetidos_no_se_pierden(tmp_path):
+    base = str(tmp_path / "inventario.csv")
+
+    inventario, journal = recuperar(base)
+    inventario.agregar("Pan", 1.0, 5)
+    inventario.agregar("Pan", 2.0, 3)
+    inventario.agregar("pan", 3.0, 1)
+    inventario.actualizar("Pan", nueva_cantidad=7, ocurrencia=1)
+    inventario.eliminar("Pan")          # el primero
+    journal.cerrar()
+    esperado = _productos(inventario)
+
+    recuperado, journal = recuperar(base)
+    journal.cerrar()
+    assert _productos(recuperado) == esperado == [
+        {"nombre": "Pan", "precio": 2.0, "cantidad": 7},
+        {"nombre": "pan", "precio": 3.0, "cantidad": 1},
+    ]
+
+
+def test_repetidos_despues_de_compactar(tmp_path):
+    base = str(tmp_path / "inventario.csv")
+
+    inventario, journal = recuperar(base)
+    inventario.agregar("Pan", 1.0, 5)
+    inventario.agregar("Pan", 2.0, 3)
+    journal.compactar(esperar=True)
+    inventario.eliminar("Pan", ocurrencia=1)
+    inventario.agregar("Pan", 4.0, 9)
+    journal.cerrar()
+    esperado = _productos(inventario)
+
+    recuperado, journal = recuperar(base)
+    journal.cerrar()
+    assert _productos(recuperado) == esperado
+
+
+def test_registro_anterior_aplicado_dos_veces(tmp_path):
+    # Una compactación que escribió la copia pero no llegó a borrar el
+    # registro anterior: aplicarlo otra vez no debe duplicar productos
+    base = tmp_path / "inventario.csv"
+
+    inventario, journal = recuperar(str(base))
+    inventario.agregar("Pan", 1.0, 5)
+    inventario.agregar("Pan", 2.0, 3)
+    inventario.agregar("Leche", 1.5, 2)
+    inventario.eliminar("Leche")
+    journal.cerrar()
+    esperado = _productos(inventario)
+    registro = (tmp_path / "inventario.csv.log").read_text(encoding="utf-8")
+
+    journal = Journal(str(base))
+    journal.conectar(inventario)
+    journal.compactar(esperar=True)
+    journal.cerrar()
+    (tmp_path / "inventario.csv.log.anterior").write_text(registro, encoding="utf-8")
+
+    recuperado, journal = recuperar(str(base))
+    journal.cerrar()
+    assert _productos(recuperado) == esperado
+
+
+def test_linea_incompleta_y_registros_viejos(tmp_path):
+    # Registros de la versión anterior (sin ocurrencia) y una última
+    # línea cortada por un cierre a mitad de escritura
+    ruta = tmp_path / "viejo.log"
+    lineas = [["S", "Pan", 1.0, 5], ["S", "Leche", 2.0, 1], ["D", "Leche"]]
+    ruta.write_text("".join(json.dumps(l) + "\n" for l in lineas) + '["S","Caf',
+                    encoding="utf-8")
+
+    inventario = Inventario()
+    assert reproducir(inventario, str(ruta)) == 3
+    assert _productos(inventario) == [{"nombre": "Pan", "precio": 1.0, "cantidad": 5}]
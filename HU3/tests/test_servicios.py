@@ -0,0 +1,63 @@
+# Pruebas de las funciones de servicios.py
+
+import io
+
+import pytest
+
+from columnar import InventarioColumnar
+from inventario import Inventario
+from servicios import mostrar_inventario
+
+
+def _productos(cantidad):
+    return [{"nombre": f"Producto {i:03d}", "precio": float(cantidad - i), "cantidad": i}
+            for i in range(cantidad)]
+
+
+def _filas(texto):
+    """Nombres de los productos que aparecen en la tabla"""
+    return [linea.split("  ")[0] for linea in texto.splitlines() if linea.startswith("Producto 0")]
+
+
+@pytest.mark.parametrize("clase", [list, Inventario, InventarioColumnar])
+def test_paginas(clase):
+    inventario = clase(_productos(25))
+
+    salida = io.StringIO()
+    assert mostrar_inventario(inventario, pagina=2, por_pagina=10, salida=salida) == 3
+    assert _filas(salida.getvalue()) == [f"Producto {i:03d}" for i in range(10, 20)]
+    assert "página 2 de 3, 25 productos" in salida.getvalue()
+
+    # La última página está incompleta; pasarse muestra la última
+    salida = io.StringIO()
+    mostrar_inventario(inventario, pagina=7, por_pagina=10, salida=salida)
+    assert _filas(salida.getvalue()) == [f"Producto {i:03d}" for i in range(20, 25)]
+    assert "página 3 de 3" in salida.getvalue()
+
+    # Ordenado por precio (de menor a mayor es el orden inverso al de carga)
+    salida = io.StringIO()
+    mostrar_inventario(inventario, pagina=1, por_pagina=3, ordenar_por="precio", salida=salida)
+    assert _filas(salida.getvalue()) == ["Producto 024", "Producto 023", "Producto 022"]
+
+    # Con límite solo cuentan las primeras filas
+    salida = io.StringIO()
+    assert mostrar_inventario(inventario, pagina=1, por_pagina=10, limite=12, salida=salida) == 2
+
+
+@pytest.mark.parametrize("argumentos", [
+    {"por_pagina": 0},
+    {"por_pagina": -5},
+    {"pagina": 0},
+    {"pagina": -1},
+    {"limite": -1},
+    {"ordenar_por": "color"},
+])
+def test_argumentos_invalidos(argumentos):
+    with pytest.raises(ValueError):
+        mostrar_inventario(_productos(5), salida=io.StringIO(), **argumentos)
+
+
+def test_inventario_vacio():
+    salida = io.StringIO()
+    assert mostrar_inventario([], pagina=1, salida=salida) == 0
+    assert "vacío" in salida.getvalue()
@@ -0,0 +1,87 @@
+# Pruebas del protocolo del servicio (servidor.py)
+
+import asyncio
+import json
+
+from servidor import ServidorInventario
+
+
+async def _conversar(lineas):
+    """Abre el servicio en un puerto libre, manda las líneas juntas y lee las respuestas"""
+    servicio = ServidorInventario()
+    servidor = await servicio.iniciar("127.0.0.1", 0)
+    puerto = servidor.sockets[0].getsockname()[1]
+
+    try:
+        lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+        escritor.write("".join(linea + "\n" for linea in lineas).encode("utf-8"))
+        await escritor.drain()
+
+        respuestas = []
+        for _ in lineas:
+            respuestas.append(json.loads(await asyncio.wait_for(lector.readline(), 5)))
+
+        escritor.close()
+        await escritor.wait_closed()
+    finally:
+        servidor.close()
+        await servidor.wait_closed()
+
+    return servicio, respuestas
+
+
+def conversar(*pedidos):
+    lineas = [p if isinstance(p, str) else json.dumps(p) for p in pedidos]
+    return asyncio.run(_conversar(lineas))
+
+
+def test_operaciones_basicas():
+    _, respuestas = conversar(
+        {"id": 1, "op": "add", "nombre": "Pan", "precio": 1.5, "cantidad": 10},
+        {"id": 2, "op": "search", "nombre": "pan"},
+        {"id": 3, "op": "update", "nombre": "Pan", "cantidad": 4},
+        {"id": 4, "op": "stats"},
+        {"id": 5, "op": "delete", "nombre": "Leche"},
+    )
+
+    assert [r["ok"] for r in respuestas] == [True, True, True, True, False]
+    assert respuestas[1]["resultado"] == {"nombre": "Pan", "precio": 1.5, "cantidad": 10}
+    assert respuestas[3]["resultado"]["unidades_totales"] == 4
+    assert "Leche" in respuestas[4]["error"]
+
+
+def test_op_que_no_es_texto_no_corta_la_conexion():
+    servicio, respuestas = conversar(
+        {"id": 1, "op": "add", "nombre": "Pan", "precio": 1.5, "cantidad": 10},
+        {"id": 2, "op": ["x"]},
+        {"id": 3, "op": "batch", "ops": [{"op": {"a": 1}}]},
+        {"id": 4, "op": "search", "nombre": "Pan"},
+    )
+
+    assert [r["ok"] for r in respuestas] == [True, False, False, True]
+    assert len(servicio.inventario) == 1
+
+
+def test_lote_con_errores_sueltos():
+    _, respuestas = conversar({"id": 1, "op": "batch", "ops": [
+        {"id": "a", "op": "add", "nombre": "Pan", "precio": 1.0, "cantidad": 2},
+        {"id": "b", "op": "add", "nombre": "Leche", "precio": -1, "cantidad": 2},
+        {"id": "c", "op": "search", "nombre": "Pan"},
+    ]})
+
+    internas = respuestas[0]["resultado"]
+    assert [r["ok"] for r in internas] == [True, False, True]
+
+
+def test_numeros_no_finitos_se_rechazan():
+    servicio, respuestas = conversar(
+        '{"id": 1, "op": "add", "nombre": "Pan", "precio": NaN, "cantidad": 1}',
+        '{"id": 2, "op": "add", "nombre": "Pan", "precio": Infinity, "cantidad": 1}',
+        {"id": 3, "op": "add", "nombre": "Pan", "precio": 1.0, "cantidad": 10 ** 400},
+        {"id": 4, "op": "stats"},
+        "esto no es JSON",
+    )
+
+    assert [r["ok"] for r in respuestas] == [False, False, False, True, False]
+    assert respuestas[3]["resultado"] is None
+    assert len(servicio.inventario) == 0
@@ -0,0 +1,34 @@
+# Pruebas del formato binario (snapshot.py)
+
+import os
+
+import pytest
+
+from snapshot import InventarioSnapshot, escribir_snapshot
+
+
+def _escribir(tmp_path):
+    ruta = str(tmp_path / "inventario.bin")
+    productos = [{"nombre": f"Producto {i}", "precio": i + 0.25, "cantidad": i} for i in range(50)]
+    escribir_snapshot(productos, ruta)
+    return ruta, productos
+
+
+def test_abrir_y_consultar(tmp_path):
+    ruta, productos = _escribir(tmp_path)
+
+    with InventarioSnapshot(ruta) as snapshot:
+        assert len(snapshot) == 50
+        assert list(snapshot) == productos
+        assert snapshot.buscar("producto 7") == productos[7]
+        assert snapshot.estadisticas()["unidades_totales"] == sum(range(50))
+
+
+@pytest.mark.parametrize("faltan", [1, 8, 200, 1000])
+def test_archivo_cortado(tmp_path, faltan):
+    ruta, _ = _escribir(tmp_path)
+    with open(ruta, "r+b") as archivo:
+        archivo.truncate(os.path.getsize(ruta) - faltan)
+
+    with pytest.raises(ValueError, match="incompleto"):
+        InventarioSnapshot(ruta)
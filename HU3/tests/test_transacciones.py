@@ -0,0 +1,189 @@
+# Pruebas de las transacciones (transacciones.py)
+
+import pytest
+
+from columnar import InventarioColumnar
+from concurrente import InventarioConcurrente
+from inventario import Inventario
+from transacciones import ErrorDeshacer, Transaccion
+
+
+class ObservadorQueFalla:
+    """
+    Falla desde el aviso número 'desde' de los tipos indicados: solo
+    esa vez, o también en los siguientes si 'siempre' es True
+    """
+
+    def __init__(self, eventos, desde=1, siempre=True):
+        self.eventos = eventos
+        self.desde = desde
+        self.siempre = siempre
+        self.avisos = 0
+
+    def _aviso(self, evento):
+        if evento in self.eventos:
+            self.avisos += 1
+            if self.avisos == self.desde or (self.siempre and self.avisos > self.desde):
+                raise OSError(f"no se pudo registrar {evento}")
+
+    def al_agregar(self, producto):
+        self._aviso("al_agregar")
+
+    def al_actualizar(self, producto, precio_anterior, cantidad_anterior):
+        self._aviso("al_actualizar")
+
+    def al_eliminar(self, producto):
+        self._aviso("al_eliminar")
+
+    def al_vaciar(self):
+        self._aviso("al_vaciar")
+
+
+def _inventario():
+    inventario = Inventario()
+    inventario.agregar("Pan", 1.0, 5)
+    inventario.agregar("Leche", 2.0, 3)
+    inventario.agregar("Queso", 8.0, 1)
+    return inventario
+
+
+def _productos(inventario):
+    return sorted((dict(producto) for producto in inventario), key=lambda p: p["nombre"])
+
+
+def test_confirmar_aplica_todo():
+    inventario = _inventario()
+
+    with Transaccion(inventario) as transaccion:
+        transaccion.agregar("Té", 2.5, 10)
+        transaccion.actualizar("pan", nueva_cantidad=9)
+        transaccion.eliminar("Queso")
+        transaccion.fusionar_valores("Leche", 2.2, 1)
+        assert inventario.buscar("Té") is None   # Todavía no se aplicó
+        assert transaccion.buscar("té")["cantidad"] == 10
+
+    assert _productos(inventario) == [
+        {"nombre": "Leche", "precio": 2.2, "cantidad": 4},
+        {"nombre": "Pan", "precio": 1.0, "cantidad": 9},
+        {"nombre": "Té", "precio": 2.5, "cantidad": 10},
+    ]
+
+
+def test_con_una_excepcion_se_descarta():
+    inventario = _inventario()
+    antes = _productos(inventario)
+
+    with pytest.raises(KeyError):
+        with Transaccion(inventario) as transaccion:
+            transaccion.clear()
+            transaccion.agregar("Té", 2.5, 10)
+            raise KeyError("falla en medio de la carga")
+
+    assert _productos(inventario) == antes
+
+
+@pytest.mark.parametrize("vaciar", [False, True])
+def test_si_confirmar_falla_se_deshace(vaciar):
+    inventario = _inventario()
+    antes = _productos(inventario)
+    transaccion = Transaccion(inventario)
+
+    if vaciar:
+        transaccion.clear()
+    transaccion.actualizar("Pan", 1.5, 6)
+    for numero in range(5):
+        transaccion.agregar(f"Nuevo {numero}", 1.0, 1)
+
+    # El tercer producto agregado no se puede registrar
+    inventario.agregar_observador(ObservadorQueFalla({"al_agregar"}, desde=3, siempre=False), avisar_existentes=False)
+
+    with pytest.raises(OSError):
+        transaccion.confirmar()
+    assert _productos(inventario) == antes
+
+
+def test_si_no_se_puede_deshacer_se_avisa():
+    inventario = _inventario()
+    transaccion = Transaccion(inventario)
+    transaccion.agregar("Té", 2.5, 10)
+    transaccion.actualizar("Pan", 1.5, 6)
+
+    # Falla al actualizar y también al volver el precio anterior
+    inventario.agregar_observador(ObservadorQueFalla({"al_actualizar"}), avisar_existentes=False)
+
+    with pytest.raises(ErrorDeshacer) as informe:
+        transaccion.confirmar()
+
+    assert isinstance(informe.value.__cause__, OSError)
+    assert len(informe.value.fallas) == 1
+    assert inventario.buscar("Té") is None
+
+
+def _con_repetidos(clase=Inventario):
+    return clase([
+        {"nombre": "Pan", "precio": 1.0, "cantidad": 1},
+        {"nombre": "Leche", "precio": 2.0, "cantidad": 2},
+        {"nombre": "pan", "precio": 1.1, "cantidad": 3},
+        {"nombre": "Queso", "precio": 8.0, "cantidad": 4},
+    ])
+
+
+@pytest.mark.parametrize("clase", [Inventario, InventarioColumnar, InventarioConcurrente])
+def test_con_nombres_repetidos_hace_lo_mismo_que_inventario(clase):
+    directo = _con_repetidos(clase)
+    inventario = _con_repetidos(clase)
+
+    def cambios(destino):
+        destino.eliminar("PAN")                      # Solo el primero
+        destino.actualizar("pan", nueva_cantidad=30) # Ahora el primero es el otro
+        destino.agregar("Pan", 1.2, 5)
+        destino.eliminar("pan")
+        destino.fusionar_valores("Pan", 1.3, 1)      # Suma al agregado
+
+    cambios(directo)
+    with Transaccion(inventario) as transaccion:
+        cambios(transaccion)
+
+    assert [dict(producto) for producto in inventario] == [dict(producto) for producto in directo]
+    assert [producto["cantidad"] for producto in inventario] == [2, 4, 6]
+
+
+def test_si_confirmar_falla_se_deshace_en_el_mismo_orden():
+    inventario = _con_repetidos()
+    antes = list(inventario)
+    valores_antes = [dict(producto) for producto in inventario]
+
+    transaccion = Transaccion(inventario)
+    transaccion.eliminar("pan")
+    transaccion.actualizar("pan", 9.9, 99)
+    transaccion.agregar("Leche", 2.0, 2)    # Igual a uno que ya estaba
+    transaccion.agregar("Té", 2.5, 10)
+
+    inventario.agregar_observador(ObservadorQueFalla({"al_agregar"}, desde=2, siempre=False),
+                                  avisar_existentes=False)
+
+    with pytest.raises(OSError):
+        transaccion.confirmar()
+
+    # Mismos productos (los mismos diccionarios), mismos valores y mismo orden
+    assert all(ahora is anterior for ahora, anterior in zip(inventario, antes))
+    assert [dict(producto) for producto in inventario] == valores_antes
+
+
+def test_deshacer_un_agregado_no_quita_otro_igual():
+    inventario = _inventario()
+    pan = inventario.buscar("Pan")
+
+    transaccion = Transaccion(inventario)
+    transaccion.agregar("Pan", 1.0, 5)      # Igual al que ya estaba
+    transaccion.agregar("Té", 2.5, 10)
+
+    inventario.agregar_observador(ObservadorQueFalla({"al_agregar"}, desde=2, siempre=False),
+                                  avisar_existentes=False)
+
+    with pytest.raises(OSError):
+        transaccion.confirmar()
+
+    assert inventario.repeticiones("Pan") == 1
+    assert inventario.buscar("Pan") is pan
+    assert [producto["nombre"] for producto in inventario] == ["Pan", "Leche", "Queso"]
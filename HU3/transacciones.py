@@ -0,0 +1,369 @@
+# transacciones.py
+# Cambios en grupo que se aplican todos juntos o ninguno
+
+from inventario import clave_nombre
+
+# Marca de "producto eliminado dentro de la transacción"
+_ELIMINADO = None
+
+
+class ErrorDeshacer(RuntimeError):
+    """
+    confirmar() falló y además no se pudo deshacer todo: el inventario
+    puede haber quedado a medias. El error que causó la falla queda en
+    __cause__, y los de cada paso que no se pudo deshacer en 'fallas'.
+    """
+
+    def __init__(self, fallas):
+        super().__init__(f"No se pudieron deshacer {len(fallas)} cambios: "
+                         f"el inventario puede haber quedado a medias ({fallas[0]!r})")
+        self.fallas = fallas
+
+
+class _CambiosNombre:
+    """
+    Lo que la transacción cambia de los productos con un mismo nombre,
+    en el orden en que los ve Inventario (primero los que ya estaban y
+    después los agregados):
+    - quitados: cuántos de los que ya estaban se eliminan, desde el primero
+    - cambio: valores nuevos del primero de los que quedan, o None
+    - nuevos: productos agregados en la transacción que siguen vivos
+    """
+
+    def __init__(self):
+        self.quitados = 0
+        self.cambio = None
+        self.nuevos = []
+
+
+class Transaccion:
+    """
+    Junta muchos cambios (agregar, actualizar, eliminar, fusionar,
+    vaciar) sin tocar el inventario, y los aplica todos juntos con
+    confirmar(). descartar() los olvida y el inventario queda igual.
+
+    Los cambios se guardan en una capa aparte (nombre -> cambios), no en
+    una copia del inventario: preparar k cambios cuesta O(k) aunque el
+    inventario tenga millones de productos. Mientras tanto buscar() en
+    la transacción ya ve los cambios pendientes.
+
+    Se puede usar con "with": al salir sin errores se confirma, y si
+    hubo una excepción se descarta.
+
+        with Transaccion(inventario) as transaccion:
+            fusionar_lote(transaccion, productos)
+
+    Funciona con Inventario, InventarioColumnar o InventarioConcurrente.
+    El inventario no debe modificarse por fuera mientras la transacción
+    está abierta. Con nombres repetidos se comporta como Inventario:
+    buscar, actualizar, eliminar y fusionar usan el primero.
+    """
+
+    def __init__(self, inventario):
+        if isinstance(inventario, list):
+            raise TypeError("Las transacciones necesitan un inventario con índice (no una lista)")
+
+        self.inventario = inventario
+        self._vaciar = False     # Se vacía el inventario antes de aplicar los cambios
+        self._nombres = {}       # clave -> _CambiosNombre
+        self._agregados = []     # [valores] de cada producto agregado, en orden (_ELIMINADO si ya no está)
+        self._activa = True
+
+    # ------------------------------------------------------------
+    # Operaciones (mismas que Inventario)
+    # ------------------------------------------------------------
+
+    def agregar(self, nombre, precio, cantidad):
+        """Prepara un producto nuevo (aunque el nombre ya exista, como en Inventario)"""
+        self._comprobar_activa()
+        self._agregar(clave_nombre(nombre), (nombre, precio, cantidad))
+        return {"nombre": nombre, "precio": precio, "cantidad": cantidad}
+
+    def buscar(self, nombre):
+        """Devuelve una copia del producto como quedaría al confirmar, o None"""
+        valores = self._ver(clave_nombre(nombre))
+
+        if valores is None:
+            return None
+
+        nombre, precio, cantidad = valores
+        return {"nombre": nombre, "precio": precio, "cantidad": cantidad}
+
+    def actualizar(self, nombre, nuevo_precio=None, nueva_cantidad=None):
+        """Prepara un cambio de precio y/o cantidad. Retorna False si no existe"""
+        self._comprobar_activa()
+        clave = clave_nombre(nombre)
+        valores = self._ver(clave)
+
+        if valores is None:
+            return False
+
+        nombre, precio, cantidad = valores
+        self._cambiar_primero(clave, (
+            nombre,
+            precio if nuevo_precio is None else nuevo_precio,
+            cantidad if nueva_cantidad is None else nueva_cantidad,
+        ))
+        return True
+
+    def eliminar(self, nombre):
+        """
+        Prepara la eliminación de un producto (el primero, si el nombre
+        está repetido). Retorna False si no existe
+        """
+        self._comprobar_activa()
+        clave = clave_nombre(nombre)
+
+        if self._ver(clave) is None:
+            return False
+
+        estado = self._nombres.setdefault(clave, _CambiosNombre())
+        if self._primero_existente(clave, estado):
+            estado.quitados += 1
+            estado.cambio = None
+        else:
+            estado.nuevos.pop(0)[0] = _ELIMINADO
+        return True
+
+    def eliminar_varios(self, nombres):
+        """Prepara la eliminación de varios productos. Retorna cuántos existían"""
+        return sum(1 for nombre in nombres if self.eliminar(nombre))
+
+    def fusionar(self, producto_nuevo):
+        """
+        Si el producto ya existe suma la cantidad y actualiza el precio;
+        si no existe lo agrega.
+
+        Retorna: True si el producto ya existía, False si se agregó
+        """
+        return self.fusionar_valores(producto_nuevo["nombre"], producto_nuevo["precio"],
+                                     producto_nuevo["cantidad"])
+
+    def fusionar_valores(self, nombre, precio, cantidad):
+        """Igual que fusionar(), pero recibe los valores sueltos"""
+        self._comprobar_activa()
+        clave = clave_nombre(nombre)
+        valores = self._ver(clave)
+
+        if valores is None:
+            self._agregar(clave, (nombre, precio, cantidad))
+            return False
+
+        self._cambiar_primero(clave, (valores[0], precio, valores[2] + cantidad))
+        return True
+
+    def append(self, producto):
+        """Prepara un producto (diccionario) nuevo"""
+        self.agregar(producto["nombre"], producto["precio"], producto["cantidad"])
+
+    def extend(self, productos):
+        """Prepara varios productos (diccionarios) nuevos"""
+        for producto in productos:
+            self.append(producto)
+
+    def clear(self):
+        """Prepara el vaciado del inventario (olvida también los cambios anteriores)"""
+        self._comprobar_activa()
+        self._vaciar = True
+        self._nombres.clear()
+        self._agregados.clear()
+
+    # ------------------------------------------------------------
+    # Confirmar o descartar
+    # ------------------------------------------------------------
+
+    def cambios_pendientes(self):
+        """Cuántos productos cambian al confirmar"""
+        cambiados = sum(estado.quitados + (estado.cambio is not None)
+                        for estado in self._nombres.values())
+        return cambiados + sum(1 for entrada in self._agregados if entrada[0] is not _ELIMINADO)
+
+    def confirmar(self):
+        """
+        Aplica todos los cambios al inventario de una sola pasada: primero
+        los cambios y eliminaciones de los productos que ya estaban y al
+        final los productos nuevos, en el orden en que se agregaron.
+
+        Si algo falla a mitad de camino (por ejemplo, un observador que
+        no puede escribir su archivo), se deshace lo que ya se había
+        aplicado y se vuelve a lanzar el error. Si además algún cambio no
+        se puede deshacer, se lanza ErrorDeshacer (con el error original
+        como causa).
+
+        Retorna: diccionario con los conteos (agregados, actualizados, eliminados)
+        """
+        self._comprobar_activa()
+        self._activa = False
+
+        inventario = self.inventario
+        conteos = {"agregados": 0, "actualizados": 0, "eliminados": 0}
+
+        # Para deshacer un vaciado o una eliminación se vuelven a poner los
+        # productos de antes, en su orden. Sin eliminaciones alcanza con una
+        # lista de pasos que devuelven cada producto tocado a su estado anterior
+        hay_eliminados = any(estado.quitados for estado in self._nombres.values())
+        anteriores = list(inventario) if self._vaciar or hay_eliminados else None
+        deshacer = []
+
+        try:
+            if self._vaciar:
+                inventario.clear()
+
+            # Cada paso para deshacer se anota antes de hacer el cambio: si
+            # el cambio falla a mitad de camino, también se deshace
+            for clave, estado in self._nombres.items():
+                for _ in range(estado.quitados):
+                    if inventario.eliminar(clave):
+                        conteos["eliminados"] += 1
+
+                if estado.cambio is not None:
+                    previo = inventario.buscar(clave)
+                    deshacer.append(("restaurar", previo, previo["precio"], previo["cantidad"]))
+                    inventario.actualizar(*estado.cambio)
+                    conteos["actualizados"] += 1
+
+            for entrada in self._agregados:
+                valores = entrada[0]
+                if valores is _ELIMINADO:
+                    continue
+                # Si el agregado llega a entrar, es el último con ese nombre
+                nombre = valores[0]
+                deshacer.append(("quitar", nombre, inventario.repeticiones(nombre)))
+                inventario.agregar(*valores)
+                conteos["agregados"] += 1
+
+        except BaseException as error:
+            fallas = self._deshacer(anteriores, deshacer)
+            if fallas:
+                raise ErrorDeshacer(fallas) from error
+            raise
+
+        self._nombres = {}
+        self._agregados = []
+        return conteos
+
+    def descartar(self):
+        """Olvida los cambios preparados; el inventario no se toca"""
+        self._activa = False
+        self._nombres = {}
+        self._agregados = []
+        self._vaciar = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_error, error, traza):
+        if not self._activa:
+            return False
+
+        if tipo_error is None:
+            self.confirmar()
+        else:
+            self.descartar()
+
+        return False
+
+    def __repr__(self):
+        estado = "abierta" if self._activa else "terminada"
+        return f"Transaccion({estado}, {self.cambios_pendientes()} cambios)"
+
+    # ------------------------------------------------------------
+    # Funciones internas
+    # ------------------------------------------------------------
+
+    def _ver(self, clave):
+        """(nombre, precio, cantidad) del producto tal como se ve en la transacción, o None"""
+        estado = self._nombres.get(clave)
+
+        if estado is not None and estado.cambio is not None:
+            return estado.cambio
+
+        producto = self._existente(clave, estado.quitados if estado is not None else 0)
+        if producto is not None:
+            return (producto["nombre"], producto["precio"], producto["cantidad"])
+
+        if estado is not None and estado.nuevos:
+            return estado.nuevos[0][0]
+
+        return None
+
+    def _existente(self, clave, ocurrencia):
+        """Producto del inventario que la transacción todavía no eliminó, o None"""
+        if self._vaciar:
+            return None
+
+        if ocurrencia == 0:
+            return self.inventario.buscar(clave)
+
+        return self.inventario.buscar(clave, ocurrencia)
+
+    def _primero_existente(self, clave, estado):
+        """True si el primer producto visible con esa clave ya estaba en el inventario"""
+        return estado.cambio is not None or self._existente(clave, estado.quitados) is not None
+
+    def _agregar(self, clave, valores):
+        """Anota un producto nuevo al final (después de los que ya tienen ese nombre)"""
+        entrada = [valores]
+        self._nombres.setdefault(clave, _CambiosNombre()).nuevos.append(entrada)
+        self._agregados.append(entrada)
+
+    def _cambiar_primero(self, clave, valores):
+        """Anota valores nuevos para el primer producto visible con esa clave"""
+        estado = self._nombres.setdefault(clave, _CambiosNombre())
+
+        if self._primero_existente(clave, estado):
+            estado.cambio = valores
+        else:
+            estado.nuevos[0][0] = valores
+
+    def _comprobar_activa(self):
+        if not self._activa:
+            raise RuntimeError("La transacción ya se confirmó o se descartó")
+
+    def _deshacer(self, anteriores, deshacer):
+        """
+        Vuelve el inventario al estado que tenía antes de confirmar().
+
+        Retorna: lista con el error de cada paso que no se pudo deshacer
+        (vacía si todo quedó como antes)
+        """
+        inventario = self.inventario
+        fallas = []
+
+        if anteriores is not None:
+            # Se vuelven a poner los productos de antes, en su orden. Los de
+            # Inventario son los mismos diccionarios: primero se les
+            # devuelven los valores que tenían
+            for paso in deshacer:
+                if paso[0] == "restaurar":
+                    _, producto, precio, cantidad = paso
+                    producto["precio"] = precio
+                    producto["cantidad"] = cantidad
+            try:
+                inventario.clear()
+            except Exception as error:
+                fallas.append(error)
+            for producto in anteriores:
+                try:
+                    inventario.append(producto)
+                except Exception as error:
+                    fallas.append(error)
+            return fallas
+
+        for paso in reversed(deshacer):
+            # Se sigue aunque un paso falle (por ejemplo, si el observador
+            # que causó el error vuelve a fallar), y se anota para avisar
+            try:
+                if paso[0] == "quitar":
+                    # Por posición: el agregado es el último con ese nombre
+                    _, nombre, antes = paso
+                    if inventario.repeticiones(nombre) > antes:
+                        inventario.eliminar(nombre, antes)
+                else:
+                    # Sin eliminaciones, el producto cambiado es el primero con ese nombre
+                    _, producto, precio, cantidad = paso
+                    inventario.actualizar(producto["nombre"], precio, cantidad)
+            except Exception as error:
+                fallas.append(error)
+
+        return fallas